@@ -0,0 +1,43 @@
+"""store full ledger state on position snapshots
+
+Revision ID: 20260301_0003
+Revises: 20260215_0002
+Create Date: 2026-03-01 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260301_0003"
+down_revision = "20260215_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "positions_snapshot",
+        sa.Column(
+            "realized_pnl", sa.Numeric(precision=38, scale=18), nullable=False, server_default="0"
+        ),
+    )
+    op.alter_column(
+        "positions_snapshot",
+        "avg_cost",
+        type_=sa.Numeric(precision=38, scale=18),
+        existing_type=sa.Numeric(precision=18, scale=6),
+        existing_nullable=False,
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "positions_snapshot",
+        "avg_cost",
+        type_=sa.Numeric(precision=18, scale=6),
+        existing_type=sa.Numeric(precision=38, scale=18),
+        existing_nullable=False,
+    )
+    op.drop_column("positions_snapshot", "realized_pnl")
@@ -0,0 +1,70 @@
+"""create portfolio metrics snapshot tables
+
+Revision ID: 20260315_0004
+Revises: 20260301_0003
+Create Date: 2026-03-15 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260315_0004"
+down_revision = "20260301_0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "portfolio_metrics_snapshot",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("account", sa.String(length=64), nullable=False),
+        sa.Column("metric_date", sa.Date(), nullable=False),
+        sa.Column("market_value", sa.Double(), nullable=False),
+        sa.Column("total_pnl", sa.Double(), nullable=False),
+        sa.Column("daily_return", sa.Double(), nullable=False),
+        sa.Column("drawdown", sa.Double(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.UniqueConstraint(
+            "account", "metric_date", name="uq_portfolio_metrics_snapshot_account_date"
+        ),
+    )
+    op.create_index(
+        "ix_portfolio_metrics_snapshot_account", "portfolio_metrics_snapshot", ["account"]
+    )
+    op.create_index(
+        "ix_portfolio_metrics_snapshot_metric_date", "portfolio_metrics_snapshot", ["metric_date"]
+    )
+
+    op.create_table(
+        "portfolio_metrics_state",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("account", sa.String(length=64), nullable=False),
+        sa.Column("computed_through", sa.Date(), nullable=False),
+        sa.Column("dirty_from", sa.Date(), nullable=True),
+        sa.Column("trade_version", sa.Integer(), nullable=True),
+        sa.Column("price_version", sa.Integer(), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.UniqueConstraint("account", name="uq_portfolio_metrics_state_account"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("portfolio_metrics_state")
+    op.drop_index(
+        "ix_portfolio_metrics_snapshot_metric_date", table_name="portfolio_metrics_snapshot"
+    )
+    op.drop_index("ix_portfolio_metrics_snapshot_account", table_name="portfolio_metrics_snapshot")
+    op.drop_table("portfolio_metrics_snapshot")
@@ -0,0 +1,39 @@
+"""create price coverage table
+
+Revision ID: 20260401_0005
+Revises: 20260315_0004
+Create Date: 2026-04-01 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260401_0005"
+down_revision = "20260315_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "price_coverage",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("symbol", sa.String(length=32), nullable=False),
+        sa.Column("source", sa.String(length=64), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column(
+            "fetched_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+    op.create_index("ix_price_coverage_symbol", "price_coverage", ["symbol"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_price_coverage_symbol", table_name="price_coverage")
+    op.drop_table("price_coverage")
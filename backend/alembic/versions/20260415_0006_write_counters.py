@@ -0,0 +1,28 @@
+"""create write counters table
+
+Revision ID: 20260415_0006
+Revises: 20260401_0005
+Create Date: 2026-04-15 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260415_0006"
+down_revision = "20260401_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "write_counters",
+        sa.Column("name", sa.String(length=64), primary_key=True),
+        sa.Column("value", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("write_counters")
@@ -1,8 +1,13 @@
+from collections.abc import Iterator
+from dataclasses import asdict
 from datetime import date, timedelta
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.api.ndjson import ndjson_response, wants_ndjson
 from app.db import get_db
 from app.schemas import (
     CompanyCompareRequest,
@@ -10,13 +15,25 @@ from app.schemas import (
     CompanySymbolSearchItem,
     CompanySymbolSearchResponse,
 )
-from app.services.companies import compare_companies, search_company_symbols
+from app.services.companies import CompanyCompareResult, compare_companies, search_company_symbols
 
 router = APIRouter(prefix="/v1/companies", tags=["companies"])
 
 
 @router.post("/compare", response_model=CompanyCompareResponse)
-def compare_companies_endpoint(request: CompanyCompareRequest, db: Session = Depends(get_db)) -> CompanyCompareResponse:
+def compare_companies_endpoint(
+    request: CompanyCompareRequest,
+    http_request: Request,
+    stream: bool = False,
+    series_format: Literal["rows", "columnar"] = Query("rows", alias="format"),
+    db: Session = Depends(get_db),
+) -> CompanyCompareResponse | StreamingResponse | JSONResponse:
+    streaming = wants_ndjson(http_request, stream)
+    if streaming and series_format == "columnar":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="format=columnar cannot be streamed"
+        )
+
     effective_end = request.end_date or date.today()
     effective_start = request.start_date or (effective_end - timedelta(days=180))
 
@@ -31,6 +48,11 @@ def compare_companies_endpoint(request: CompanyCompareRequest, db: Session = Dep
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
+    if streaming:
+        return ndjson_response(_compare_lines(result))
+    if series_format == "columnar":
+        return JSONResponse(_compare_columns(result))
+
     return CompanyCompareResponse(
         start_date=result.start_date,
         end_date=result.end_date,
@@ -43,7 +65,7 @@ def compare_companies_endpoint(request: CompanyCompareRequest, db: Session = Dep
                 "prices": point.prices,
                 "normalized": point.normalized,
             }
-            for point in result.series
+            for point in result.iter_series()
         ],
         summary=[
             {
@@ -61,6 +83,38 @@ def compare_companies_endpoint(request: CompanyCompareRequest, db: Session = Dep
     )
 
 
+def _compare_summary(result: CompanyCompareResult) -> dict:
+    return {
+        "start_date": result.start_date.isoformat(),
+        "end_date": result.end_date.isoformat(),
+        "symbols": result.symbols,
+        "providers_used": result.providers_used,
+        "failed_symbols": result.failed_symbols,
+        "summary": [asdict(item) for item in result.summary],
+        "correlation": result.correlation,
+    }
+
+
+def _compare_columns(result: CompanyCompareResult) -> dict:
+    # Built straight from the price matrix and returned as a plain JSONResponse, skipping
+    # per-point model validation.
+    prices, normalized = result.columns()
+    return {
+        **_compare_summary(result),
+        "series": {
+            "date": [dt.isoformat() for dt in result.dates],
+            "prices": prices,
+            "normalized": normalized,
+        },
+    }
+
+
+def _compare_lines(result: CompanyCompareResult) -> Iterator[dict]:
+    yield {"type": "summary", **_compare_summary(result)}
+    for point in result.iter_series():
+        yield {"type": "point", **asdict(point)}
+
+
 @router.get("/search", response_model=CompanySymbolSearchResponse)
 def search_companies_endpoint(q: str = Query(..., min_length=2, max_length=80)) -> CompanySymbolSearchResponse:
     try:
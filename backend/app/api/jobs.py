@@ -0,0 +1,27 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.models import JobRun
+from app.schemas import JobRunResponse
+
+router = APIRouter(prefix="/v1/jobs", tags=["jobs"])
+
+
+@router.get("/{job_run_id}", response_model=JobRunResponse)
+def get_job_run(job_run_id: int, db: Session = Depends(get_db)) -> JobRunResponse:
+    job_run = db.get(JobRun, job_run_id)
+    if job_run is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job run not found")
+
+    return JobRunResponse(
+        id=job_run.id,
+        job_name=job_run.job_name,
+        status=job_run.status,
+        started_at=job_run.started_at,
+        finished_at=job_run.finished_at,
+        rows_processed=job_run.rows_processed,
+        details=json.loads(job_run.run_details) if job_run.run_details else None,
+    )
@@ -0,0 +1,27 @@
+import json
+from collections.abc import Iterable
+from datetime import date
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request: Request, stream: bool) -> bool:
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def ndjson_response(lines: Iterable[dict[str, Any]]) -> StreamingResponse:
+    # Lines are encoded as they are pulled, so only one record is held in memory at a time.
+    return StreamingResponse(
+        (json.dumps(line, default=_default, separators=(",", ":")) + "\n" for line in lines),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
@@ -1,13 +1,35 @@
+from collections.abc import Iterator
+from dataclasses import asdict
 from datetime import date
 from decimal import Decimal
+from typing import Literal
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.api.ndjson import ndjson_response, wants_ndjson
 from app.db import get_db
-from app.schemas import AnalyticsPointResponse, AnalyticsResponse, MetricsResponse, PositionItem, PositionsResponse
-from app.services.analytics import calculate_analytics
+from app.schemas import (
+    AnalyticsBatchRequest,
+    AnalyticsBatchResponse,
+    AnalyticsPointResponse,
+    AnalyticsResponse,
+    MetricsResponse,
+    PositionItem,
+    PositionSnapshotResponse,
+    PositionsResponse,
+)
+from app.services.analytics import (
+    AnalyticsResult,
+    AnalyticsSeries,
+    AnalyticsSummary,
+    build_analytics_result,
+    calculate_batch_analytics,
+)
+from app.services.metrics_snapshot import read_portfolio_series
 from app.services.portfolio import calculate_positions
+from app.services.snapshots import write_position_snapshot
 
 router = APIRouter(prefix="/v1", tags=["portfolio"])
 
@@ -42,6 +64,21 @@ def get_positions(
     )
 
 
+@router.post("/positions/snapshot", response_model=PositionSnapshotResponse)
+def create_position_snapshot(
+    snapshot_date: date | None = None,
+    db: Session = Depends(get_db),
+) -> PositionSnapshotResponse:
+    effective_date = snapshot_date or date.today()
+    result = write_position_snapshot(db=db, snapshot_date=effective_date)
+
+    return PositionSnapshotResponse(
+        snapshot_date=result.snapshot_date,
+        rows_written=result.rows_written,
+        job_run_id=result.job_run_id,
+    )
+
+
 @router.get("/metrics", response_model=MetricsResponse)
 def get_metrics(
     snapshot_date: date | None = None,
@@ -89,19 +126,95 @@ def get_metrics(
 
 @router.get("/analytics", response_model=AnalyticsResponse)
 def get_analytics(
+    request: Request,
     snapshot_date: date | None = None,
     start_date: date | None = None,
     account: str | None = None,
+    stream: bool = False,
+    series_format: Literal["rows", "columnar"] = Query("rows", alias="format"),
     db: Session = Depends(get_db),
-) -> AnalyticsResponse:
+) -> AnalyticsResponse | StreamingResponse | JSONResponse:
+    streaming = wants_ndjson(request, stream)
+    if streaming and series_format == "columnar":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="format=columnar cannot be streamed"
+        )
+
     effective_snapshot = snapshot_date or date.today()
-    result = calculate_analytics(
+    series = read_portfolio_series(
         db=db,
         snapshot_date=effective_snapshot,
         account=account,
         start_date=start_date,
     )
 
+    if streaming:
+        return ndjson_response(_analytics_lines(series))
+    if series_format == "columnar":
+        return JSONResponse(_analytics_columns(series))
+    return _analytics_response(build_analytics_result(series))
+
+
+@router.post("/analytics/batch", response_model=AnalyticsBatchResponse)
+def get_batch_analytics(
+    request: AnalyticsBatchRequest, db: Session = Depends(get_db)
+) -> AnalyticsBatchResponse:
+    effective_snapshot = request.snapshot_date or date.today()
+    try:
+        result = calculate_batch_analytics(
+            db=db,
+            snapshot_date=effective_snapshot,
+            accounts=request.accounts,
+            start_date=request.start_date,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    return AnalyticsBatchResponse(
+        snapshot_date=result.snapshot_date,
+        results=[_analytics_response(item) for item in result.results],
+    )
+
+
+def _analytics_lines(series: AnalyticsSeries) -> Iterator[dict]:
+    # The totals are already in memory, so the summary is computed from a first pass over the
+    # points and sent first, as compare does; the points are derived again as they stream.
+    summary = AnalyticsSummary(series)
+    for point in series.points():
+        summary.add(point)
+    fields = asdict(summary.result())
+    del fields["series"]
+    yield {"type": "summary", **fields}
+    for point in series.points():
+        yield {"type": "point", **asdict(point)}
+
+
+def _analytics_columns(series: AnalyticsSeries) -> dict:
+    # Parallel arrays per metric, returned as a plain JSONResponse without per-point validation.
+    summary = AnalyticsSummary(series)
+    columns: dict[str, list] = {
+        "date": [],
+        "market_value": [],
+        "total_pnl": [],
+        "daily_return": [],
+        "cumulative_return": [],
+        "drawdown": [],
+    }
+    for point in series.points():
+        summary.add(point)
+        columns["date"].append(point.date.isoformat())
+        columns["market_value"].append(point.market_value)
+        columns["total_pnl"].append(point.total_pnl)
+        columns["daily_return"].append(point.daily_return)
+        columns["cumulative_return"].append(point.cumulative_return)
+        columns["drawdown"].append(point.drawdown)
+    fields = asdict(summary.result())
+    fields["snapshot_date"] = fields["snapshot_date"].isoformat()
+    fields["start_date"] = fields["start_date"].isoformat()
+    return {**fields, "series": columns}
+
+
+def _analytics_response(result: AnalyticsResult) -> AnalyticsResponse:
     return AnalyticsResponse(
         snapshot_date=result.snapshot_date,
         start_date=result.start_date,
@@ -1,17 +1,28 @@
+from dataclasses import asdict
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.db import get_db
-from app.schemas import PriceRefreshRequest, PriceRefreshResponse
+from app.market_data.factory import AVAILABLE_PROVIDERS
+from app.market_data.health import get_provider_health
+from app.schemas import (
+    PriceRefreshRequest,
+    PriceRefreshResponse,
+    ProviderHealthItem,
+    ProviderHealthResponse,
+)
+from app.services.metrics_snapshot import run_metrics_refresh
 from app.services.pricing import refresh_prices
 
 router = APIRouter(prefix="/v1/prices", tags=["prices"])
 
 
 @router.post("/refresh", response_model=PriceRefreshResponse)
-def refresh_prices_endpoint(request: PriceRefreshRequest, db: Session = Depends(get_db)) -> PriceRefreshResponse:
+def refresh_prices_endpoint(
+    request: PriceRefreshRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+) -> PriceRefreshResponse:
     effective_date = request.price_date or date.today()
 
     try:
@@ -23,6 +34,7 @@ def refresh_prices_endpoint(request: PriceRefreshRequest, db: Session = Depends(
         )
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    background_tasks.add_task(run_metrics_refresh, db.get_bind())
 
     return PriceRefreshResponse(
         provider=result.provider,
@@ -33,3 +45,13 @@ def refresh_prices_endpoint(request: PriceRefreshRequest, db: Session = Depends(
         failed_symbols=result.failed_symbols,
         job_run_id=result.job_run_id,
     )
+
+
+@router.get("/providers/health", response_model=ProviderHealthResponse)
+def provider_health_endpoint() -> ProviderHealthResponse:
+    return ProviderHealthResponse(
+        providers=[
+            ProviderHealthItem(**asdict(get_provider_health(name).snapshot()))
+            for name in AVAILABLE_PROVIDERS
+        ]
+    )
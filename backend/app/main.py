@@ -1,3 +1,5 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -6,12 +8,28 @@ from fastapi.staticfiles import StaticFiles
 
 from app.api.ai import router as ai_router
 from app.api.companies import router as companies_router
+from app.api.jobs import router as jobs_router
 from app.api.portfolio import router as portfolio_router
 from app.api.prices import router as prices_router
 from app.api.trades import router as trades_router
 from app.config import settings
+from app.db import get_db
+from app.services.trade_import import recover_trade_import_jobs
 
-app = FastAPI(title="Portfolio Analytics API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    if settings.trade_import_recover_on_startup:
+        # Resolve the session through dependency overrides, so tests recover their own database.
+        sessions = app.dependency_overrides.get(get_db, get_db)()
+        try:
+            recover_trade_import_jobs(next(sessions))
+        finally:
+            sessions.close()
+    yield
+
+
+app = FastAPI(title="Portfolio Analytics API", version="0.1.0", lifespan=lifespan)
 
 allowed_origins = [origin.strip() for origin in settings.cors_allow_origins.split(",") if origin.strip()]
 app.add_middleware(
@@ -27,6 +45,7 @@ app.include_router(portfolio_router)
 app.include_router(prices_router)
 app.include_router(companies_router)
 app.include_router(ai_router)
+app.include_router(jobs_router)
 
 
 @app.get("/health")
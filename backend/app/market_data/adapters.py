@@ -0,0 +1,79 @@
+import asyncio
+from datetime import date
+from typing import Any
+
+from app.market_data.base import MarketDataProvider, PricePoint
+
+
+class SyncProviderAdapter:
+    """Gives a provider with only blocking ``fetch_*`` methods async counterparts.
+
+    The async methods run the blocking ones on a worker thread.
+    """
+
+    def __init__(self, provider: Any) -> None:
+        self.provider = provider
+
+    def fetch_eod(self, symbols: list[str], as_of_date: date) -> tuple[list[PricePoint], list[str]]:
+        return self.provider.fetch_eod(symbols, as_of_date)
+
+    def fetch_history(
+        self, symbols: list[str], start_date: date, end_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        return self.provider.fetch_history(symbols, start_date, end_date)
+
+    async def afetch_eod(
+        self, symbols: list[str], as_of_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        return await asyncio.to_thread(self.provider.fetch_eod, symbols, as_of_date)
+
+    async def afetch_history(
+        self, symbols: list[str], start_date: date, end_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        return await asyncio.to_thread(self.provider.fetch_history, symbols, start_date, end_date)
+
+
+class AsyncProviderAdapter:
+    """Gives a provider with only ``afetch_*`` coroutines blocking counterparts.
+
+    Each blocking call runs its own event loop, so it must not be made from a thread that is already
+    running one; fetch_through_chain calls providers from pool threads, which is fine.
+    """
+
+    def __init__(self, provider: Any) -> None:
+        self.provider = provider
+
+    def fetch_eod(self, symbols: list[str], as_of_date: date) -> tuple[list[PricePoint], list[str]]:
+        return asyncio.run(self.provider.afetch_eod(symbols, as_of_date))
+
+    def fetch_history(
+        self, symbols: list[str], start_date: date, end_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        return asyncio.run(self.provider.afetch_history(symbols, start_date, end_date))
+
+    async def afetch_eod(
+        self, symbols: list[str], as_of_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        return await self.provider.afetch_eod(symbols, as_of_date)
+
+    async def afetch_history(
+        self, symbols: list[str], start_date: date, end_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        return await self.provider.afetch_history(symbols, start_date, end_date)
+
+
+def adapt_provider(provider: Any) -> MarketDataProvider:
+    # Providers may implement only the methods their callers use, e.g. fetch_eod for price
+    # refreshes.
+    has_sync = hasattr(provider, "fetch_eod") or hasattr(provider, "fetch_history")
+    has_async = hasattr(provider, "afetch_eod") or hasattr(provider, "afetch_history")
+    if has_sync and has_async:
+        return provider
+    if has_sync:
+        return SyncProviderAdapter(provider)
+    if has_async:
+        return AsyncProviderAdapter(provider)
+    raise TypeError(
+        f"{type(provider).__name__} implements neither fetch_eod/fetch_history "
+        "nor afetch_eod/afetch_history"
+    )
@@ -18,3 +18,13 @@ class MarketDataProvider(Protocol):
 
     def fetch_history(self, symbols: list[str], start_date: date, end_date: date) -> tuple[list[PricePoint], list[str]]:
         ...
+
+    async def afetch_eod(
+        self, symbols: list[str], as_of_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        ...
+
+    async def afetch_history(
+        self, symbols: list[str], start_date: date, end_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        ...
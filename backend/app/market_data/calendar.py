@@ -0,0 +1,140 @@
+from collections.abc import Iterable
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+
+from app.config import settings
+
+TRADING_CALENDARS = ("NYSE", "WEEKDAYS")
+HOLIDAY_YEARS = (1990, 2099)
+# Unscheduled NYSE closures: 9/11, state funerals, Hurricane Sandy.
+NYSE_SPECIAL_CLOSURES = (
+    "1994-04-27",
+    "2001-09-11",
+    "2001-09-12",
+    "2001-09-13",
+    "2001-09-14",
+    "2004-06-11",
+    "2007-01-02",
+    "2012-10-29",
+    "2012-10-30",
+    "2018-12-05",
+    "2025-01-09",
+)
+
+
+def _month_starts(years: np.ndarray, month: int) -> np.ndarray:
+    return ((years - 1970) * 12 + month - 1).astype("datetime64[M]").astype("datetime64[D]")
+
+
+def _nth_weekday(years: np.ndarray, month: int, weekday: str, n: int) -> np.ndarray:
+    return np.busday_offset(_month_starts(years, month), n - 1, roll="forward", weekmask=weekday)
+
+
+def _last_weekday(years: np.ndarray, month: int, weekday: str) -> np.ndarray:
+    return np.busday_offset(
+        _month_starts(years, month + 1) - 1, 0, roll="backward", weekmask=weekday
+    )
+
+
+def _weekdays(days: np.ndarray) -> np.ndarray:
+    # 1970-01-01 was a Thursday; Monday is 0.
+    return (days.astype(np.int64) + 3) % 7
+
+
+def _observed(days: np.ndarray) -> np.ndarray:
+    """Saturday holidays move to Friday and Sunday holidays to Monday."""
+    weekdays = _weekdays(days)
+    return days + np.where(weekdays == 5, -1, 0) + np.where(weekdays == 6, 1, 0)
+
+
+def _easter_sundays(years: np.ndarray) -> np.ndarray:
+    # Anonymous Gregorian algorithm.
+    a, b, c = years % 19, years // 100, years % 100
+    d, e = b // 4, b % 4
+    g = (b - (b + 8) // 25 + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    weeks = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * weeks) // 451
+    month = (h + weeks - 7 * m + 114) // 31
+    day = (h + weeks - 7 * m + 114) % 31 + 1
+    return _month_starts(years, month) + (day - 1)
+
+
+def nyse_holidays(
+    first_year: int = HOLIDAY_YEARS[0], last_year: int = HOLIDAY_YEARS[1]
+) -> np.ndarray:
+    """NYSE full-day closures in ``first_year..last_year`` as sorted datetime64[D]."""
+    years = np.arange(first_year, last_year + 1)
+    new_years = _month_starts(years, 1)
+    # The exchange does not close on a Friday Dec 31 for a Saturday New Year's Day.
+    new_years = _observed(new_years[_weekdays(new_years) != 5])
+    juneteenth_years = years[years >= 2022]
+    special = np.array(NYSE_SPECIAL_CLOSURES, dtype="datetime64[D]")
+    special_years = special.astype("datetime64[Y]").astype(np.int64) + 1970
+    holidays = [
+        new_years,
+        _nth_weekday(years[years >= 1998], 1, "Mon", 3),
+        _nth_weekday(years, 2, "Mon", 3),
+        _easter_sundays(years) - 2,
+        _last_weekday(years, 5, "Mon"),
+        _observed(_month_starts(juneteenth_years, 6) + 18),
+        _observed(_month_starts(years, 7) + 3),
+        _nth_weekday(years, 9, "Mon", 1),
+        _nth_weekday(years, 11, "Thu", 4),
+        _observed(_month_starts(years, 12) + 24),
+        special[(special_years >= first_year) & (special_years <= last_year)],
+    ]
+    return np.unique(np.concatenate(holidays))
+
+
+class TradingCalendar:
+    """Trading days of one market: Monday to Friday minus its holidays.
+
+    ``busdaycal`` plugs straight into ``np.busday_count``, ``np.busday_offset`` and ``np.is_busday``
+    for vectorized business-day arithmetic; the methods cover the scalar cases.
+    """
+
+    def __init__(self, name: str, holidays: np.ndarray) -> None:
+        self.name = name
+        self.holidays = np.unique(np.asarray(holidays, dtype="datetime64[D]"))
+        self.busdaycal = np.busdaycalendar(weekmask="1111100", holidays=self.holidays)
+
+    def is_trading_day(self, day: date) -> bool:
+        return bool(np.is_busday(np.datetime64(day, "D"), busdaycal=self.busdaycal))
+
+    def trading_days(self, start_date: date, end_date: date) -> np.ndarray:
+        """Trading days in ``start_date..end_date`` inclusive, as datetime64[D]."""
+        days = np.arange(np.datetime64(start_date, "D"), np.datetime64(end_date, "D") + 1)
+        return days[np.is_busday(days, busdaycal=self.busdaycal)]
+
+    def trading_dates(self, dates: Iterable[date]) -> set[date]:
+        """The members of ``dates`` that are trading days."""
+        days = np.array(sorted(set(dates)), dtype="datetime64[D]")
+        return set(days[np.is_busday(days, busdaycal=self.busdaycal)].astype(date).tolist())
+
+    def previous_trading_day(self, day: date) -> date:
+        """``day`` itself when it is a trading day, otherwise the last trading day before it."""
+        day64 = np.datetime64(day, "D")
+        return np.busday_offset(day64, 0, roll="backward", busdaycal=self.busdaycal).astype(date)
+
+    def next_trading_day(self, day: date) -> date:
+        """``day`` itself when it is a trading day, otherwise the first trading day after it."""
+        day64 = np.datetime64(day, "D")
+        return np.busday_offset(day64, 0, roll="forward", busdaycal=self.busdaycal).astype(date)
+
+
+@lru_cache
+def _build_calendar(name: str) -> TradingCalendar:
+    if name == "NYSE":
+        return TradingCalendar(name, nyse_holidays())
+    return TradingCalendar(name, np.array([], dtype="datetime64[D]"))
+
+
+def get_calendar(name: str | None = None) -> TradingCalendar:
+    key = (name or settings.trading_calendar).strip().upper()
+    if key not in TRADING_CALENDARS:
+        raise ValueError(f"Unsupported trading calendar: {key}")
+    return _build_calendar(key)
@@ -1,9 +1,10 @@
 from app.config import settings
 from app.market_data.base import MarketDataProvider
 from app.market_data.providers.demo import DemoMarketDataProvider
+from app.market_data.providers.localfile import LocalFileMarketDataProvider
 from app.market_data.providers.yfinance_provider import YFinanceMarketDataProvider
 
-AVAILABLE_PROVIDERS = ("demo", "yfinance")
+AVAILABLE_PROVIDERS = ("demo", "yfinance", "localfile")
 
 
 def get_market_data_provider(provider_name: str | None = None) -> MarketDataProvider:
@@ -13,6 +14,8 @@ def get_market_data_provider(provider_name: str | None = None) -> MarketDataProv
         return DemoMarketDataProvider()
     if provider == "yfinance":
         return YFinanceMarketDataProvider()
+    if provider == "localfile":
+        return LocalFileMarketDataProvider()
 
     raise ValueError(f"Unsupported market data provider: {provider}")
 
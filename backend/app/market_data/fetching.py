@@ -0,0 +1,333 @@
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.config import settings
+from app.market_data.adapters import adapt_provider
+from app.market_data.base import MarketDataProvider, PricePoint
+from app.market_data.factory import get_market_data_provider
+from app.market_data.health import get_provider_health
+
+ChunkFetch = Callable[[MarketDataProvider, list[str]], tuple[list[PricePoint], list[str]]]
+AsyncChunkFetch = Callable[
+    [MarketDataProvider, list[str]], Awaitable[tuple[list[PricePoint], list[str]]]
+]
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second on average, with bursts of up to ``capacity``."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token and return 0, or return how long to wait before trying again."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> None:
+        while (delay := self._take()) > 0:
+            self._sleep(delay)
+
+    async def aacquire(self) -> None:
+        while (delay := self._take()) > 0:
+            await asyncio.sleep(delay)
+
+
+def parse_rate_limits(value: str) -> dict[str, float]:
+    limits: dict[str, float] = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, rate = item.partition("=")
+        try:
+            limits[name.strip().lower()] = float(rate)
+        except ValueError:
+            raise ValueError(f"Invalid provider rate limit: {item.strip()}") from None
+    return limits
+
+
+_limiters: dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider_name: str) -> TokenBucket | None:
+    # Shared by every refresh in the process, so concurrent requests stay under the same limit.
+    rate = parse_rate_limits(settings.price_provider_rate_limits).get(provider_name)
+    if not rate or rate <= 0:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(provider_name)
+        if limiter is None or limiter.rate != rate:
+            limiter = TokenBucket(rate)
+            _limiters[provider_name] = limiter
+        return limiter
+
+
+@dataclass
+class ChainFetchResult:
+    points: list[tuple[str, PricePoint]] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+
+
+@dataclass(eq=False)
+class _Chunk:
+    symbols: list[str]
+    level: int
+    # Set when the first attempt gets past the breaker and rate limiter, so queued chunks are not
+    # hedged.
+    started: float | None = None
+    hedged: bool = False
+    done: bool = False
+
+
+class _ChainRun:
+    """Chunk bookkeeping shared by the thread-pool and event-loop chain fetchers.
+
+    ``launch(name, provider, chunk, level)`` starts one attempt and returns a handle (a future or a
+    task). A chunk resolves with its first finished attempt; any other attempt is discarded.
+    """
+
+    def __init__(
+        self,
+        providers: list[tuple[str, MarketDataProvider]],
+        chunk_size: int,
+        hedge_after: float,
+        launch: Callable[[str, MarketDataProvider, _Chunk, int], Any],
+    ) -> None:
+        self.providers = providers
+        self.chunk_size = chunk_size
+        self.hedge_after = hedge_after
+        self._launch = launch
+        self.result = ChainFetchResult()
+        self.in_flight: dict[Any, tuple[_Chunk, int]] = {}
+
+    def submit(self, level: int, pending: list[str]) -> None:
+        for offset in range(0, len(pending), self.chunk_size):
+            chunk = _Chunk(symbols=pending[offset : offset + self.chunk_size], level=level)
+            self._attempt(chunk, level)
+
+    def _attempt(self, chunk: _Chunk, level: int) -> None:
+        name, provider = self.providers[level]
+        self.in_flight[self._launch(name, provider, chunk, level)] = (chunk, level)
+
+    def complete(self, handle: Any, points: list[PricePoint], failed: list[str]) -> list[Any]:
+        """Record a finished attempt; returns the handles of attempts it made redundant."""
+        chunk, level = self.in_flight.pop(handle)
+        if chunk.done:
+            return []
+        chunk.done = True
+        losers = [
+            other for other, (other_chunk, _) in self.in_flight.items() if other_chunk is chunk
+        ]
+        for other in losers:
+            del self.in_flight[other]
+
+        self.result.points.extend((self.providers[level][0], point) for point in points)
+        failed_set = set(failed)
+        retry = [symbol for symbol in chunk.symbols if symbol in failed_set]
+        if retry and level + 1 < len(self.providers):
+            self.submit(level + 1, retry)
+        else:
+            self.result.failed.extend(retry)
+        return losers
+
+    def _hedgeable(self) -> list[_Chunk]:
+        if not self.hedge_after:
+            return []
+        return [
+            chunk
+            for chunk, level in self.in_flight.values()
+            if level == chunk.level and not chunk.hedged and level + 1 < len(self.providers)
+        ]
+
+    def hedge_due(self) -> None:
+        now = time.monotonic()
+        for chunk in self._hedgeable():
+            if chunk.started is not None and now - chunk.started >= self.hedge_after:
+                chunk.hedged = True
+                get_provider_health(self.providers[chunk.level][0]).record_hedge()
+                self._attempt(chunk, chunk.level + 1)
+
+    def wait_timeout(self) -> float | None:
+        """Seconds until the next chunk could need a hedge; None when nothing can be hedged."""
+        now = time.monotonic()
+        deadlines = [
+            self.hedge_after if chunk.started is None else chunk.started + self.hedge_after - now
+            for chunk in self._hedgeable()
+        ]
+        return max(0.0, min(deadlines)) if deadlines else None
+
+
+def _hedge_after() -> float:
+    return max(0, settings.price_fetch_hedge_after_ms) / 1000
+
+
+def _fetch_chunk(
+    provider_name: str,
+    provider: MarketDataProvider,
+    symbols: list[str],
+    fetch: ChunkFetch,
+    timed: _Chunk | None = None,
+) -> tuple[list[PricePoint], list[str]]:
+    health = get_provider_health(provider_name)
+    if not health.allow():
+        return [], list(symbols)
+    limiter = get_rate_limiter(provider_name)
+    if limiter is not None:
+        limiter.acquire()
+    started = time.monotonic()
+    if timed is not None:
+        timed.started = started
+    try:
+        result = fetch(provider, symbols)
+    except Exception:  # noqa: BLE001 - any provider error fails the chunk over to the next provider
+        health.record_failure(time.monotonic() - started)
+        return [], list(symbols)
+    health.record_success(time.monotonic() - started)
+    return result
+
+
+def fetch_through_chain(
+    provider_chain: list[str],
+    symbols: list[str],
+    fetch: ChunkFetch,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+) -> ChainFetchResult:
+    """Fetch ``symbols`` in chunks on a thread pool, falling back along ``provider_chain``.
+
+    Symbols a provider reports as failed are resubmitted to the next provider as soon as their
+    chunk finishes. Symbols a provider neither returns nor reports as failed are dropped, as before.
+    Providers whose circuit breaker is open are skipped. With ``PRICE_FETCH_HEDGE_AFTER_MS`` set, a
+    chunk still running after that long is also sent to the next provider, and the first answer
+    wins.
+    """
+    workers = workers or settings.price_fetch_workers
+    chunk_size = chunk_size or settings.price_fetch_chunk_size
+    providers = [(name, adapt_provider(get_market_data_provider(name))) for name in provider_chain]
+    if not providers or not symbols:
+        return ChainFetchResult(failed=list(symbols))
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+
+    def launch(name: str, provider: MarketDataProvider, chunk: _Chunk, level: int) -> Future:
+        return pool.submit(
+            _fetch_chunk,
+            name,
+            provider,
+            chunk.symbols,
+            fetch,
+            chunk if level == chunk.level else None,
+        )
+
+    run = _ChainRun(providers, chunk_size, _hedge_after(), launch)
+    try:
+        run.submit(0, list(symbols))
+        while run.in_flight:
+            done, _ = wait(run.in_flight, timeout=run.wait_timeout(), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in run.in_flight:
+                    for loser in run.complete(future, *future.result()):
+                        loser.cancel()
+            run.hedge_due()
+    finally:
+        # Discarded hedge attempts may still be running; they finish in the background.
+        pool.shutdown(wait=False, cancel_futures=True)
+    return run.result
+
+
+async def _afetch_chunk(
+    provider_name: str,
+    provider: MarketDataProvider,
+    symbols: list[str],
+    fetch: AsyncChunkFetch,
+    semaphore: asyncio.Semaphore,
+    timed: _Chunk | None = None,
+) -> tuple[list[PricePoint], list[str]]:
+    async with semaphore:
+        health = get_provider_health(provider_name)
+        if not health.allow():
+            return [], list(symbols)
+        started = time.monotonic()
+        try:
+            limiter = get_rate_limiter(provider_name)
+            if limiter is not None:
+                await limiter.aacquire()
+            started = time.monotonic()
+            if timed is not None:
+                timed.started = started
+            result = await fetch(provider, symbols)
+        except asyncio.CancelledError:
+            health.release()
+            raise
+        except Exception:  # noqa: BLE001 - as in _fetch_chunk
+            health.record_failure(time.monotonic() - started)
+            return [], list(symbols)
+        health.record_success(time.monotonic() - started)
+        return result
+
+
+async def afetch_through_chain(
+    provider_chain: list[str],
+    symbols: list[str],
+    fetch: AsyncChunkFetch,
+    concurrency: int | None = None,
+    chunk_size: int | None = None,
+) -> ChainFetchResult:
+    """Async counterpart of ``fetch_through_chain``: each chunk is a task on the running event loop.
+
+    At most ``concurrency`` chunks (``PRICE_FETCH_WORKERS`` by default) are awaited at once. Failed
+    symbols, open breakers and hedging are handled the same way; losing hedge attempts are
+    cancelled.
+    """
+    concurrency = concurrency or settings.price_fetch_workers
+    chunk_size = chunk_size or settings.price_fetch_chunk_size
+    providers = [(name, adapt_provider(get_market_data_provider(name))) for name in provider_chain]
+    if not providers or not symbols:
+        return ChainFetchResult(failed=list(symbols))
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    def launch(name: str, provider: MarketDataProvider, chunk: _Chunk, level: int) -> asyncio.Task:
+        timed = chunk if level == chunk.level else None
+        return asyncio.create_task(
+            _afetch_chunk(name, provider, chunk.symbols, fetch, semaphore, timed)
+        )
+
+    run = _ChainRun(providers, chunk_size, _hedge_after(), launch)
+    run.submit(0, list(symbols))
+    while run.in_flight:
+        done, _ = await asyncio.wait(
+            run.in_flight, timeout=run.wait_timeout(), return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in done:
+            if task in run.in_flight:
+                for loser in run.complete(task, *task.result()):
+                    loser.cancel()
+        run.hedge_due()
+    return run.result
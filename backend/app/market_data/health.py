@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class ProviderHealthSnapshot:
+    provider: str
+    state: str
+    consecutive_failures: int
+    calls: int
+    failures: int
+    skipped_calls: int
+    hedged_calls: int
+    latency_p50_ms: float | None
+    latency_p95_ms: float | None
+    retry_in_seconds: float | None
+
+
+class ProviderHealth:
+    """Call outcomes and latencies for one provider, with a circuit breaker.
+
+    After ``failure_threshold`` consecutive failed calls the breaker opens and ``allow`` refuses
+    calls for ``cooldown_seconds``. The first call after the cool-down is a trial: success closes
+    the breaker, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        cooldown_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+        window: int = 200,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=window)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.calls = 0
+        self.failures = 0
+        self.skipped_calls = 0
+        self.hedged_calls = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == OPEN:
+                if self._clock() - self._opened_at < self.cooldown_seconds:
+                    self.skipped_calls += 1
+                    return False
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == HALF_OPEN:
+                if self._trial_in_flight:
+                    self.skipped_calls += 1
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def release(self) -> None:
+        """Give back an allowed call that never ran to completion, e.g. a cancelled hedge loser."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self._latencies.append(latency)
+            self.consecutive_failures = 0
+            self.state = CLOSED
+            self._trial_in_flight = False
+
+    def record_failure(self, latency: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            self._latencies.append(latency)
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = OPEN
+                self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+    def record_hedge(self) -> None:
+        with self._lock:
+            self.hedged_calls += 1
+
+    def snapshot(self) -> ProviderHealthSnapshot:
+        with self._lock:
+            latencies = np.array(self._latencies)
+            p50, p95 = np.percentile(latencies, [50, 95]) * 1000 if latencies.size else (None, None)
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self._opened_at + self.cooldown_seconds - self._clock())
+            return ProviderHealthSnapshot(
+                provider=self.name,
+                state=self.state,
+                consecutive_failures=self.consecutive_failures,
+                calls=self.calls,
+                failures=self.failures,
+                skipped_calls=self.skipped_calls,
+                hedged_calls=self.hedged_calls,
+                latency_p50_ms=None if p50 is None else float(p50),
+                latency_p95_ms=None if p95 is None else float(p95),
+                retry_in_seconds=retry_in,
+            )
+
+
+_health: dict[str, ProviderHealth] = {}
+_health_lock = threading.Lock()
+
+
+def get_provider_health(provider_name: str) -> ProviderHealth:
+    # Shared by every fetch in the process, like the rate limiters, so one request's failures
+    # spare the next request the wait.
+    with _health_lock:
+        health = _health.get(provider_name)
+        if health is None:
+            health = ProviderHealth(
+                provider_name,
+                settings.provider_breaker_failures,
+                settings.provider_breaker_cooldown_seconds,
+            )
+            _health[provider_name] = health
+        health.failure_threshold = settings.provider_breaker_failures
+        health.cooldown_seconds = settings.provider_breaker_cooldown_seconds
+        return health
+
+
+def reset_provider_health() -> None:
+    with _health_lock:
+        _health.clear()
@@ -1,11 +1,165 @@
+import zlib
 from datetime import date
 from decimal import Decimal
 
+import numpy as np
+
+from app.config import settings
 from app.market_data.base import PricePoint
+from app.market_data.calendar import get_calendar
+
+DEMO_PRICE_MODELS = ("simple", "gbm")
+GBM_EPOCH_YEAR = 2000
+TRADING_DAYS_PER_YEAR = 252
+# One day code per (year, business day of year); day 0 is the year's own anchor draw.
+_DAYS_PER_YEAR_CODE = 512
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer: decorrelates uint64 keys so each key is an independent uniform draw."""
+    with np.errstate(over="ignore"):
+        values = values + np.uint64(0x9E3779B97F4A7C15)
+        values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def _uniforms(keys: np.ndarray) -> np.ndarray:
+    return (_mix(keys) >> np.uint64(11)).astype(np.float64) * 2.0**-53
+
+
+def _normal_pairs(keys: np.ndarray) -> np.ndarray:
+    """Two independent standard normals per uint64 key (Box-Muller), as a trailing axis of 2."""
+    first = _mix(keys)
+    radius = np.sqrt(-2.0 * np.log(((first >> np.uint64(11)).astype(np.float64) + 1.0) * 2.0**-53))
+    angle = 2.0 * np.pi * _uniforms(first ^ np.uint64(0xD1B54A32D192ED03))
+    return np.stack([radius * np.cos(angle), radius * np.sin(angle)], axis=-1)
+
+
+def _year_starts(first_year: int, last_year: int) -> np.ndarray:
+    years = np.arange(first_year, last_year + 2).astype(str)
+    return years.astype("datetime64[Y]").astype("datetime64[D]")
+
+
+def generate_gbm_closes(
+    symbols: list[str], start_date: date, end_date: date
+) -> tuple[np.ndarray, np.ndarray]:
+    """Seeded geometric Brownian motion closes on the trading calendar's days.
+
+    Returns the trading days in ``start_date..end_date`` (datetime64[D]) and a symbols x days
+    float64 matrix. Each symbol gets its own 2000 start price, drift and volatility from its name
+    and ``DEMO_SEED``. Year-end prices come from a yearly GBM step and each year is filled in with a
+    Brownian bridge, so a close depends only on (symbol, date): any window of the same series
+    agrees with any other, without generating the days before it. Days before 2000 are not
+    generated.
+    """
+    calendar = get_calendar()
+    start_date = max(start_date, date(GBM_EPOCH_YEAR, 1, 1))
+    days = calendar.trading_days(start_date, end_date)
+    if not symbols or not len(days):
+        return days, np.empty((len(symbols), len(days)))
+
+    seeds = np.array(
+        [zlib.crc32(symbol.encode()) | (settings.demo_seed << 32) for symbol in symbols],
+        dtype=np.uint64,
+    )[:, None]
+    start_price = 20 + 200 * _uniforms(seeds ^ np.uint64(1))
+    drift = -0.05 + 0.20 * _uniforms(seeds ^ np.uint64(2))
+    volatility = 0.15 + 0.20 * _uniforms(seeds ^ np.uint64(3))
+    dt = 1 / TRADING_DAYS_PER_YEAR
+
+    # Log price at the start of every year from the epoch through the last requested year.
+    last_year = int(str(days[-1].astype("datetime64[Y]")))
+    bounds = _year_starts(GBM_EPOCH_YEAR, last_year)
+    year_days = np.busday_count(bounds[:-1], bounds[1:], busdaycal=calendar.busdaycal)
+    year_codes = (
+        np.arange(GBM_EPOCH_YEAR, last_year + 1, dtype=np.uint64) * np.uint64(_DAYS_PER_YEAR_CODE)
+    )[None, :]
+    year_shocks = _normal_pairs(seeds ^ _mix(year_codes))[..., 0]
+    year_steps = (drift - volatility**2 / 2) * year_days * dt
+    year_steps += volatility * np.sqrt(year_days * dt) * year_shocks
+    anchors = np.concatenate(
+        [np.log(start_price), np.log(start_price) + np.cumsum(year_steps, axis=1)], axis=1
+    )
+
+    closes = np.empty((len(symbols), len(days)))
+    day_years = days.astype("datetime64[Y]").astype(np.int64) + 1970
+    for year in np.unique(day_years):
+        columns = np.flatnonzero(day_years == year)
+        year_index = int(year) - GBM_EPOCH_YEAR
+        count = int(year_days[year_index])
+        # Trading-day position within the year, 1..count; the year's last trading day lands on
+        # the next anchor.
+        position = np.busday_count(bounds[year_index], days[columns], busdaycal=calendar.busdaycal)
+        position += 1
+        # Each key yields the normals for two consecutive days; day codes start at 1, after the
+        # anchor's 0.
+        pair_codes = np.uint64(year) * np.uint64(_DAYS_PER_YEAR_CODE)
+        pair_codes = pair_codes + np.arange(1, (count + 1) // 2 + 1, dtype=np.uint64)
+        pairs = _normal_pairs(seeds ^ _mix(pair_codes[None, :]))
+        steps = pairs.reshape(len(symbols), -1)[:, :count]
+        walk = np.cumsum(steps, axis=1)
+        fraction = position / count
+        log_close = walk[:, position - 1]
+        log_close -= fraction * walk[:, -1:]
+        log_close *= volatility * np.sqrt(dt)
+        start = anchors[:, year_index : year_index + 1]
+        end = anchors[:, year_index + 1 : year_index + 2]
+        log_close += start + fraction * (end - start)
+        closes[:, columns] = np.exp(log_close, out=log_close)
+    return days, closes
+
+
+def _to_cents(values: np.ndarray) -> list[Decimal]:
+    return [Decimal(cents).scaleb(-2) for cents in np.rint(values * 100).astype(np.int64).tolist()]
 
 
 class DemoMarketDataProvider:
+    def __init__(self, model: str | None = None) -> None:
+        self.model = (model or settings.demo_price_model).strip().lower()
+        if self.model not in DEMO_PRICE_MODELS:
+            raise ValueError(f"Unsupported demo price model: {self.model}")
+
+    def _split(self, symbols: list[str]) -> tuple[list[str], list[str]]:
+        clean = [symbol.strip().upper() for symbol in symbols if symbol.strip()]
+        failed = [symbol for symbol in clean if symbol.startswith("XFAIL")]
+        return [symbol for symbol in clean if not symbol.startswith("XFAIL")], failed
+
+    def _fetch_eod_gbm(
+        self, symbols: list[str], as_of_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        priced, failed = self._split(symbols)
+        last_day = get_calendar().previous_trading_day(as_of_date)
+        days, closes = generate_gbm_closes(priced, last_day, last_day)
+        if not len(days):
+            # The model starts in GBM_EPOCH_YEAR; there is no close before it.
+            return [], priced + failed
+        points = [
+            PricePoint(symbol=symbol, price_date=as_of_date, close_price=close, currency="USD")
+            for symbol, close in zip(priced, _to_cents(closes[:, -1]), strict=True)
+        ]
+        return points, failed
+
+    def _fetch_history_gbm(
+        self, symbols: list[str], start_date: date, end_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        priced, failed = self._split(symbols)
+        days, closes = generate_gbm_closes(priced, start_date, end_date)
+        if not len(days) and len(get_calendar().trading_days(start_date, end_date)):
+            # Every session in the range is before GBM_EPOCH_YEAR, so no symbol has a close.
+            return [], priced + failed
+        dates = days.astype(date).tolist()
+        points = [
+            PricePoint(symbol=symbol, price_date=price_date, close_price=close, currency="USD")
+            for symbol, row in zip(priced, closes, strict=True)
+            for price_date, close in zip(dates, _to_cents(row), strict=True)
+        ]
+        return points, failed
+
     def fetch_eod(self, symbols: list[str], as_of_date: date) -> tuple[list[PricePoint], list[str]]:
+        if self.model == "gbm":
+            return self._fetch_eod_gbm(symbols, as_of_date)
+
         points: list[PricePoint] = []
         failed: list[str] = []
 
@@ -31,8 +185,12 @@ class DemoMarketDataProvider:
         return points, failed
 
     def fetch_history(self, symbols: list[str], start_date: date, end_date: date) -> tuple[list[PricePoint], list[str]]:
+        if self.model == "gbm":
+            return self._fetch_history_gbm(symbols, start_date, end_date)
+
         points: list[PricePoint] = []
         failed: list[str] = []
+        trading_days = get_calendar().trading_days(start_date, end_date).astype(date).tolist()
 
         for symbol in symbols:
             clean = symbol.strip().upper()
@@ -43,19 +201,27 @@ class DemoMarketDataProvider:
                 continue
 
             seed = sum(ord(char) for char in clean)
-            current = start_date
-            while current <= end_date:
-                if current.weekday() < 5:
-                    day_bias = (current.toordinal() % 30) - 15
-                    price = Decimal(seed % 200 + 20) + Decimal(day_bias) / Decimal("20")
-                    points.append(
-                        PricePoint(
-                            symbol=clean,
-                            price_date=current,
-                            close_price=price,
-                            currency="USD",
-                        )
+            for current in trading_days:
+                day_bias = (current.toordinal() % 30) - 15
+                price = Decimal(seed % 200 + 20) + Decimal(day_bias) / Decimal(20)
+                points.append(
+                    PricePoint(
+                        symbol=clean,
+                        price_date=current,
+                        close_price=price,
+                        currency="USD",
                     )
-                current = date.fromordinal(current.toordinal() + 1)
+                )
 
         return points, failed
+
+    # Synthetic prices need no I/O, so the async methods compute inline on the event loop.
+    async def afetch_eod(
+        self, symbols: list[str], as_of_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        return self.fetch_eod(symbols, as_of_date)
+
+    async def afetch_history(
+        self, symbols: list[str], start_date: date, end_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        return self.fetch_history(symbols, start_date, end_date)
@@ -0,0 +1,170 @@
+import asyncio
+import os
+import threading
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+from app.market_data.base import PricePoint
+
+PRICE_SCALE = 1_000_000
+PRICE_DTYPE = np.dtype([("date", "<i4"), ("close", "<i8"), ("currency", "S8")])
+CACHE_DIR = ".npy"
+EOD_LOOKBACK_DAYS = 15
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+_convert_lock = threading.Lock()
+
+
+def convert_price_csv(csv_path: Path, npy_path: Path) -> None:
+    """Convert a ``date,close[,currency]`` CSV into a date-sorted ``PRICE_DTYPE`` array file.
+
+    Dates are stored as ordinals and closes as int64 scaled to the 6 decimal places of
+    ``prices_eod.close_price``; closes with up to 6 decimals survive the float parse exactly. A
+    later row for the same date wins.
+    """
+    frame = pd.read_csv(
+        csv_path,
+        dtype={"date": str, "currency": str},
+        skipinitialspace=True,
+        float_precision="round_trip",
+    )
+    frame = frame.dropna(subset=["close"])
+    days = pd.to_datetime(frame["date"], format="%Y-%m-%d").to_numpy().astype("datetime64[D]")
+
+    array = np.empty(len(frame), dtype=PRICE_DTYPE)
+    array["date"] = days.astype(np.int64) + _EPOCH_ORDINAL
+    array["close"] = np.rint(frame["close"].to_numpy(dtype=float) * PRICE_SCALE)
+    if "currency" in frame:
+        array["currency"] = (
+            frame["currency"].fillna("USD").str.strip().str.upper().to_numpy(dtype="S8")
+        )
+    else:
+        array["currency"] = b"USD"
+    array = array[np.argsort(array["date"], kind="stable")]
+    array = array[np.append(array["date"][1:] != array["date"][:-1], True)]
+
+    npy_path.parent.mkdir(parents=True, exist_ok=True)
+    # Written beside the target and renamed, so readers never map a half-written file.
+    tmp_path = npy_path.with_name(f"{npy_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with tmp_path.open("wb") as handle:
+        np.save(handle, array)
+    os.replace(tmp_path, npy_path)
+
+
+class LocalFileMarketDataProvider:
+    """Serves prices from ``<directory>/<SYMBOL>.csv`` files.
+
+    Each CSV is converted once into ``<directory>/.npy/<SYMBOL>.npy`` (again whenever the CSV is
+    newer) and then read through a memory map, so a history request is a binary search and a slice
+    of the mapped file rather than a parse.
+    """
+
+    def __init__(self, directory: str | Path | None = None) -> None:
+        self.directory = Path(directory if directory is not None else settings.localfile_price_dir)
+
+    def _prices(self, symbol: str) -> np.ndarray | None:
+        if not symbol or symbol.startswith(".") or "/" in symbol or "\\" in symbol:
+            return None
+        csv_path = self.directory / f"{symbol}.csv"
+        npy_path = self.directory / CACHE_DIR / f"{symbol}.npy"
+        try:
+            csv_mtime = csv_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        with _convert_lock:
+            if not npy_path.exists() or npy_path.stat().st_mtime_ns < csv_mtime:
+                convert_price_csv(csv_path, npy_path)
+        # Mapped per request rather than cached: every open map holds a file descriptor, and a
+        # backfill can touch thousands of symbols.
+        return np.load(npy_path, mmap_mode="r")
+
+    def _load(self, symbol: str) -> np.ndarray | None:
+        try:
+            return self._prices(symbol)
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def fetch_eod(self, symbols: list[str], as_of_date: date) -> tuple[list[PricePoint], list[str]]:
+        points: list[PricePoint] = []
+        failed: list[str] = []
+
+        for symbol in symbols:
+            clean = symbol.strip().upper()
+            if not clean:
+                continue
+            prices = self._load(clean)
+            if prices is None:
+                failed.append(clean)
+                continue
+            # Files may have gaps, so the last close within the lookback is used; a long-stale close
+            # is not reported as today's.
+            idx = np.searchsorted(prices["date"], as_of_date.toordinal(), side="right") - 1
+            if idx < 0 or prices["date"][idx] < as_of_date.toordinal() - EOD_LOOKBACK_DAYS:
+                failed.append(clean)
+                continue
+            row = prices[idx]
+            points.append(
+                PricePoint(
+                    symbol=clean,
+                    price_date=as_of_date,
+                    close_price=Decimal(int(row["close"])).scaleb(-6),
+                    currency=row["currency"].decode("ascii"),
+                )
+            )
+
+        return points, failed
+
+    def fetch_history(
+        self, symbols: list[str], start_date: date, end_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        points: list[PricePoint] = []
+        failed: list[str] = []
+
+        for symbol in symbols:
+            clean = symbol.strip().upper()
+            if not clean:
+                continue
+            prices = self._load(clean)
+            if prices is None:
+                failed.append(clean)
+                continue
+            lo = np.searchsorted(prices["date"], start_date.toordinal(), side="left")
+            hi = np.searchsorted(prices["date"], end_date.toordinal(), side="right")
+            window = prices[lo:hi]
+            if not len(window):
+                failed.append(clean)
+                continue
+            points.extend(
+                PricePoint(
+                    symbol=clean,
+                    price_date=date.fromordinal(ordinal),
+                    close_price=Decimal(close).scaleb(-6),
+                    currency=currency.decode("ascii"),
+                )
+                for ordinal, close, currency in zip(
+                    window["date"].tolist(),
+                    window["close"].tolist(),
+                    window["currency"].tolist(),
+                    strict=True,
+                )
+            )
+
+        return points, failed
+
+    # A first read, or one after the CSV changed, parses and writes the cache under a lock, so the
+    # blocking methods run on the default executor rather than on the event loop.
+    async def afetch_eod(
+        self, symbols: list[str], as_of_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        return await asyncio.to_thread(self.fetch_eod, symbols, as_of_date)
+
+    async def afetch_history(
+        self, symbols: list[str], start_date: date, end_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        return await asyncio.to_thread(self.fetch_history, symbols, start_date, end_date)
@@ -1,18 +1,121 @@
+import asyncio
 from datetime import date, timedelta
 from decimal import Decimal
 
+import numpy as np
+import pandas as pd
 import yfinance as yf
 
+from app.config import settings
 from app.market_data.base import PricePoint
+from app.market_data.calendar import get_calendar
+
+
+def _clean_symbols(symbols: list[str]) -> list[str]:
+    return list(
+        dict.fromkeys(clean for clean in (symbol.strip().upper() for symbol in symbols) if clean)
+    )
+
+
+def _to_decimals(values: np.ndarray) -> list[Decimal]:
+    # repr of a float is the str() the per-symbol path used, so both paths store the same Decimal.
+    return [Decimal(repr(value)) for value in values.tolist()]
+
+
+def _eod_window(as_of_date: date) -> tuple[date, date]:
+    """Download bounds for the close as of ``as_of_date``: the last trading session on or before
+    it, plus the session before that in case the last close is not published yet."""
+    calendar = get_calendar()
+    last_session = calendar.previous_trading_day(as_of_date)
+    first_session = calendar.previous_trading_day(last_session - timedelta(days=1))
+    return first_session, last_session + timedelta(days=1)
 
 
 class YFinanceMarketDataProvider:
+    def __init__(self, batch: bool | None = None) -> None:
+        self.batch = settings.yfinance_batch_download if batch is None else batch
+
+    def _download_closes(self, symbols: list[str], start: date, end: date) -> pd.DataFrame:
+        """Close prices for ``symbols`` from one multi-ticker download.
+
+        Returns a dates x symbols frame with NaN for gaps.
+        """
+        frame = yf.download(
+            symbols,
+            start=start.isoformat(),
+            end=end.isoformat(),
+            auto_adjust=False,
+            progress=False,
+            threads=False,
+            group_by="column",
+            multi_level_index=True,
+        )
+        if frame is None or frame.empty or "Close" not in frame.columns.get_level_values(0):
+            return pd.DataFrame(index=pd.DatetimeIndex([]), columns=symbols, dtype=float)
+        closes = frame["Close"]
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(symbols[0])
+        return closes.reindex(columns=symbols).astype(float)
+
+    def _fetch_eod_batch(
+        self, symbols: list[str], as_of_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        closes = self._download_closes(symbols, *_eod_window(as_of_date))
+        closes = closes[pd.DatetimeIndex(closes.index).date <= as_of_date]
+        latest = closes.ffill().iloc[-1] if len(closes) else pd.Series(np.nan, index=symbols)
+
+        available = latest.notna().to_numpy()
+        present = [symbol for symbol, ok in zip(symbols, available, strict=True) if ok]
+        points = [
+            PricePoint(symbol=symbol, price_date=as_of_date, close_price=close, currency="USD")
+            for symbol, close in zip(
+                present, _to_decimals(latest.to_numpy()[available]), strict=True
+            )
+        ]
+        failed = [symbol for symbol, ok in zip(symbols, available, strict=True) if not ok]
+        return points, failed
+
+    def _fetch_history_batch(
+        self, symbols: list[str], start_date: date, end_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        closes = self._download_closes(symbols, start_date, end_date + timedelta(days=1))
+        dates = np.asarray(pd.DatetimeIndex(closes.index).date)
+        in_range = (
+            (dates >= start_date) & (dates <= end_date) if len(dates) else np.zeros(0, dtype=bool)
+        )
+        dates = dates[in_range]
+        values = closes.to_numpy()[in_range]
+
+        points: list[PricePoint] = []
+        failed: list[str] = []
+        for column, symbol in enumerate(symbols):
+            column_values = values[:, column]
+            present = ~np.isnan(column_values)
+            if not present.any():
+                failed.append(symbol)
+                continue
+            points.extend(
+                PricePoint(symbol=symbol, price_date=dt, close_price=close, currency="USD")
+                for dt, close in zip(
+                    dates[present], _to_decimals(column_values[present]), strict=True
+                )
+            )
+        return points, failed
+
     def fetch_eod(self, symbols: list[str], as_of_date: date) -> tuple[list[PricePoint], list[str]]:
+        if self.batch:
+            clean = _clean_symbols(symbols)
+            if not clean:
+                return [], []
+            try:
+                return self._fetch_eod_batch(clean, as_of_date)
+            except Exception:  # noqa: BLE001 - as per symbol below, a failed download fails them all
+                return [], clean
+
         points: list[PricePoint] = []
         failed: list[str] = []
 
-        start = as_of_date - timedelta(days=15)
-        end = as_of_date + timedelta(days=1)
+        start, end = _eod_window(as_of_date)
 
         for symbol in symbols:
             clean = symbol.strip().upper()
@@ -48,6 +151,22 @@ class YFinanceMarketDataProvider:
         return points, failed
 
     def fetch_history(self, symbols: list[str], start_date: date, end_date: date) -> tuple[list[PricePoint], list[str]]:
+        calendar = get_calendar()
+        start_date = calendar.next_trading_day(start_date)
+        end_date = calendar.previous_trading_day(end_date)
+        if start_date > end_date:
+            # No session in the range, so there is nothing to download.
+            return [], _clean_symbols(symbols)
+
+        if self.batch:
+            clean = _clean_symbols(symbols)
+            if not clean:
+                return [], []
+            try:
+                return self._fetch_history_batch(clean, start_date, end_date)
+            except Exception:  # noqa: BLE001 - as per symbol below, a failed download fails them all
+                return [], clean
+
         points: list[PricePoint] = []
         failed: list[str] = []
 
@@ -86,3 +205,15 @@ class YFinanceMarketDataProvider:
                 failed.append(clean)
 
         return points, failed
+
+    # yfinance has no async client; its blocking calls run on the default executor so many chunks
+    # can be awaited from one event loop.
+    async def afetch_eod(
+        self, symbols: list[str], as_of_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        return await asyncio.to_thread(self.fetch_eod, symbols, as_of_date)
+
+    async def afetch_history(
+        self, symbols: list[str], start_date: date, end_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        return await asyncio.to_thread(self.fetch_history, symbols, start_date, end_date)
@@ -1,7 +1,18 @@
 from datetime import date, datetime
 from decimal import Decimal
 
-from sqlalchemy import Boolean, Date, DateTime, Integer, Numeric, String, Text, UniqueConstraint, func
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    Double,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -56,6 +67,28 @@ class PriceEOD(Base):
     ingested_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 
+class WriteCounter(Base):
+    __tablename__ = "write_counters"
+
+    # Bumped in the same transaction as the writes it counts, so in-process caches can tell
+    # whether another process changed the rows under them, updates included.
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class PriceCoverage(Base):
+    __tablename__ = "price_coverage"
+
+    # Date ranges a provider has already been asked for, so read-through history fetches only the
+    # gaps. Weekends and holidays inside a range are covered even though prices_eod has no row.
+    id: Mapped[int] = mapped_column(primary_key=True)
+    symbol: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
+    source: Mapped[str] = mapped_column(String(64), nullable=False)
+    start_date: Mapped[date] = mapped_column(Date, nullable=False)
+    end_date: Mapped[date] = mapped_column(Date, nullable=False)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
 class PositionSnapshot(Base):
     __tablename__ = "positions_snapshot"
     __table_args__ = (
@@ -67,7 +100,12 @@ class PositionSnapshot(Base):
     account: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
     symbol: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
     quantity: Mapped[Decimal] = mapped_column(Numeric(18, 6), nullable=False)
-    avg_cost: Mapped[Decimal] = mapped_column(Numeric(18, 6), nullable=False)
+    # Ledger state is kept at higher precision than the reported columns so that rolling
+    # positions forward from a snapshot reproduces a full ledger replay.
+    avg_cost: Mapped[Decimal] = mapped_column(Numeric(38, 18), nullable=False)
+    realized_pnl: Mapped[Decimal] = mapped_column(
+        Numeric(38, 18), nullable=False, default=Decimal(0)
+    )
     market_price: Mapped[Decimal | None] = mapped_column(Numeric(18, 6), nullable=True)
     market_value: Mapped[Decimal | None] = mapped_column(Numeric(18, 6), nullable=True)
     unrealized_pnl: Mapped[Decimal | None] = mapped_column(Numeric(18, 6), nullable=True)
@@ -75,6 +113,40 @@ class PositionSnapshot(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 
+class PortfolioMetricsSnapshot(Base):
+    __tablename__ = "portfolio_metrics_snapshot"
+    __table_args__ = (
+        UniqueConstraint(
+            "account", "metric_date", name="uq_portfolio_metrics_snapshot_account_date"
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # "*" holds the all-accounts series.
+    account: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    metric_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    market_value: Mapped[float] = mapped_column(Double, nullable=False)
+    total_pnl: Mapped[float] = mapped_column(Double, nullable=False)
+    daily_return: Mapped[float] = mapped_column(Double, nullable=False)
+    drawdown: Mapped[float] = mapped_column(Double, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class PortfolioMetricsState(Base):
+    __tablename__ = "portfolio_metrics_state"
+    __table_args__ = (UniqueConstraint("account", name="uq_portfolio_metrics_state_account"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    account: Mapped[str] = mapped_column(String(64), nullable=False)
+    computed_through: Mapped[date] = mapped_column(Date, nullable=False)
+    dirty_from: Mapped[date | None] = mapped_column(Date, nullable=True)
+    # max(id) of trades and prices_eod when last computed or marked; a mismatch means rows were
+    # written without marking the range dirty, so the whole series is rebuilt.
+    trade_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    price_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
 class JobRun(Base):
     __tablename__ = "job_runs"
 
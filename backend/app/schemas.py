@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Any
 
@@ -22,6 +22,13 @@ class TradeImportResponse(BaseModel):
     total_rows: int
     imported_rows: int
     duplicate_rows: int
+    job_run_id: int
+
+
+class TradeImportJobResponse(BaseModel):
+    filename: str
+    job_run_id: int
+    status: str
 
 
 class PositionItem(BaseModel):
@@ -43,6 +50,12 @@ class PositionsResponse(BaseModel):
     positions: list[PositionItem]
 
 
+class PositionSnapshotResponse(BaseModel):
+    snapshot_date: date
+    rows_written: int
+    job_run_id: int
+
+
 class MetricsResponse(BaseModel):
     snapshot_date: date
     account_filter: str | None
@@ -80,6 +93,17 @@ class AnalyticsResponse(BaseModel):
     series: list[AnalyticsPointResponse]
 
 
+class AnalyticsBatchRequest(BaseModel):
+    snapshot_date: date | None = None
+    start_date: date | None = None
+    accounts: list[str] = Field(default_factory=list)
+
+
+class AnalyticsBatchResponse(BaseModel):
+    snapshot_date: date
+    results: list[AnalyticsResponse]
+
+
 class PriceRefreshRequest(BaseModel):
     price_date: date | None = None
     symbols: list[str] = Field(default_factory=list)
@@ -96,6 +120,23 @@ class PriceRefreshResponse(BaseModel):
     job_run_id: int
 
 
+class ProviderHealthItem(BaseModel):
+    provider: str
+    state: str
+    consecutive_failures: int
+    calls: int
+    failures: int
+    skipped_calls: int
+    hedged_calls: int
+    latency_p50_ms: float | None
+    latency_p95_ms: float | None
+    retry_in_seconds: float | None
+
+
+class ProviderHealthResponse(BaseModel):
+    providers: list[ProviderHealthItem]
+
+
 class CompanyCompareRequest(BaseModel):
     symbols: list[str] = Field(default_factory=list)
     start_date: date | None = None
@@ -155,3 +196,13 @@ class AIExplainResponse(BaseModel):
     provider: str
     model: str
     answer: str
+
+
+class JobRunResponse(BaseModel):
+    id: int
+    job_name: str
+    status: str
+    started_at: datetime
+    finished_at: datetime | None
+    rows_processed: int
+    details: dict[str, Any] | None
@@ -1,13 +1,26 @@
-import math
+import heapq
+import multiprocessing
+import threading
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import date
-from statistics import mean
 
-from sqlalchemy import select
+import numpy as np
 from sqlalchemy.orm import Session
 
-from app.models import PriceEOD, Trade
-from app.services.portfolio import calculate_positions
+from app.config import settings
+from app.market_data.calendar import get_calendar
+from app.services.portfolio import LedgerState, PositionCalc
+from app.services.replay import (
+    LedgerReplay,
+    PriceRecord,
+    TradeRecord,
+    load_price_records,
+    load_trade_records,
+)
+from app.services.risk import return_metrics
 
 
 @dataclass
@@ -35,79 +48,48 @@ class AnalyticsResult:
     series: list[AnalyticsPoint]
 
 
-def _stddev(values: list[float]) -> float:
-    if len(values) < 2:
-        return 0.0
-    m = mean(values)
-    var = sum((x - m) ** 2 for x in values) / (len(values) - 1)
-    return math.sqrt(var)
+@dataclass
+class BatchAnalyticsResult:
+    snapshot_date: date
+    results: list[AnalyticsResult]
 
 
-def _percentile(values: list[float], p: float) -> float:
-    if not values:
-        return 0.0
-    ordered = sorted(values)
-    idx = max(0, min(len(ordered) - 1, int(round((len(ordered) - 1) * p))))
-    return ordered[idx]
+@dataclass
+class AnalyticsSeries:
+    """Per-date market value and PnL totals for one account filter, before returns are derived.
 
+    Holding the totals rather than ``AnalyticsPoint`` objects keeps long series compact; points
+    are produced on demand by ``points()``.
+    """
 
-def calculate_analytics(
-    db: Session,
-    snapshot_date: date,
-    account: str | None = None,
-    start_date: date | None = None,
-) -> AnalyticsResult:
-    trade_query = select(Trade).where(Trade.trade_date <= snapshot_date)
-    if account:
-        trade_query = trade_query.where(Trade.account == account)
+    snapshot_date: date
+    start_date: date
+    account_filter: str | None
+    totals: list[tuple[date, float, float]]
+    exposure: list[tuple[str, float]]
 
-    trades = db.scalars(trade_query.order_by(Trade.trade_date, Trade.id)).all()
-    if not trades:
-        return AnalyticsResult(
-            snapshot_date=snapshot_date,
-            start_date=start_date or snapshot_date,
-            account_filter=account,
-            annualized_volatility=0.0,
-            sharpe_ratio=0.0,
-            max_drawdown=0.0,
-            var_95=0.0,
-            cvar_95=0.0,
-            concentration_top_symbol=None,
-            concentration_top_weight=0.0,
-            series=[],
-        )
+    def points(self) -> Iterator[AnalyticsPoint]:
+        return iter_series_points(self.totals)
 
-    symbols = sorted({trade.symbol for trade in trades})
-    min_trade_date = min(trade.trade_date for trade in trades)
-    effective_start = start_date or min_trade_date
-    if effective_start > snapshot_date:
-        effective_start = snapshot_date
-
-    price_dates = db.scalars(
-        select(PriceEOD.price_date)
-        .where(
-            PriceEOD.symbol.in_(symbols),
-            PriceEOD.price_date >= effective_start,
-            PriceEOD.price_date <= snapshot_date,
-        )
-        .distinct()
-        .order_by(PriceEOD.price_date)
-    ).all()
 
-    timeline = sorted({d for d in price_dates if d >= effective_start and d <= snapshot_date})
-    if not timeline:
-        timeline = [snapshot_date]
+def empty_analytics_series(
+    snapshot_date: date, start_date: date | None, account: str | None
+) -> AnalyticsSeries:
+    return AnalyticsSeries(
+        snapshot_date=snapshot_date,
+        start_date=start_date or snapshot_date,
+        account_filter=account,
+        totals=[],
+        exposure=[],
+    )
 
-    points: list[AnalyticsPoint] = []
+
+def iter_series_points(totals: Iterable[tuple[date, float, float]]) -> Iterator[AnalyticsPoint]:
     prev_market = 0.0
     base_market = None
     running_peak = 0.0
 
-    for dt in timeline:
-        positions = calculate_positions(db=db, snapshot_date=dt, account=account)
-        market_value = sum(float(pos.market_value or 0) for pos in positions)
-        total_pnl = sum(float((pos.unrealized_pnl or 0) + pos.realized_pnl) for pos in positions)
-
+    for dt, market_value, total_pnl in totals:
         if prev_market > 0:
             daily_return = (market_value / prev_market) - 1.0
         else:
@@ -115,57 +97,333 @@ def calculate_analytics(
 
         if base_market is None and market_value > 0:
             base_market = market_value
-        cumulative_return = ((market_value / base_market) - 1.0) if (base_market and base_market > 0) else 0.0
+        cumulative_return = (
+            ((market_value / base_market) - 1.0) if (base_market and base_market > 0) else 0.0
+        )
 
         running_peak = max(running_peak, market_value)
         drawdown = ((market_value - running_peak) / running_peak) if running_peak > 0 else 0.0
 
-        points.append(
-            AnalyticsPoint(
-                date=dt,
-                market_value=market_value,
-                total_pnl=total_pnl,
-                daily_return=daily_return,
-                cumulative_return=cumulative_return,
-                drawdown=drawdown,
-            )
+        yield AnalyticsPoint(
+            date=dt,
+            market_value=market_value,
+            total_pnl=total_pnl,
+            daily_return=daily_return,
+            cumulative_return=cumulative_return,
+            drawdown=drawdown,
         )
         prev_market = market_value
 
-    daily_returns = [p.daily_return for p in points[1:]]
-    daily_vol = _stddev(daily_returns)
-    annualized_vol = daily_vol * math.sqrt(252)
-    avg_daily = mean(daily_returns) if daily_returns else 0.0
-    sharpe = (avg_daily / daily_vol) * math.sqrt(252) if daily_vol > 0 else 0.0
-    max_drawdown = min((p.drawdown for p in points), default=0.0)
-
-    var_95 = _percentile(daily_returns, 0.05) if daily_returns else 0.0
-    tail = [r for r in daily_returns if r <= var_95]
-    cvar_95 = (sum(tail) / len(tail)) if tail else var_95
-
-    latest_positions = calculate_positions(db=db, snapshot_date=snapshot_date, account=account)
-    exposure = [
-        (pos.symbol, float(pos.market_value or 0))
-        for pos in latest_positions
-        if float(pos.market_value or 0) > 0
-    ]
-    total_exposure = sum(v for _, v in exposure)
-    if exposure and total_exposure > 0:
-        top_symbol, top_value = max(exposure, key=lambda t: t[1])
-        top_weight = top_value / total_exposure
+
+def _group_totals(
+    positions: list[PositionCalc], group_of: Callable[[str], str | None]
+) -> dict[str | None, tuple[float, float]]:
+    totals: dict[str | None, tuple[float, float]] = {}
+    for pos in positions:
+        group = group_of(pos.account)
+        market_value, total_pnl = totals.get(group, (0.0, 0.0))
+        totals[group] = (
+            market_value + float(pos.market_value or 0),
+            total_pnl + float((pos.unrealized_pnl or 0) + pos.realized_pnl),
+        )
+    return totals
+
+
+class AnalyticsSummary:
+    """Builds an ``AnalyticsResult`` from the points of one series, fed in order as they stream.
+
+    Daily returns go into a float64 buffer sized from the series length, so a caller that writes
+    points out as it goes holds 8 bytes per point rather than the points themselves.
+    """
+
+    def __init__(self, series: AnalyticsSeries) -> None:
+        self._series = series
+        self._returns = np.empty(max(len(series.totals) - 1, 0))
+        self._count = 0
+        self._max_drawdown = 0.0
+
+    def add(self, point: AnalyticsPoint) -> None:
+        if self._count:
+            self._returns[self._count - 1] = point.daily_return
+        self._count += 1
+        self._max_drawdown = min(self._max_drawdown, point.drawdown)
+
+    def result(self, points: list[AnalyticsPoint] | None = None) -> AnalyticsResult:
+        metrics = return_metrics(self._returns[: max(self._count - 1, 0)])
+
+        exposure = self._series.exposure
+        total_exposure = sum(v for _, v in exposure)
+        if exposure and total_exposure > 0:
+            top_symbol, top_value = max(exposure, key=lambda t: t[1])
+            top_weight = top_value / total_exposure
+        else:
+            top_symbol, top_weight = None, 0.0
+
+        return AnalyticsResult(
+            snapshot_date=self._series.snapshot_date,
+            start_date=self._series.start_date,
+            account_filter=self._series.account_filter,
+            annualized_volatility=float(metrics.annualized_volatility[0]),
+            sharpe_ratio=float(metrics.sharpe_ratio[0]),
+            max_drawdown=self._max_drawdown,
+            var_95=float(metrics.var_95[0]),
+            cvar_95=float(metrics.cvar_95[0]),
+            concentration_top_symbol=top_symbol,
+            concentration_top_weight=top_weight,
+            series=points or [],
+        )
+
+
+def build_analytics_result(series: AnalyticsSeries) -> AnalyticsResult:
+    summary = AnalyticsSummary(series)
+    points: list[AnalyticsPoint] = []
+    for point in series.points():
+        summary.add(point)
+        points.append(point)
+    return summary.result(points)
+
+
+def _by_account(account: str) -> str:
+    return account
+
+
+def replay_group_totals(
+    trades: list[TradeRecord],
+    prices: list[PriceRecord],
+    timeline: list[date],
+    snapshot_date: date,
+    group_of: Callable[[str], str | None],
+    ledgers: dict[tuple[str, str], LedgerState] | None = None,
+) -> tuple[dict[str | None, list[tuple[float, float]]], dict[str | None, list[tuple[str, float]]]]:
+    replay = LedgerReplay(trades, prices, ledgers)
+    accounts = [account for account, _ in ledgers or {}] + [trade.account for trade in trades]
+    totals: dict[str | None, list[tuple[float, float]]] = {
+        group_of(account): [] for account in accounts
+    }
+    for dt in timeline:
+        replay.advance(dt)
+        date_totals = _group_totals(replay.positions(), group_of)
+        for group, group_series in totals.items():
+            group_series.append(date_totals.get(group, (0.0, 0.0)))
+
+    replay.advance(snapshot_date)
+    exposure: dict[str | None, list[tuple[str, float]]] = defaultdict(list)
+    for pos in replay.positions():
+        if float(pos.market_value or 0) > 0:
+            exposure[group_of(pos.account)].append((pos.symbol, float(pos.market_value or 0)))
+    return totals, exposure
+
+
+def _partition_accounts(trades: list[TradeRecord], workers: int) -> list[set[str]]:
+    # Largest accounts first onto the least-loaded worker, by trade count.
+    buckets: list[tuple[int, int, set[str]]] = [(0, idx, set()) for idx in range(workers)]
+    for account, count in Counter(trade.account for trade in trades).most_common():
+        load, idx, accounts = heapq.heappop(buckets)
+        accounts.add(account)
+        heapq.heappush(buckets, (load + count, idx, accounts))
+    return [accounts for _, _, accounts in sorted(buckets, key=lambda b: b[1]) if accounts]
+
+
+def _parallel_account_totals(
+    trades: list[TradeRecord],
+    prices: list[PriceRecord],
+    timeline: list[date],
+    snapshot_date: date,
+    workers: int,
+) -> tuple[dict[str, list[tuple[float, float]]], dict[str, list[tuple[str, float]]]]:
+    futures = []
+    pool = _get_pool(workers)
+    for accounts in _partition_accounts(trades, workers):
+        chunk_trades = [trade for trade in trades if trade.account in accounts]
+        chunk_symbols = {trade.symbol for trade in chunk_trades}
+        chunk_prices = [price for price in prices if price.symbol in chunk_symbols]
+        futures.append(
+            pool.submit(
+                replay_group_totals,
+                chunk_trades,
+                chunk_prices,
+                timeline,
+                snapshot_date,
+                _by_account,
+            )
+        )
+
+    totals: dict[str, list[tuple[float, float]]] = {}
+    exposure: dict[str, list[tuple[str, float]]] = {}
+    for future in futures:
+        chunk_totals, chunk_exposure = future.result()
+        totals.update(chunk_totals)
+        exposure.update(chunk_exposure)
+    return totals, exposure
+
+
+def _merge_account_totals(
+    account_totals: dict[str, list[tuple[float, float]]],
+    account_exposure: dict[str, list[tuple[str, float]]],
+    group_of: Callable[[str], str | None],
+    length: int,
+) -> tuple[dict[str | None, list[tuple[float, float]]], dict[str | None, list[tuple[str, float]]]]:
+    # Accounts are merged in sorted order so exposure lists keep the (account, symbol) order a
+    # serial replay produces.
+    totals: dict[str | None, list[tuple[float, float]]] = {}
+    exposure: dict[str | None, list[tuple[str, float]]] = defaultdict(list)
+    for account in sorted(account_totals):
+        group = group_of(account)
+        merged = totals.setdefault(group, [(0.0, 0.0)] * length)
+        totals[group] = [
+            (market_value + extra_market, total_pnl + extra_pnl)
+            for (market_value, total_pnl), (extra_market, extra_pnl) in zip(
+                merged, account_totals[account], strict=True
+            )
+        ]
+        exposure[group].extend(account_exposure.get(account, []))
+    return totals, exposure
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn rather than fork: the API process runs request threads and holds DB connections.
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_analytics_pool() -> None:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+        _pool_workers = 0
+
+
+def _analytics_by_group(
+    trades: list[TradeRecord],
+    prices: list[PriceRecord],
+    snapshot_date: date,
+    start_date: date | None,
+    group_of: Callable[[str], str | None],
+) -> dict[str | None, AnalyticsSeries]:
+    # One replay over the union of every group's timeline; each group keeps the dates its own
+    # symbols were priced on, so its series matches a replay of that group's trades alone.
+    first_trade: dict[str | None, date] = {}
+    group_symbols: dict[str | None, set[str]] = defaultdict(set)
+    for trade in trades:
+        group = group_of(trade.account)
+        first_trade.setdefault(group, trade.trade_date)
+        group_symbols[group].add(trade.symbol)
+
+    # Rows stamped on a weekend or holiday are not sessions of their own and stay off the timeline.
+    trading_dates = get_calendar().trading_dates(price.price_date for price in prices)
+    price_dates: dict[str, set[date]] = defaultdict(set)
+    for price in prices:
+        if price.price_date in trading_dates:
+            price_dates[price.symbol].add(price.price_date)
+
+    effective_starts: dict[str | None, date] = {}
+    timelines: dict[str | None, set[date]] = {}
+    for group, first_date in first_trade.items():
+        effective_start = min(start_date or first_date, snapshot_date)
+        dates = {
+            dt
+            for symbol in group_symbols[group]
+            for dt in price_dates[symbol]
+            if dt >= effective_start
+        }
+        effective_starts[group] = effective_start
+        timelines[group] = dates or {snapshot_date}
+
+    timeline = sorted(set().union(*timelines.values()))
+    workers = settings.analytics_workers
+    if workers > 1 and len({trade.account for trade in trades}) > 1:
+        account_totals, account_exposure = _parallel_account_totals(
+            trades, prices, timeline, snapshot_date, workers
+        )
+        totals, exposure = _merge_account_totals(
+            account_totals, account_exposure, group_of, len(timeline)
+        )
     else:
-        top_symbol, top_weight = None, 0.0
+        totals, exposure = replay_group_totals(trades, prices, timeline, snapshot_date, group_of)
+
+    return {
+        group: AnalyticsSeries(
+            snapshot_date=snapshot_date,
+            start_date=effective_starts[group],
+            account_filter=group,
+            totals=[
+                (dt, *totals[group][idx])
+                for idx, dt in enumerate(timeline)
+                if dt in timelines[group]
+            ],
+            exposure=exposure[group],
+        )
+        for group in first_trade
+    }
+
 
-    return AnalyticsResult(
+def calculate_analytics_series(
+    db: Session,
+    snapshot_date: date,
+    account: str | None = None,
+    start_date: date | None = None,
+) -> AnalyticsSeries:
+    trades = load_trade_records(db, snapshot_date=snapshot_date, account=account)
+    if not trades:
+        return empty_analytics_series(snapshot_date, start_date, account)
+
+    prices = load_price_records(db, (trade.symbol for trade in trades), snapshot_date)
+    series = _analytics_by_group(trades, prices, snapshot_date, start_date, lambda _: account)
+    return series[account]
+
+
+def calculate_analytics(
+    db: Session,
+    snapshot_date: date,
+    account: str | None = None,
+    start_date: date | None = None,
+) -> AnalyticsResult:
+    return build_analytics_result(
+        calculate_analytics_series(
+            db, snapshot_date=snapshot_date, account=account, start_date=start_date
+        )
+    )
+
+
+def calculate_batch_analytics(
+    db: Session,
+    snapshot_date: date,
+    accounts: list[str] | None = None,
+    start_date: date | None = None,
+) -> BatchAnalyticsResult:
+    requested = list(
+        dict.fromkeys(account.strip() for account in accounts or [] if account.strip())
+    )
+    if accounts and not requested:
+        raise ValueError("accounts must contain at least one non-empty account")
+
+    trades = load_trade_records(db, snapshot_date=snapshot_date, accounts=requested or None)
+    prices = load_price_records(db, (trade.symbol for trade in trades), snapshot_date)
+    by_account = _analytics_by_group(trades, prices, snapshot_date, start_date, _by_account)
+
+    order = requested or sorted(by_account)
+    return BatchAnalyticsResult(
         snapshot_date=snapshot_date,
-        start_date=effective_start,
-        account_filter=account,
-        annualized_volatility=annualized_vol,
-        sharpe_ratio=sharpe,
-        max_drawdown=max_drawdown,
-        var_95=var_95,
-        cvar_95=cvar_95,
-        concentration_top_symbol=top_symbol,
-        concentration_top_weight=top_weight,
-        series=points,
+        results=[
+            build_analytics_result(
+                by_account.get(account)
+                or empty_analytics_series(snapshot_date, start_date, account)
+            )
+            for account in order
+        ],
     )
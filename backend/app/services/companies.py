@@ -1,16 +1,27 @@
-import math
+import asyncio
 import json
+import math
+from collections import defaultdict
+from collections.abc import Iterator
 from dataclasses import dataclass
-from datetime import UTC, date, datetime
+from datetime import date, timedelta
 from decimal import Decimal
 from urllib.parse import urlencode
 from urllib.request import Request, urlopen
 
+import numpy as np
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.market_data.factory import get_market_data_provider, resolve_provider_chain
+from app.config import settings
+from app.market_data.calendar import get_calendar
+from app.market_data.factory import resolve_provider_chain
+from app.market_data.fetching import ChainFetchResult, afetch_through_chain, fetch_through_chain
 from app.models import PriceEOD
+from app.services.price_cache import record_price_writes
+from app.services.price_coverage import DateRange, coverage_gaps, record_coverage
+from app.services.price_store import upsert_prices
+from app.services.risk import correlation_matrix, max_drawdown, return_metrics, simple_returns
 
 
 @dataclass
@@ -38,10 +49,41 @@ class CompanyCompareResult:
     symbols: list[str]
     providers_used: list[str]
     failed_symbols: list[str]
-    series: list[CompanyComparePoint]
+    dates: list[date]
+    # symbols x dates closes, NaN where a symbol has no price on that date.
+    prices: np.ndarray
     summary: list[CompanyCompareSummary]
     correlation: dict[str, dict[str, float]]
 
+    def normalized(self) -> np.ndarray:
+        observed = ~np.isnan(self.prices)
+        first_idx = np.where(observed.any(axis=1), observed.argmax(axis=1), 0)
+        base = (
+            self.prices[np.arange(len(self.symbols)), first_idx]
+            if self.prices.size
+            else np.empty(0)
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where((base > 0)[:, None], self.prices / base[:, None], np.nan)
+
+    def columns(self) -> tuple[dict[str, list[float | None]], dict[str, list[float | None]]]:
+        normalized = self.normalized()
+        return (
+            {symbol: _optional_floats(self.prices[idx]) for idx, symbol in enumerate(self.symbols)},
+            {symbol: _optional_floats(normalized[idx]) for idx, symbol in enumerate(self.symbols)},
+        )
+
+    def iter_series(self) -> Iterator[CompanyComparePoint]:
+        normalized = self.normalized()
+        for col, dt in enumerate(self.dates):
+            yield CompanyComparePoint(
+                date=dt,
+                prices=dict(zip(self.symbols, _optional_floats(self.prices[:, col]), strict=True)),
+                normalized=dict(
+                    zip(self.symbols, _optional_floats(normalized[:, col]), strict=True)
+                ),
+            )
+
 
 @dataclass
 class SymbolSearchItem:
@@ -51,38 +93,8 @@ class SymbolSearchItem:
     quote_type: str | None
 
 
-def _stddev(values: list[float]) -> float:
-    if len(values) < 2:
-        return 0.0
-    mean_val = sum(values) / len(values)
-    variance = sum((x - mean_val) ** 2 for x in values) / (len(values) - 1)
-    return math.sqrt(variance)
-
-
-def _max_drawdown(prices: list[float]) -> float:
-    if not prices:
-        return 0.0
-    peak = prices[0]
-    max_dd = 0.0
-    for px in prices:
-        peak = max(peak, px)
-        if peak > 0:
-            max_dd = min(max_dd, (px / peak) - 1.0)
-    return max_dd
-
-
-def _pearson(x: list[float], y: list[float]) -> float:
-    if len(x) < 2 or len(y) < 2 or len(x) != len(y):
-        return 0.0
-
-    mean_x = sum(x) / len(x)
-    mean_y = sum(y) / len(y)
-    cov = sum((a - mean_x) * (b - mean_y) for a, b in zip(x, y, strict=True))
-    var_x = sum((a - mean_x) ** 2 for a in x)
-    var_y = sum((b - mean_y) ** 2 for b in y)
-    if var_x <= 0 or var_y <= 0:
-        return 0.0
-    return cov / math.sqrt(var_x * var_y)
+def _optional_floats(values: np.ndarray) -> list[float | None]:
+    return [None if math.isnan(value) else value for value in values.tolist()]
 
 
 def _normalize_symbols(symbols: list[str]) -> list[str]:
@@ -96,12 +108,133 @@ def _normalize_symbols(symbols: list[str]) -> list[str]:
     return deduped
 
 
+async def _afetch_gaps(
+    provider_chain: list[str], symbols_by_gap: dict[DateRange, list[str]]
+) -> dict[DateRange, ChainFetchResult]:
+    gaps = list(symbols_by_gap)
+    results = await asyncio.gather(
+        *(
+            afetch_through_chain(
+                provider_chain,
+                symbols_by_gap[gap],
+                lambda provider, chunk, gap=gap: provider.afetch_history(chunk, *gap),
+            )
+            for gap in gaps
+        )
+    )
+    return dict(zip(gaps, results, strict=True))
+
+
+def _fetch_gaps(
+    provider_chain: list[str],
+    symbols_by_gap: dict[DateRange, list[str]],
+    points_by_key: dict[tuple[str, date], tuple[str, Decimal, str]],
+) -> dict[DateRange, dict[str, set[str]]]:
+    """Fetch each gap's symbols into ``points_by_key``.
+
+    Returns the symbols each provider answered, per gap.
+    """
+    if settings.price_fetch_async:
+        # Every chunk of every gap shares one event loop.
+        fetched_by_gap = asyncio.run(_afetch_gaps(provider_chain, symbols_by_gap))
+    else:
+        fetched_by_gap = {
+            gap: fetch_through_chain(
+                provider_chain,
+                gap_symbols,
+                lambda provider, chunk, gap=gap: provider.fetch_history(chunk, *gap),
+            )
+            for gap, gap_symbols in symbols_by_gap.items()
+        }
+
+    answered: dict[DateRange, dict[str, set[str]]] = {}
+    for gap, fetched in fetched_by_gap.items():
+        by_provider = answered[gap] = defaultdict(set)
+        for provider_name, point in fetched.points:
+            points_by_key[(point.symbol, point.price_date)] = (
+                provider_name,
+                point.close_price,
+                point.currency,
+            )
+            by_provider[provider_name].add(point.symbol)
+    return answered
+
+
+def _store_history(
+    db: Session, points_by_key: dict[tuple[str, date], tuple[str, Decimal, str]]
+) -> None:
+    if not points_by_key:
+        return
+    upserted = upsert_prices(
+        db,
+        (
+            (symbol, dt, close_price, currency, source)
+            for (symbol, dt), (source, close_price, currency) in points_by_key.items()
+        ),
+    )
+    db.commit()
+    record_price_writes(
+        db,
+        ((symbol, dt, close_price) for (symbol, dt), (_, close_price, _) in points_by_key.items()),
+        upserted.versions,
+    )
+
+
+def _read_through_history(
+    db: Session, provider_chain: list[str], symbols: list[str], start_date: date, end_date: date
+) -> dict[tuple[str, date], Decimal]:
+    # Only ranges and rows from providers in the chain count, so a compare never mixes in prices
+    # another provider wrote.
+    gaps = coverage_gaps(db, symbols, provider_chain, start_date, end_date)
+    # Gaps are trimmed to their first and last trading day before fetching; coverage is still
+    # recorded for the whole gap, so the weekends and holidays around it are never asked for again.
+    calendar = get_calendar()
+    # Today's close may not be final yet, so it is fetched again on every call.
+    last_final_date = date.today() - timedelta(days=1)
+    symbols_by_window: dict[DateRange, list[str]] = defaultdict(list)
+    gap_by_window: dict[tuple[DateRange, str], DateRange] = {}
+    for symbol, missing in gaps.items():
+        for gap_start, gap_end in missing:
+            window = (calendar.next_trading_day(gap_start), calendar.previous_trading_day(gap_end))
+            if window[0] > window[1]:
+                record_coverage(
+                    db, symbol, provider_chain[0], gap_start, min(gap_end, last_final_date)
+                )
+                continue
+            symbols_by_window[window].append(symbol)
+            gap_by_window[window, symbol] = (gap_start, gap_end)
+
+    points_by_key: dict[tuple[str, date], tuple[str, Decimal, str]] = {}
+    answered_by_window = _fetch_gaps(provider_chain, symbols_by_window, points_by_key)
+    for window, answered in answered_by_window.items():
+        for provider_name, answered_symbols in answered.items():
+            for symbol in answered_symbols:
+                gap_start, gap_end = gap_by_window[window, symbol]
+                record_coverage(db, symbol, provider_name, gap_start, min(gap_end, last_final_date))
+    if gaps:
+        if points_by_key:
+            _store_history(db, points_by_key)
+        else:
+            db.commit()
+
+    rows = db.execute(
+        select(PriceEOD.symbol, PriceEOD.price_date, PriceEOD.close_price).where(
+            PriceEOD.symbol.in_(symbols),
+            PriceEOD.price_date >= start_date,
+            PriceEOD.price_date <= end_date,
+            PriceEOD.source.in_(provider_chain),
+        )
+    )
+    return {(symbol, price_date): close_price for symbol, price_date, close_price in rows}
+
+
 def compare_companies(
     db: Session,
     symbols: list[str],
     start_date: date,
     end_date: date,
     providers: list[str] | None = None,
+    read_through: bool | None = None,
 ) -> CompanyCompareResult:
     clean_symbols = _normalize_symbols(symbols)
     if not clean_symbols:
@@ -114,113 +247,55 @@ def compare_companies(
         raise ValueError("Date range too wide; use 730 days or fewer")
 
     provider_chain = resolve_provider_chain(providers)
-
-    pending = list(clean_symbols)
-    points_by_key: dict[tuple[str, date], tuple[str, Decimal, str]] = {}
-
-    for provider_name in provider_chain:
-        if not pending:
-            break
-
-        provider = get_market_data_provider(provider_name)
-        points, failed = provider.fetch_history(pending, start_date, end_date)
-
-        succeeded_symbols: set[str] = set()
-        for point in points:
-            key = (point.symbol, point.price_date)
-            points_by_key[key] = (provider_name, point.close_price, point.currency)
-            succeeded_symbols.add(point.symbol)
-
-        failed_set = {symbol.strip().upper() for symbol in failed}
-        pending = [sym for sym in pending if sym not in succeeded_symbols and sym in failed_set]
-
-    if points_by_key:
-        keys = list(points_by_key.keys())
-        existing_rows = db.scalars(
-            select(PriceEOD).where(
-                PriceEOD.symbol.in_([symbol for symbol, _ in keys]),
-                PriceEOD.price_date.in_([dt for _, dt in keys]),
-            )
-        ).all()
-        existing_map = {(row.symbol, row.price_date): row for row in existing_rows}
-
-        for (symbol, dt), (source, close_price, currency) in points_by_key.items():
-            row = existing_map.get((symbol, dt))
-            if row:
-                row.close_price = close_price
-                row.currency = currency
-                row.source = source
-            else:
-                db.add(
-                    PriceEOD(
-                        symbol=symbol,
-                        price_date=dt,
-                        close_price=close_price,
-                        currency=currency,
-                        source=source,
-                        ingested_at=datetime.now(UTC),
-                    )
-                )
-        db.commit()
-
-    # Use only the data resolved in the current provider chain run.
-    # This avoids mixing stale points from previous runs with different providers.
-    timeline = sorted({dt for _, dt in points_by_key.keys()})
-
-    prices_by_date: dict[date, dict[str, float | None]] = {}
-    for dt in timeline:
-        prices_by_date[dt] = {symbol: None for symbol in clean_symbols}
-    for (symbol, dt), (_, close_price, _) in points_by_key.items():
-        prices_by_date[dt][symbol] = float(close_price)
-
-    first_price: dict[str, float | None] = {symbol: None for symbol in clean_symbols}
-    series: list[CompanyComparePoint] = []
-    for dt in timeline:
-        price_row = prices_by_date[dt]
-        norm_row: dict[str, float | None] = {}
-        for symbol in clean_symbols:
-            px = price_row.get(symbol)
-            if px is not None and first_price[symbol] is None:
-                first_price[symbol] = px
-            base = first_price[symbol]
-            norm_row[symbol] = (px / base) if (px is not None and base and base > 0) else None
-        series.append(CompanyComparePoint(date=dt, prices=price_row, normalized=norm_row))
+    if read_through is None:
+        read_through = settings.price_history_read_through
+
+    if not read_through:
+        points_by_key: dict[tuple[str, date], tuple[str, Decimal, str]] = {}
+        _fetch_gaps(provider_chain, {(start_date, end_date): clean_symbols}, points_by_key)
+        _store_history(db, points_by_key)
+        # Use only the data resolved in the current provider chain run.
+        # This avoids mixing stale points from previous runs with different providers.
+        closes = {key: close_price for key, (_, close_price, _) in points_by_key.items()}
+    else:
+        closes = _read_through_history(db, provider_chain, clean_symbols, start_date, end_date)
+
+    timeline = sorted(get_calendar().trading_dates(dt for _, dt in closes))
+
+    date_index = {dt: idx for idx, dt in enumerate(timeline)}
+    symbol_index = {symbol: idx for idx, symbol in enumerate(clean_symbols)}
+    price_matrix = np.full((len(clean_symbols), len(timeline)), np.nan)
+    for (symbol, dt), close_price in closes.items():
+        if dt in date_index:
+            price_matrix[symbol_index[symbol], date_index[dt]] = float(close_price)
+
+    returns_matrix = simple_returns(price_matrix)
+    metrics = return_metrics(returns_matrix)
+    drawdowns = max_drawdown(price_matrix)
+    correlation_values = correlation_matrix(returns_matrix)
 
     summary: list[CompanyCompareSummary] = []
-    returns_by_symbol: dict[str, dict[date, float]] = {}
-
-    for symbol in clean_symbols:
-        symbol_prices = [(dt, prices_by_date[dt][symbol]) for dt in timeline if prices_by_date[dt][symbol] is not None]
-        clean_series = [(dt, float(px)) for dt, px in symbol_prices if px is not None]
+    for idx, symbol in enumerate(clean_symbols):
+        observed = price_matrix[idx][~np.isnan(price_matrix[idx])]
 
-        if len(clean_series) >= 2:
-            start_price = clean_series[0][1]
-            end_price = clean_series[-1][1]
+        if len(observed) >= 2:
+            start_price = float(observed[0])
+            end_price = float(observed[-1])
             return_pct = (end_price / start_price) - 1.0 if start_price > 0 else 0.0
-
-            daily_returns: list[float] = []
-            for idx in range(1, len(clean_series)):
-                prev_px = clean_series[idx - 1][1]
-                cur_px = clean_series[idx][1]
-                if prev_px > 0:
-                    ret = (cur_px / prev_px) - 1.0
-                    daily_returns.append(ret)
-                    returns_by_symbol.setdefault(symbol, {})[clean_series[idx][0]] = ret
-
-            annualized_volatility = _stddev(daily_returns) * math.sqrt(252) if daily_returns else 0.0
-            max_drawdown = _max_drawdown([px for _, px in clean_series])
-        elif len(clean_series) == 1:
-            start_price = clean_series[0][1]
-            end_price = clean_series[0][1]
+            annualized_volatility = float(metrics.annualized_volatility[idx])
+            max_dd = float(drawdowns[idx])
+        elif len(observed) == 1:
+            start_price = float(observed[0])
+            end_price = float(observed[0])
             return_pct = 0.0
             annualized_volatility = 0.0
-            max_drawdown = 0.0
+            max_dd = 0.0
         else:
             start_price = None
             end_price = None
             return_pct = 0.0
             annualized_volatility = 0.0
-            max_drawdown = 0.0
+            max_dd = 0.0
 
         summary.append(
             CompanyCompareSummary(
@@ -229,32 +304,18 @@ def compare_companies(
                 end_price=end_price,
                 return_pct=return_pct,
                 annualized_volatility=annualized_volatility,
-                max_drawdown=max_drawdown,
-                observations=len(clean_series),
+                max_drawdown=max_dd,
+                observations=len(observed),
             )
         )
 
     symbols_with_data = {item.symbol for item in summary if item.observations > 0}
     failed_symbols = [symbol for symbol in clean_symbols if symbol not in symbols_with_data]
 
-    correlation: dict[str, dict[str, float]] = {}
-    for left in clean_symbols:
-        correlation[left] = {}
-        for right in clean_symbols:
-            if left == right:
-                correlation[left][right] = 1.0
-                continue
-
-            left_returns = returns_by_symbol.get(left, {})
-            right_returns = returns_by_symbol.get(right, {})
-            shared_dates = sorted(set(left_returns.keys()) & set(right_returns.keys()))
-            if len(shared_dates) < 2:
-                correlation[left][right] = 0.0
-                continue
-
-            x = [left_returns[dt] for dt in shared_dates]
-            y = [right_returns[dt] for dt in shared_dates]
-            correlation[left][right] = _pearson(x, y)
+    correlation: dict[str, dict[str, float]] = {
+        left: {right: float(correlation_values[i, j]) for j, right in enumerate(clean_symbols)}
+        for i, left in enumerate(clean_symbols)
+    }
 
     return CompanyCompareResult(
         start_date=start_date,
@@ -262,7 +323,8 @@ def compare_companies(
         symbols=clean_symbols,
         providers_used=provider_chain,
         failed_symbols=failed_symbols,
-        series=series,
+        dates=timeline,
+        prices=price_matrix,
         summary=summary,
         correlation=correlation,
     )
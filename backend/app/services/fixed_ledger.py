@@ -0,0 +1,76 @@
+from collections.abc import Iterable
+from decimal import Decimal
+
+# Trade quantities, prices and fees are Numeric(18, 6), so at 10**6 they are exact integers.
+# Average cost carries 12 guard digits beyond that and realized PnL is kept at the exact scale
+# of (avg_cost x quantity), so rounding to 6 decimal places matches the Decimal ledger.
+VALUE_DIGITS = 6
+AVG_COST_DIGITS = 18
+PNL_DIGITS = VALUE_DIGITS + AVG_COST_DIGITS
+
+VALUE_SCALE = 10**VALUE_DIGITS
+AVG_COST_SCALE = 10**AVG_COST_DIGITS
+PNL_SCALE = 10**PNL_DIGITS
+
+_NOTIONAL_TO_PNL = PNL_SCALE // (VALUE_SCALE * VALUE_SCALE)
+_VALUE_TO_PNL = PNL_SCALE // VALUE_SCALE
+
+
+class FixedLedgerState:
+    __slots__ = ("avg_cost", "currency", "quantity", "realized_pnl")
+
+    def __init__(
+        self, currency: str, quantity: int = 0, avg_cost: int = 0, realized_pnl: int = 0
+    ) -> None:
+        self.quantity = quantity
+        self.avg_cost = avg_cost
+        self.realized_pnl = realized_pnl
+        self.currency = currency
+
+
+def scale(value: Decimal, digits: int) -> int:
+    return int(Decimal(value).scaleb(digits).to_integral_value())
+
+
+def unscale(value: int, digits: int) -> Decimal:
+    return Decimal(value).scaleb(-digits)
+
+
+def replay_fixed_trades(
+    states: dict[tuple[str, str], FixedLedgerState],
+    rows: Iterable[tuple[str, str, str, str, int, int, int]],
+) -> dict[tuple[str, str], FixedLedgerState]:
+    # Rows are (account, symbol, side, currency, quantity, price, fees) with values at VALUE_SCALE.
+    # This mirrors apply_trade in portfolio.py; the arithmetic is inlined as it runs once per trade.
+    notional_to_pnl = _NOTIONAL_TO_PNL
+    value_to_pnl = _VALUE_TO_PNL
+    for account, symbol, side, currency, quantity, price, fees in rows:
+        key = (account, symbol)
+        state = states.get(key)
+        if state is None:
+            state = states[key] = FixedLedgerState(currency)
+
+        held = state.quantity
+        if side == "BUY":
+            new_quantity = held + quantity
+            if new_quantity > 0:
+                total_cost = (
+                    state.avg_cost * held + price * quantity * notional_to_pnl + fees * value_to_pnl
+                )
+                avg_cost, remainder = divmod(total_cost, new_quantity)
+                twice = 2 * remainder
+                if twice > new_quantity or (twice == new_quantity and avg_cost % 2 == 1):
+                    avg_cost += 1
+                state.avg_cost = avg_cost
+            else:
+                state.avg_cost = 0
+            state.quantity = new_quantity
+        else:
+            matched = min(quantity, held)
+            state.realized_pnl += (
+                price * matched * notional_to_pnl - fees * value_to_pnl - state.avg_cost * matched
+            )
+            state.quantity = held - quantity
+            if state.quantity == 0:
+                state.avg_cost = 0
+    return states
@@ -0,0 +1,321 @@
+import json
+import logging
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import Engine, delete, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.market_data.calendar import get_calendar
+from app.models import JobRun, PortfolioMetricsSnapshot, PortfolioMetricsState, PriceEOD, Trade
+from app.services.analytics import (
+    AnalyticsResult,
+    AnalyticsSeries,
+    build_analytics_result,
+    calculate_analytics_series,
+    empty_analytics_series,
+    iter_series_points,
+    replay_group_totals,
+)
+from app.services.portfolio import calculate_positions, latest_snapshot_ledgers
+from app.services.replay import load_price_records, load_trade_records
+
+ALL_ACCOUNTS = "*"
+
+logger = logging.getLogger(__name__)
+
+
+def _scope(account: str | None) -> str:
+    return account or ALL_ACCOUNTS
+
+
+def metrics_versions(db: Session) -> tuple[int | None, int | None]:
+    return db.scalar(select(func.max(Trade.id))), db.scalar(select(func.max(PriceEOD.id)))
+
+
+def mark_metrics_dirty(
+    db: Session,
+    from_date: date,
+    accounts: Iterable[str] | None = None,
+    before: tuple[int | None, int | None] | None = None,
+) -> None:
+    # Call after adding the new rows and before they are flushed, so the version guard can tell
+    # these writes apart from unmarked ones; Core inserts pass the metrics_versions() read before
+    # they ran instead. accounts=None marks every series (price writes).
+    if before is None:
+        before = metrics_versions(db)
+    db.flush()
+    after = metrics_versions(db)
+
+    touched = None if accounts is None else {ALL_ACCOUNTS, *accounts}
+    for state in db.scalars(select(PortfolioMetricsState)):
+        in_scope = touched is None or state.account in touched
+        if in_scope and (state.dirty_from is None or state.dirty_from > from_date):
+            state.dirty_from = from_date
+        if (state.trade_version, state.price_version) == before:
+            state.trade_version, state.price_version = after
+
+
+def _is_fresh(state: PortfolioMetricsState | None, versions: tuple[int | None, int | None]) -> bool:
+    return (
+        state is not None
+        and (state.trade_version, state.price_version) == versions
+        and state.dirty_from is None
+    )
+
+
+def _scope_dates(
+    db: Session, account: str | None, start_date: date | None, end_date: date
+) -> set[date]:
+    # A series only spans price dates of symbols traded by end_date, as calculate_analytics does.
+    trade_filter = [Trade.trade_date <= end_date]
+    if account:
+        trade_filter.append(Trade.account == account)
+    traded_symbols = select(Trade.symbol).where(*trade_filter).distinct()
+    price_filter = [PriceEOD.symbol.in_(traded_symbols), PriceEOD.price_date <= end_date]
+    if start_date is not None:
+        price_filter.append(PriceEOD.price_date >= start_date)
+    price_dates = db.scalars(select(PriceEOD.price_date).where(*price_filter).distinct())
+    return get_calendar().trading_dates(price_dates)
+
+
+def _replay_totals(
+    db: Session, account: str | None, dates: list[date], through: date
+) -> list[tuple[float, float]]:
+    # Start from the latest position snapshot before the first date to recompute, so a dirty tail
+    # replays the trades after that snapshot rather than the whole history.
+    scope = _scope(account)
+    base_date, ledgers = latest_snapshot_ledgers(db, dates[0] - timedelta(days=1), account)
+    trades = load_trade_records(db, snapshot_date=through, account=account, after=base_date)
+    symbols = {symbol for _, symbol in ledgers} | {trade.symbol for trade in trades}
+    prices = load_price_records(db, symbols, through, start_date=dates[0])
+    group_totals, _ = replay_group_totals(trades, prices, dates, through, lambda _: scope, ledgers)
+    return group_totals.get(scope, [(0.0, 0.0)] * len(dates))
+
+
+def _refresh(
+    db: Session,
+    account: str | None,
+    state: PortfolioMetricsState | None,
+    versions: tuple[int | None, int | None],
+    through: date,
+) -> None:
+    scope = _scope(account)
+    scope_dates = sorted(_scope_dates(db, account, None, through))
+
+    stored = {
+        row.metric_date: (row.market_value, row.total_pnl)
+        for row in db.execute(
+            select(
+                PortfolioMetricsSnapshot.metric_date,
+                PortfolioMetricsSnapshot.market_value,
+                PortfolioMetricsSnapshot.total_pnl,
+            ).where(PortfolioMetricsSnapshot.account == scope)
+        )
+    }
+
+    # Recompute from the earliest of: the dirty mark, the first date past the stored range, and
+    # any date without a row (a newly traded symbol brings its earlier price dates with it).
+    recompute_from: date | None = None
+    if state is not None and (state.trade_version, state.price_version) == versions:
+        candidates = [state.computed_through + timedelta(days=1)]
+        if state.dirty_from is not None:
+            candidates.append(state.dirty_from)
+        candidates.extend(dt for dt in scope_dates if dt not in stored)
+        recompute_from = min(candidates)
+
+    dates = [dt for dt in scope_dates if recompute_from is None or dt >= recompute_from]
+    totals = _replay_totals(db, account, dates, through) if dates else []
+
+    kept = [
+        (dt, *stored[dt])
+        for dt in scope_dates
+        if recompute_from is not None and dt < recompute_from
+    ]
+    points = list(
+        iter_series_points(kept + [(dt, *values) for dt, values in zip(dates, totals, strict=True)])
+    )
+
+    stale = delete(PortfolioMetricsSnapshot).where(PortfolioMetricsSnapshot.account == scope)
+    if recompute_from is not None:
+        stale = stale.where(PortfolioMetricsSnapshot.metric_date >= recompute_from)
+    db.execute(stale)
+    db.add_all(
+        [
+            PortfolioMetricsSnapshot(
+                account=scope,
+                metric_date=point.date,
+                market_value=point.market_value,
+                total_pnl=point.total_pnl,
+                daily_return=point.daily_return,
+                drawdown=point.drawdown,
+                created_at=datetime.now(UTC),
+            )
+            for point in points[len(kept) :]
+        ]
+    )
+
+    if state is None:
+        state = PortfolioMetricsState(account=scope)
+        db.add(state)
+    state.computed_through = through
+    state.dirty_from = None
+    state.trade_version, state.price_version = versions
+    state.updated_at = datetime.now(UTC)
+    db.commit()
+
+
+def refresh_metrics_snapshots(db: Session) -> int:
+    """Bring the all-accounts series and each account's series up to date.
+
+    Runs after the writes that mark series dirty (see ``run_metrics_refresh``), so reads never
+    write. Returns the number of series recomputed.
+    """
+    latest = [
+        day
+        for day in (
+            db.scalar(select(func.max(Trade.trade_date))),
+            db.scalar(select(func.max(PriceEOD.price_date))),
+        )
+        if day is not None
+    ]
+    if not latest:
+        return 0
+    through = max(latest)
+    versions = metrics_versions(db)
+
+    refreshed = 0
+    for account in [None, *db.scalars(select(Trade.account).distinct().order_by(Trade.account))]:
+        state = db.scalar(
+            select(PortfolioMetricsState).where(PortfolioMetricsState.account == _scope(account))
+        )
+        if _is_fresh(state, versions) and state.computed_through >= through:
+            continue
+        try:
+            _refresh(db, account, state, versions, through)
+        except IntegrityError:
+            # A concurrent refresh wrote the same series; it is as current as this one would be.
+            db.rollback()
+            continue
+        refreshed += 1
+    return refreshed
+
+
+def run_metrics_refresh(bind: Engine) -> None:
+    """Background entry point: refresh the metrics snapshots in a session of its own."""
+    if not settings.metrics_snapshot_enabled:
+        return
+    with Session(bind=bind, autoflush=False) as db:
+        job_run = JobRun(
+            job_name="metrics_refresh",
+            status="RUNNING",
+            started_at=datetime.now(UTC),
+            rows_processed=0,
+        )
+        db.add(job_run)
+        db.commit()
+        try:
+            job_run.rows_processed = refresh_metrics_snapshots(db)
+            job_run.status = "SUCCESS"
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Metrics snapshot refresh %s failed", job_run.id)
+            job_run.status = "FAILED"
+            job_run.run_details = json.dumps({"error": str(exc)})
+        job_run.finished_at = datetime.now(UTC)
+        db.commit()
+
+
+def _read_window(
+    db: Session,
+    account: str | None,
+    snapshot_date: date,
+    start_date: date | None,
+) -> AnalyticsSeries | None:
+    trade_filter = [Trade.trade_date <= snapshot_date]
+    if account:
+        trade_filter.append(Trade.account == account)
+
+    first_trade = db.scalar(select(func.min(Trade.trade_date)).where(*trade_filter))
+    if first_trade is None:
+        return empty_analytics_series(snapshot_date, start_date, account)
+    effective_start = min(start_date or first_trade, snapshot_date)
+
+    window_dates = _scope_dates(db, account, effective_start, snapshot_date)
+    if not window_dates:
+        return None
+
+    rows = db.execute(
+        select(
+            PortfolioMetricsSnapshot.metric_date,
+            PortfolioMetricsSnapshot.market_value,
+            PortfolioMetricsSnapshot.total_pnl,
+        )
+        .where(
+            PortfolioMetricsSnapshot.account == _scope(account),
+            PortfolioMetricsSnapshot.metric_date >= effective_start,
+            PortfolioMetricsSnapshot.metric_date <= snapshot_date,
+        )
+        .order_by(PortfolioMetricsSnapshot.metric_date)
+    )
+    totals = [
+        (row.metric_date, row.market_value, row.total_pnl)
+        for row in rows
+        if row.metric_date in window_dates
+    ]
+    if len(totals) != len(window_dates):
+        return None
+
+    positions = calculate_positions(db=db, snapshot_date=snapshot_date, account=account)
+    exposure = [
+        (pos.symbol, float(pos.market_value or 0))
+        for pos in positions
+        if float(pos.market_value or 0) > 0
+    ]
+    return AnalyticsSeries(
+        snapshot_date=snapshot_date,
+        start_date=effective_start,
+        account_filter=account,
+        totals=totals,
+        exposure=exposure,
+    )
+
+
+def read_portfolio_series(
+    db: Session,
+    snapshot_date: date,
+    account: str | None = None,
+    start_date: date | None = None,
+) -> AnalyticsSeries:
+    if not settings.metrics_snapshot_enabled:
+        return calculate_analytics_series(
+            db, snapshot_date=snapshot_date, account=account, start_date=start_date
+        )
+
+    # Series are refreshed by the write paths; a stale or missing one is served live meanwhile.
+    state = db.scalar(
+        select(PortfolioMetricsState).where(PortfolioMetricsState.account == _scope(account))
+    )
+    series = None
+    if _is_fresh(state, metrics_versions(db)):
+        series = _read_window(db, account, snapshot_date, start_date)
+    if series is None:
+        return calculate_analytics_series(
+            db, snapshot_date=snapshot_date, account=account, start_date=start_date
+        )
+    return series
+
+
+def read_portfolio_analytics(
+    db: Session,
+    snapshot_date: date,
+    account: str | None = None,
+    start_date: date | None = None,
+) -> AnalyticsResult:
+    return build_analytics_result(
+        read_portfolio_series(
+            db, snapshot_date=snapshot_date, account=account, start_date=start_date
+        )
+    )
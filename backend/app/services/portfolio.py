@@ -3,10 +3,22 @@ from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
 
-from sqlalchemy import and_, func, select
-from sqlalchemy.orm import Session
-
-from app.models import PriceEOD, Trade
+from sqlalchemy import BigInteger, ColumnElement, Select, and_, cast, func, select
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from app.config import settings
+from app.models import PositionSnapshot, PriceEOD, Trade
+from app.services.fixed_ledger import (
+    AVG_COST_DIGITS,
+    PNL_DIGITS,
+    VALUE_DIGITS,
+    VALUE_SCALE,
+    FixedLedgerState,
+    replay_fixed_trades,
+    scale,
+    unscale,
+)
+from app.services.price_cache import get_price_matrix
 
 
 @dataclass
@@ -23,15 +35,64 @@ class PositionCalc:
     currency: str
 
 
+@dataclass
+class LedgerState:
+    quantity: Decimal
+    avg_cost: Decimal
+    realized_pnl: Decimal
+    currency: str
+
+    @classmethod
+    def empty(cls, currency: str) -> "LedgerState":
+        return cls(
+            quantity=Decimal(0), avg_cost=Decimal(0), realized_pnl=Decimal(0), currency=currency
+        )
+
+
 def _to_decimal(value: Decimal) -> Decimal:
     return Decimal(value)
 
 
-def _latest_prices(db: Session, symbols: Iterable[str], snapshot_date: date) -> dict[str, PriceEOD]:
-    symbol_list = sorted(set(symbols))
-    if not symbol_list:
-        return {}
+def apply_trade(
+    state: LedgerState, side: str, quantity: Decimal, price: Decimal, fees: Decimal
+) -> None:
+    if side == "BUY":
+        total_cost = (state.avg_cost * state.quantity) + (price * quantity) + fees
+        new_quantity = state.quantity + quantity
+        state.avg_cost = total_cost / new_quantity if new_quantity > 0 else Decimal(0)
+        state.quantity = new_quantity
+    else:
+        matched_quantity = min(state.quantity, quantity)
+        realized_increment = (price * matched_quantity - fees) - (state.avg_cost * matched_quantity)
+        new_quantity = state.quantity - quantity
+        state.quantity = new_quantity
+        state.realized_pnl = state.realized_pnl + realized_increment
+        state.avg_cost = Decimal(0) if new_quantity == 0 else state.avg_cost
+
+
+def position_from_state(
+    account: str, symbol: str, state: LedgerState, market_price: Decimal | None
+) -> PositionCalc:
+    market_value = state.quantity * market_price if market_price is not None else None
+    cost_basis = state.quantity * state.avg_cost
+    unrealized_pnl = market_value - cost_basis if market_value is not None else None
+    return PositionCalc(
+        account=account,
+        symbol=symbol,
+        quantity=state.quantity,
+        avg_cost=state.avg_cost,
+        cost_basis=cost_basis,
+        market_price=market_price,
+        market_value=market_value,
+        unrealized_pnl=unrealized_pnl,
+        realized_pnl=state.realized_pnl,
+        currency=state.currency,
+    )
+
 
+def _query_latest_prices(
+    db: Session, symbol_list: list[str], snapshot_date: date
+) -> dict[str, Decimal]:
     subquery = (
         select(PriceEOD.symbol, func.max(PriceEOD.price_date).label("latest_date"))
         .where(PriceEOD.symbol.in_(symbol_list), PriceEOD.price_date <= snapshot_date)
@@ -49,80 +110,130 @@ def _latest_prices(db: Session, symbols: Iterable[str], snapshot_date: date) ->
         )
     ).all()
 
-    return {row.symbol: row for row in rows}
+    return {row.symbol: _to_decimal(row.close_price) for row in rows}
 
 
-def calculate_positions(db: Session, snapshot_date: date, account: str | None = None) -> list[PositionCalc]:
-    trade_query = select(Trade).where(Trade.trade_date <= snapshot_date)
+def _latest_prices(db: Session, symbols: Iterable[str], snapshot_date: date) -> dict[str, Decimal]:
+    symbol_list = sorted(set(symbols))
+    if not symbol_list:
+        return {}
+
+    if settings.price_cache_enabled:
+        cached = get_price_matrix(db).latest_closes(db, symbol_list, snapshot_date)
+        if cached is not None:
+            return cached
+
+    return _query_latest_prices(db, symbol_list, snapshot_date)
+
+
+def latest_snapshot_ledgers(
+    db: Session, snapshot_date: date, account: str | None = None
+) -> tuple[date | None, dict[tuple[str, str], LedgerState]]:
+    base_date = db.scalar(
+        select(func.max(PositionSnapshot.snapshot_date)).where(
+            PositionSnapshot.snapshot_date <= snapshot_date
+        )
+    )
+    if base_date is None:
+        return None, {}
+
+    query = select(PositionSnapshot).where(PositionSnapshot.snapshot_date == base_date)
     if account:
-        trade_query = trade_query.where(Trade.account == account)
+        query = query.where(PositionSnapshot.account == account)
+
+    ledgers = {
+        (row.account, row.symbol): LedgerState(
+            quantity=_to_decimal(row.quantity),
+            avg_cost=_to_decimal(row.avg_cost),
+            realized_pnl=_to_decimal(row.realized_pnl),
+            currency=row.currency,
+        )
+        for row in db.scalars(query)
+    }
+    return base_date, ledgers
+
 
+def _replay_decimal(
+    db: Session,
+    ledgers: dict[tuple[str, str], LedgerState],
+    trade_query: Select,
+) -> dict[tuple[str, str], LedgerState]:
     trades = db.scalars(trade_query.order_by(Trade.trade_date, Trade.id)).all()
-    if not trades:
-        return []
+    for trade in trades:
+        state = ledgers.setdefault((trade.account, trade.symbol), LedgerState.empty(trade.currency))
+        apply_trade(
+            state,
+            side=trade.side,
+            quantity=_to_decimal(trade.quantity),
+            price=_to_decimal(trade.price),
+            fees=_to_decimal(trade.fees),
+        )
+    return ledgers
 
-    prices = _latest_prices(db, (trade.symbol for trade in trades), snapshot_date)
 
-    ledgers: dict[tuple[str, str], dict[str, Decimal | str]] = {}
-    for trade in trades:
-        key = (trade.account, trade.symbol)
-        state = ledgers.setdefault(
-            key,
-            {
-                "quantity": Decimal("0"),
-                "avg_cost": Decimal("0"),
-                "realized_pnl": Decimal("0"),
-                "currency": trade.currency,
-            },
+def _scaled_column(column: InstrumentedAttribute[Decimal]) -> ColumnElement[int]:
+    return cast(func.round(column * VALUE_SCALE), BigInteger)
+
+
+def _replay_fixed(
+    db: Session,
+    ledgers: dict[tuple[str, str], LedgerState],
+    trade_query: Select,
+) -> dict[tuple[str, str], LedgerState]:
+    states = {
+        key: FixedLedgerState(
+            currency=state.currency,
+            quantity=scale(state.quantity, VALUE_DIGITS),
+            avg_cost=scale(state.avg_cost, AVG_COST_DIGITS),
+            realized_pnl=scale(state.realized_pnl, PNL_DIGITS),
         )
+        for key, state in ledgers.items()
+    }
+
+    rows = db.execute(
+        trade_query.with_only_columns(
+            Trade.account,
+            Trade.symbol,
+            Trade.side,
+            Trade.currency,
+            _scaled_column(Trade.quantity),
+            _scaled_column(Trade.price),
+            _scaled_column(Trade.fees),
+        ).order_by(Trade.trade_date, Trade.id)
+    )
+    replay_fixed_trades(states, rows)
+
+    return {
+        key: LedgerState(
+            quantity=unscale(state.quantity, VALUE_DIGITS),
+            avg_cost=unscale(state.avg_cost, AVG_COST_DIGITS),
+            realized_pnl=unscale(state.realized_pnl, PNL_DIGITS),
+            currency=state.currency,
+        )
+        for key, state in states.items()
+    }
+
+
+def calculate_positions(db: Session, snapshot_date: date, account: str | None = None) -> list[PositionCalc]:
+    base_date, ledgers = latest_snapshot_ledgers(db, snapshot_date, account)
+
+    trade_query = select(Trade).where(Trade.trade_date <= snapshot_date)
+    if base_date is not None:
+        trade_query = trade_query.where(Trade.trade_date > base_date)
+    if account:
+        trade_query = trade_query.where(Trade.account == account)
 
-        quantity = _to_decimal(state["quantity"])
-        avg_cost = _to_decimal(state["avg_cost"])
-        realized_pnl = _to_decimal(state["realized_pnl"])
-
-        trade_quantity = _to_decimal(trade.quantity)
-        trade_price = _to_decimal(trade.price)
-        trade_fees = _to_decimal(trade.fees)
-
-        if trade.side == "BUY":
-            total_cost = (avg_cost * quantity) + (trade_price * trade_quantity) + trade_fees
-            new_quantity = quantity + trade_quantity
-            new_avg_cost = total_cost / new_quantity if new_quantity > 0 else Decimal("0")
-            state["quantity"] = new_quantity
-            state["avg_cost"] = new_avg_cost
-        else:
-            matched_quantity = min(quantity, trade_quantity)
-            realized_increment = (trade_price * matched_quantity - trade_fees) - (avg_cost * matched_quantity)
-            new_quantity = quantity - trade_quantity
-            state["quantity"] = new_quantity
-            state["realized_pnl"] = realized_pnl + realized_increment
-            state["avg_cost"] = Decimal("0") if new_quantity == 0 else avg_cost
+    if settings.ledger_engine == "fixed":
+        ledgers = _replay_fixed(db, ledgers, trade_query)
+    else:
+        ledgers = _replay_decimal(db, ledgers, trade_query)
+    if not ledgers:
+        return []
+
+    prices = _latest_prices(db, {symbol for _, symbol in ledgers}, snapshot_date)
 
     positions: list[PositionCalc] = []
     for (acct, symbol), state in sorted(ledgers.items(), key=lambda item: (item[0][0], item[0][1])):
-        quantity = _to_decimal(state["quantity"])
-        avg_cost = _to_decimal(state["avg_cost"])
-        realized_pnl = _to_decimal(state["realized_pnl"])
-        price_row = prices.get(symbol)
-
-        market_price: Decimal | None = _to_decimal(price_row.close_price) if price_row else None
-        market_value: Decimal | None = quantity * market_price if market_price is not None else None
-        cost_basis = quantity * avg_cost
-        unrealized_pnl: Decimal | None = market_value - cost_basis if market_value is not None else None
-
-        positions.append(
-            PositionCalc(
-                account=acct,
-                symbol=symbol,
-                quantity=quantity,
-                avg_cost=avg_cost,
-                cost_basis=cost_basis,
-                market_price=market_price,
-                market_value=market_value,
-                unrealized_pnl=unrealized_pnl,
-                realized_pnl=realized_pnl,
-                currency=str(state["currency"]),
-            )
-        )
+        positions.append(position_from_state(acct, symbol, state, prices.get(symbol)))
 
     return positions
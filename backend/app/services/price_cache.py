@@ -0,0 +1,239 @@
+import threading
+from collections.abc import Iterable
+from datetime import date
+from decimal import Decimal
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import PriceEOD, WriteCounter
+
+PRICE_SCALE = 1_000_000
+MISSING = np.iinfo(np.int64).min
+PRICE_WRITES = "prices_eod"
+
+# (price write counter, max(prices_eod.id)): the counter moves on every upsert_prices call,
+# updates included; max(id) still catches rows inserted any other way.
+PriceVersion = tuple[int, int | None]
+
+
+def to_scaled(value: Decimal) -> int:
+    return int((Decimal(value) * PRICE_SCALE).to_integral_value())
+
+
+def from_scaled(value: int) -> Decimal:
+    return Decimal(int(value)).scaleb(-6)
+
+
+def price_version(db: Session) -> PriceVersion:
+    counter = db.scalar(select(WriteCounter.value).where(WriteCounter.name == PRICE_WRITES))
+    return counter or 0, db.scalar(select(func.max(PriceEOD.id)))
+
+
+def bump_price_version(db: Session) -> int:
+    """Count one price write in the caller's transaction and return the new counter value.
+
+    On PostgreSQL the counter row stays locked until the caller commits, so concurrent price
+    writers are serialized and each sees the counter value its own write started from.
+    """
+    dialect = db.connection().dialect.name
+    dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = dialect_insert(WriteCounter).values(name=PRICE_WRITES, value=1)
+    statement = statement.on_conflict_do_update(
+        index_elements=[WriteCounter.name], set_={"value": WriteCounter.value + 1}
+    ).returning(WriteCounter.value)
+    return db.scalar(statement)
+
+
+class PriceMatrix:
+    """Dense symbols x trading-dates matrix of closes, forward-filled for as-of lookups.
+
+    Closes are stored as int64 scaled to the 6 decimal places of ``prices_eod.close_price`` so
+    lookups return exactly the stored Decimal. Symbols are loaded on first use and evicted
+    least-recently-used once the matrix grows past ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.version: PriceVersion | None = None
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._symbols: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._last_used: dict[str, int] = {}
+        self._clock = 0
+        self._dates = np.empty(0, dtype=np.int64)
+        self._raw = np.empty((0, 0), dtype=np.int64)
+        self._filled = np.empty((0, 0), dtype=np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        return self._dates.nbytes + self._raw.nbytes + self._filled.nbytes
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self._symbols)
+
+    def _forward_fill(self, raw: np.ndarray) -> np.ndarray:
+        if raw.size == 0:
+            return raw.copy()
+        idx = np.where(raw != MISSING, np.arange(raw.shape[1]), 0)
+        np.maximum.accumulate(idx, axis=1, out=idx)
+        return np.take_along_axis(raw, idx, axis=1)
+
+    def _ensure_dates(self, ordinals: np.ndarray) -> None:
+        merged = np.union1d(self._dates, ordinals)
+        if len(merged) == len(self._dates):
+            return
+        raw = np.full((len(self._symbols), len(merged)), MISSING, dtype=np.int64)
+        raw[:, np.searchsorted(merged, self._dates)] = self._raw
+        self._dates = merged
+        self._raw = raw
+        self._filled = self._forward_fill(raw)
+
+    def _set_cells(self, points: Iterable[tuple[str, date, Decimal]]) -> np.ndarray:
+        rows, ordinals, values = [], [], []
+        for symbol, price_date, close_price in points:
+            row = self._rows.get(symbol)
+            if row is None:
+                continue
+            rows.append(row)
+            ordinals.append(price_date.toordinal())
+            values.append(to_scaled(close_price))
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+
+        ordinal_array = np.asarray(ordinals, dtype=np.int64)
+        self._ensure_dates(ordinal_array)
+        row_array = np.asarray(rows, dtype=np.int64)
+        self._raw[row_array, np.searchsorted(self._dates, ordinal_array)] = values
+        return np.unique(row_array)
+
+    def _load(self, db: Session, symbols: list[str]) -> None:
+        missing = [symbol for symbol in symbols if symbol not in self._rows]
+        if not missing:
+            return
+
+        start = len(self._symbols)
+        self._symbols.extend(missing)
+        self._rows.update({symbol: start + offset for offset, symbol in enumerate(missing)})
+        self._raw = np.vstack(
+            [self._raw, np.full((len(missing), len(self._dates)), MISSING, dtype=np.int64)]
+        )
+        self._filled = np.vstack([self._filled, self._raw[start:]])
+
+        rows = db.execute(
+            select(PriceEOD.symbol, PriceEOD.price_date, PriceEOD.close_price).where(
+                PriceEOD.symbol.in_(missing)
+            )
+        ).all()
+        touched = self._set_cells(rows)
+        if len(touched):
+            self._filled[touched] = self._forward_fill(self._raw[touched])
+
+    def _evict(self, keep: set[str]) -> None:
+        if self.nbytes <= self.max_bytes:
+            return
+
+        row_bytes = 2 * self._dates.itemsize * len(self._dates)
+        excess_rows = -(-(self.nbytes - self.max_bytes) // max(row_bytes, 1))
+        candidates = sorted(
+            (s for s in self._symbols if s not in keep), key=lambda s: self._last_used.get(s, 0)
+        )
+        victims = {self._rows[s] for s in candidates[:excess_rows]}
+        if victims:
+            kept_rows = [row for row in range(len(self._symbols)) if row not in victims]
+            self._symbols = [self._symbols[row] for row in kept_rows]
+            self._rows = {symbol: idx for idx, symbol in enumerate(self._symbols)}
+            self._last_used = {symbol: self._last_used.get(symbol, 0) for symbol in self._symbols}
+            self._raw = self._raw[kept_rows]
+
+            used_columns = (self._raw != MISSING).any(axis=0)
+            self._dates = self._dates[used_columns]
+            self._raw = self._raw[:, used_columns]
+            self._filled = self._forward_fill(self._raw)
+
+    def latest_closes(
+        self, db: Session, symbols: list[str], as_of: date
+    ) -> dict[str, Decimal] | None:
+        # Any write this process did not apply through record_price_writes (another worker, an
+        # out-of-band insert) changes the version and reloads the matrix.
+        current_version = price_version(db)
+
+        with self._lock:
+            if current_version != self.version:
+                self._reset()
+                self.version = current_version
+
+            self._load(db, symbols)
+            self._clock += 1
+            for symbol in symbols:
+                self._last_used[symbol] = self._clock
+            self._evict(keep=set(symbols))
+            if self.nbytes > self.max_bytes:
+                self._reset()
+                self.version = current_version
+                return None
+
+            column = int(np.searchsorted(self._dates, as_of.toordinal(), side="right")) - 1
+            if column < 0:
+                return {}
+            rows = np.asarray([self._rows[symbol] for symbol in symbols], dtype=np.int64)
+            values = self._filled[rows, column]
+            return {
+                symbol: from_scaled(value)
+                for symbol, value in zip(symbols, values, strict=True)
+                if value != MISSING
+            }
+
+    def apply(
+        self, points: Iterable[tuple[str, date, Decimal]], before: PriceVersion, after: PriceVersion
+    ) -> None:
+        with self._lock:
+            if self.version != before:
+                # Writes from elsewhere landed since the matrix was loaded; reload on the next read.
+                self._reset()
+                self.version = None
+                return
+            touched = self._set_cells(points)
+            if len(touched):
+                self._filled[touched] = self._forward_fill(self._raw[touched])
+            self.version = after
+
+
+_matrices: "WeakKeyDictionary[Engine, PriceMatrix]" = WeakKeyDictionary()
+_registry_lock = threading.Lock()
+
+
+def _engine_for(db: Session) -> Engine:
+    bind = db.get_bind()
+    return getattr(bind, "engine", bind)
+
+
+def get_price_matrix(db: Session) -> PriceMatrix:
+    engine = _engine_for(db)
+    with _registry_lock:
+        matrix = _matrices.get(engine)
+        if matrix is None:
+            matrix = PriceMatrix(max_bytes=settings.price_cache_max_bytes)
+            _matrices[engine] = matrix
+        return matrix
+
+
+def record_price_writes(
+    db: Session,
+    points: Iterable[tuple[str, date, Decimal]],
+    versions: tuple[PriceVersion, PriceVersion] | None,
+) -> None:
+    """Apply committed price writes to this process's matrix; ``versions`` is from upsert_prices."""
+    matrix = _matrices.get(_engine_for(db))
+    if matrix is None or versions is None:
+        return
+    matrix.apply(points, *versions)
@@ -0,0 +1,82 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models import PriceCoverage
+
+DateRange = tuple[date, date]
+
+
+def _subtract(start_date: date, end_date: date, covered: list[DateRange]) -> list[DateRange]:
+    gaps: list[DateRange] = []
+    cursor = start_date
+    for covered_start, covered_end in sorted(covered):
+        if covered_end < cursor:
+            continue
+        if covered_start > end_date:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start - timedelta(days=1)))
+        cursor = max(cursor, covered_end + timedelta(days=1))
+        if cursor > end_date:
+            return gaps
+    if cursor <= end_date:
+        gaps.append((cursor, end_date))
+    return gaps
+
+
+def coverage_gaps(
+    db: Session, symbols: list[str], sources: list[str], start_date: date, end_date: date
+) -> dict[str, list[DateRange]]:
+    """Return the parts of ``start_date..end_date`` no provider in ``sources`` has covered.
+
+    Gaps are keyed by symbol; symbols with nothing missing are left out.
+    """
+    covered: dict[str, list[DateRange]] = defaultdict(list)
+    rows = db.execute(
+        select(PriceCoverage.symbol, PriceCoverage.start_date, PriceCoverage.end_date).where(
+            PriceCoverage.symbol.in_(symbols),
+            PriceCoverage.source.in_(sources),
+            PriceCoverage.start_date <= end_date,
+            PriceCoverage.end_date >= start_date,
+        )
+    )
+    for symbol, covered_start, covered_end in rows:
+        covered[symbol].append((covered_start, covered_end))
+
+    gaps: dict[str, list[DateRange]] = {}
+    for symbol in symbols:
+        missing = _subtract(start_date, end_date, covered.get(symbol, []))
+        if missing:
+            gaps[symbol] = missing
+    return gaps
+
+
+def record_coverage(
+    db: Session, symbol: str, source: str, start_date: date, end_date: date
+) -> None:
+    """Mark ``start_date..end_date`` as fetched from ``source``, merging with touching ranges.
+
+    The caller commits.
+    """
+    if start_date > end_date:
+        return
+    touching = db.execute(
+        select(PriceCoverage.id, PriceCoverage.start_date, PriceCoverage.end_date).where(
+            PriceCoverage.symbol == symbol,
+            PriceCoverage.source == source,
+            PriceCoverage.start_date <= end_date + timedelta(days=1),
+            PriceCoverage.end_date >= start_date - timedelta(days=1),
+        )
+    ).all()
+    if touching:
+        start_date = min(start_date, *(row.start_date for row in touching))
+        end_date = max(end_date, *(row.end_date for row in touching))
+        db.execute(delete(PriceCoverage).where(PriceCoverage.id.in_([row.id for row in touching])))
+    db.execute(
+        insert(PriceCoverage).values(
+            symbol=symbol, source=source, start_date=start_date, end_date=end_date
+        )
+    )
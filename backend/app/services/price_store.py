@@ -0,0 +1,84 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import PriceEOD
+from app.services.metrics_snapshot import mark_metrics_dirty, metrics_versions
+from app.services.price_cache import PriceVersion, bump_price_version
+
+UPSERT_BATCH_SIZE = 1_000
+
+PriceRow = tuple[str, date, Decimal, str, str]
+
+
+@dataclass
+class PriceUpsertResult:
+    inserted_rows: int = 0
+    updated_rows: int = 0
+    # Price versions right before and after this write, for record_price_writes.
+    versions: tuple[PriceVersion, PriceVersion] | None = None
+
+    @property
+    def written_rows(self) -> int:
+        return self.inserted_rows + self.updated_rows
+
+
+def upsert_prices(db: Session, rows: Iterable[PriceRow]) -> PriceUpsertResult:
+    """Insert or update (symbol, price_date, close_price, currency, source) rows on the
+    uq_prices_eod_symbol_date constraint.
+
+    Rows are written in batches of ``UPSERT_BATCH_SIZE`` with INSERT ... ON CONFLICT DO UPDATE, and
+    the affected metric series are marked dirty. The caller commits.
+    """
+    # A statement may touch each key once, so later rows for the same key win.
+    by_key = {(row[0], row[1]): row for row in rows}
+    result = PriceUpsertResult()
+    if not by_key:
+        return result
+
+    # Bumped first: on PostgreSQL this locks the counter row, so no other price writer commits
+    # between the versions read here and this transaction's commit.
+    counter = bump_price_version(db)
+    before = metrics_versions(db)
+    # Ids only grow, so rows returned with an id past the pre-write maximum are the inserted ones.
+    max_id = before[1] or 0
+    dialect_insert = (
+        postgresql.insert if db.connection().dialect.name == "postgresql" else sqlite.insert
+    )
+    ingested_at = datetime.now(UTC)
+    values = [
+        {
+            "symbol": symbol,
+            "price_date": price_date,
+            "close_price": close,
+            "currency": currency,
+            "source": source,
+            "ingested_at": ingested_at,
+        }
+        for symbol, price_date, close, currency, source in by_key.values()
+    ]
+
+    statement = dialect_insert(PriceEOD)
+    statement = statement.on_conflict_do_update(
+        index_elements=[PriceEOD.symbol, PriceEOD.price_date],
+        set_={
+            "close_price": statement.excluded.close_price,
+            "currency": statement.excluded.currency,
+            "source": statement.excluded.source,
+        },
+    ).returning(PriceEOD.id)
+    for offset in range(0, len(values), UPSERT_BATCH_SIZE):
+        # executemany with RETURNING: SQLAlchemy packs each batch into multi-row VALUES statements.
+        for row_id in db.scalars(statement, values[offset : offset + UPSERT_BATCH_SIZE]):
+            if row_id > max_id:
+                result.inserted_rows += 1
+            else:
+                result.updated_rows += 1
+
+    mark_metrics_dirty(db, from_date=min(price_date for _, price_date in by_key), before=before)
+    result.versions = (counter - 1, before[1]), (counter, metrics_versions(db)[1])
+    return result
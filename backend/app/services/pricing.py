@@ -1,3 +1,4 @@
+import asyncio
 import json
 from dataclasses import dataclass
 from datetime import UTC, date, datetime
@@ -5,8 +6,14 @@ from datetime import UTC, date, datetime
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.market_data.factory import get_market_data_provider, resolve_provider_chain
-from app.models import JobRun, PriceEOD, Trade
+from app.config import settings
+from app.market_data.base import PricePoint
+from app.market_data.calendar import get_calendar
+from app.market_data.factory import resolve_provider_chain
+from app.market_data.fetching import afetch_through_chain, fetch_through_chain
+from app.models import JobRun, Trade
+from app.services.price_cache import record_price_writes
+from app.services.price_store import upsert_prices
 
 
 @dataclass
@@ -27,6 +34,9 @@ def refresh_prices(
     providers: list[str] | None = None,
 ) -> PriceRefreshResult:
     provider_chain = resolve_provider_chain(providers)
+    # A weekend or holiday has no close of its own; store the last session's close under its own
+    # date.
+    price_date = get_calendar().previous_trading_day(price_date)
 
     requested_symbols = sorted({symbol.strip().upper() for symbol in (symbols or []) if symbol.strip()})
     if not requested_symbols:
@@ -61,47 +71,34 @@ def refresh_prices(
             job_run_id=job_run.id,
         )
 
-    pending = list(requested_symbols)
-    points_by_symbol: dict[str, tuple[str, object]] = {}
-
-    for provider_name in provider_chain:
-        if not pending:
-            break
-        provider = get_market_data_provider(provider_name)
-        points, failed = provider.fetch_eod(pending, price_date)
-
-        for point in points:
-            points_by_symbol[point.symbol] = (provider_name, point)
-
-        failed_set = set(failed)
-        pending = [symbol for symbol in pending if symbol in failed_set]
-
-    points = [point for _, point in points_by_symbol.values()]
-    existing_rows = db.scalars(
-        select(PriceEOD).where(PriceEOD.symbol.in_([point.symbol for point in points]), PriceEOD.price_date == price_date)
-    ).all()
-    existing_map = {(row.symbol, row.price_date): row for row in existing_rows}
-
-    processed = 0
-    for symbol, (provider_name, point) in points_by_symbol.items():
-        key = (symbol, point.price_date)
-        row = existing_map.get(key)
-        if row:
-            row.close_price = point.close_price
-            row.currency = point.currency
-            row.source = provider_name
-        else:
-            db.add(
-                PriceEOD(
-                    symbol=point.symbol,
-                    price_date=point.price_date,
-                    close_price=point.close_price,
-                    currency=point.currency,
-                    source=provider_name,
-                    ingested_at=datetime.now(UTC),
-                )
+    if settings.price_fetch_async:
+        fetched = asyncio.run(
+            afetch_through_chain(
+                provider_chain,
+                requested_symbols,
+                lambda provider, chunk: provider.afetch_eod(chunk, price_date),
             )
-        processed += 1
+        )
+    else:
+        fetched = fetch_through_chain(
+            provider_chain,
+            requested_symbols,
+            lambda provider, chunk: provider.fetch_eod(chunk, price_date),
+        )
+    points_by_symbol: dict[str, tuple[str, PricePoint]] = {
+        point.symbol: (name, point) for name, point in fetched.points
+    }
+    failed_set = set(fetched.failed)
+    pending = [symbol for symbol in requested_symbols if symbol in failed_set]
+
+    upserted = upsert_prices(
+        db,
+        (
+            (point.symbol, point.price_date, point.close_price, point.currency, provider_name)
+            for provider_name, point in points_by_symbol.values()
+        ),
+    )
+    processed = upserted.written_rows
 
     job_run.rows_processed = processed
     job_run.status = "SUCCESS" if not pending else "PARTIAL_FAILED"
@@ -111,9 +108,19 @@ def refresh_prices(
             "price_date": price_date.isoformat(),
             "requested_symbols": requested_symbols,
             "failed_symbols": pending,
+            "inserted_rows": upserted.inserted_rows,
+            "updated_rows": upserted.updated_rows,
         }
     )
     db.commit()
+    record_price_writes(
+        db,
+        (
+            (point.symbol, point.price_date, point.close_price)
+            for _, point in points_by_symbol.values()
+        ),
+        upserted.versions,
+    )
 
     return PriceRefreshResult(
         provider=provider_chain[0],
@@ -0,0 +1,154 @@
+from bisect import insort
+from collections.abc import Iterable, Sequence
+from datetime import date
+from decimal import Decimal
+from typing import NamedTuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import PriceEOD, Trade
+from app.services.portfolio import LedgerState, PositionCalc, apply_trade, position_from_state
+
+
+class TradeRecord(NamedTuple):
+    account: str
+    symbol: str
+    trade_date: date
+    side: str
+    quantity: Decimal
+    price: Decimal
+    fees: Decimal
+    currency: str
+
+
+class PriceRecord(NamedTuple):
+    symbol: str
+    price_date: date
+    close_price: Decimal
+
+
+def load_trade_records(
+    db: Session,
+    snapshot_date: date,
+    account: str | None = None,
+    accounts: list[str] | None = None,
+    after: date | None = None,
+) -> list[TradeRecord]:
+    query = select(
+        Trade.account,
+        Trade.symbol,
+        Trade.trade_date,
+        Trade.side,
+        Trade.quantity,
+        Trade.price,
+        Trade.fees,
+        Trade.currency,
+    ).where(Trade.trade_date <= snapshot_date)
+    if account:
+        query = query.where(Trade.account == account)
+    if accounts:
+        query = query.where(Trade.account.in_(accounts))
+    if after is not None:
+        query = query.where(Trade.trade_date > after)
+
+    return [TradeRecord(*row) for row in db.execute(query.order_by(Trade.trade_date, Trade.id))]
+
+
+def load_price_records(
+    db: Session,
+    symbols: Iterable[str],
+    end_date: date,
+    start_date: date | None = None,
+) -> list[PriceRecord]:
+    """Closes of ``symbols`` up to ``end_date``, sorted by date.
+
+    With ``start_date``, each symbol's last close before it leads the list, so a replay that starts
+    there still values positions priced only earlier.
+    """
+    symbol_list = sorted(set(symbols))
+    if not symbol_list:
+        return []
+
+    query = (
+        select(PriceEOD.symbol, PriceEOD.price_date, PriceEOD.close_price)
+        .where(PriceEOD.symbol.in_(symbol_list), PriceEOD.price_date <= end_date)
+        .order_by(PriceEOD.price_date, PriceEOD.symbol)
+    )
+    if start_date is None:
+        return [PriceRecord(*row) for row in db.execute(query)]
+
+    last_before = (
+        select(PriceEOD.symbol, func.max(PriceEOD.price_date).label("price_date"))
+        .where(PriceEOD.symbol.in_(symbol_list), PriceEOD.price_date < start_date)
+        .group_by(PriceEOD.symbol)
+        .subquery()
+    )
+    leading = (
+        select(PriceEOD.symbol, PriceEOD.price_date, PriceEOD.close_price)
+        .join(
+            last_before,
+            (PriceEOD.symbol == last_before.c.symbol)
+            & (PriceEOD.price_date == last_before.c.price_date),
+        )
+        .order_by(PriceEOD.price_date, PriceEOD.symbol)
+    )
+    return [PriceRecord(*row) for row in db.execute(leading)] + [
+        PriceRecord(*row) for row in db.execute(query.where(PriceEOD.price_date >= start_date))
+    ]
+
+
+class LedgerReplay:
+    """Walks trades and prices forward once, keeping running per-(account, symbol) ledger state.
+
+    Both inputs must be sorted by date. Calling ``advance`` with non-decreasing dates yields the
+    same positions ``calculate_positions`` would return for each of those dates. ``ledgers`` seeds
+    the state from a position snapshot; ``trades`` then holds only the trades after it.
+    """
+
+    def __init__(
+        self,
+        trades: Sequence[TradeRecord],
+        prices: Sequence[PriceRecord],
+        ledgers: dict[tuple[str, str], LedgerState] | None = None,
+    ) -> None:
+        self._trades = trades
+        self._prices = prices
+        self._trade_idx = 0
+        self._price_idx = 0
+        self._ledgers: dict[tuple[str, str], LedgerState] = dict(ledgers or {})
+        self._keys: list[tuple[str, str]] = sorted(self._ledgers)
+        self._latest_prices: dict[str, Decimal] = {}
+
+    def advance(self, as_of: date) -> None:
+        trades = self._trades
+        while self._trade_idx < len(trades) and trades[self._trade_idx].trade_date <= as_of:
+            trade = trades[self._trade_idx]
+            key = (trade.account, trade.symbol)
+            state = self._ledgers.get(key)
+            if state is None:
+                state = LedgerState.empty(trade.currency)
+                self._ledgers[key] = state
+                insort(self._keys, key)
+            apply_trade(
+                state,
+                side=trade.side,
+                quantity=Decimal(trade.quantity),
+                price=Decimal(trade.price),
+                fees=Decimal(trade.fees),
+            )
+            self._trade_idx += 1
+
+        prices = self._prices
+        while self._price_idx < len(prices) and prices[self._price_idx].price_date <= as_of:
+            price = prices[self._price_idx]
+            self._latest_prices[price.symbol] = Decimal(price.close_price)
+            self._price_idx += 1
+
+    def positions(self) -> list[PositionCalc]:
+        return [
+            position_from_state(
+                account, symbol, self._ledgers[(account, symbol)], self._latest_prices.get(symbol)
+            )
+            for account, symbol in self._keys
+        ]
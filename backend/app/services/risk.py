@@ -0,0 +1,134 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+@dataclass
+class ReturnMetrics:
+    annualized_volatility: np.ndarray
+    sharpe_ratio: np.ndarray
+    var_95: np.ndarray
+    cvar_95: np.ndarray
+
+
+def as_batch(values: np.ndarray | list[float] | list[list[float]]) -> np.ndarray:
+    # Every kernel works on (n_series, n_observations) float64; a single series becomes one row.
+    return np.atleast_2d(np.asarray(values, dtype=np.float64))
+
+
+def simple_returns(prices: np.ndarray) -> np.ndarray:
+    # Returns between consecutive observed prices of each row, placed at the later observation.
+    # Gaps (NaN) are skipped, matching a per-series loop over the available points.
+    batch = as_batch(prices)
+    n_series, n_obs = batch.shape
+    returns = np.full((n_series, n_obs), np.nan)
+    if n_obs < 2:
+        return returns
+
+    observed = ~np.isnan(batch)
+    last_idx = np.where(observed, np.arange(n_obs), -1)
+    np.maximum.accumulate(last_idx, axis=1, out=last_idx)
+    prev_idx = np.empty_like(last_idx)
+    prev_idx[:, 0] = -1
+    prev_idx[:, 1:] = last_idx[:, :-1]
+
+    prev_px = np.take_along_axis(batch, np.clip(prev_idx, 0, None), axis=1)
+    valid = observed & (prev_idx >= 0) & (prev_px > 0)
+    np.divide(batch, prev_px, out=returns, where=valid)
+    returns[valid] -= 1.0
+    return returns
+
+
+def return_metrics(
+    returns: np.ndarray,
+    var_level: float = 0.05,
+    periods_per_year: int = TRADING_DAYS_PER_YEAR,
+) -> ReturnMetrics:
+    batch = as_batch(returns)
+    n_series = batch.shape[0]
+    if batch.shape[1] == 0:
+        zeros = np.zeros(n_series)
+        return ReturnMetrics(
+            annualized_volatility=zeros, sharpe_ratio=zeros, var_95=zeros, cvar_95=zeros
+        )
+
+    observed = ~np.isnan(batch)
+    counts = observed.sum(axis=1)
+
+    filled = np.where(observed, batch, 0.0)
+    safe_counts = np.maximum(counts, 1)
+    means = filled.sum(axis=1) / safe_counts
+    centered = np.where(observed, batch - means[:, np.newaxis], 0.0)
+    variance = (centered**2).sum(axis=1) / np.maximum(counts - 1, 1)
+    daily_vol = np.where(counts >= 2, np.sqrt(variance), 0.0)
+
+    annualization = math.sqrt(periods_per_year)
+    sharpe = (
+        np.divide(means, daily_vol, out=np.zeros(n_series), where=daily_vol > 0) * annualization
+    )
+
+    # Historical VaR picks the observation at the rounded rank (no interpolation); NaNs sort last.
+    ordered = np.sort(batch, axis=1)
+    ranks = np.clip(np.round((counts - 1) * var_level).astype(np.int64), 0, None)
+    var = np.where(counts > 0, np.take_along_axis(ordered, ranks[:, np.newaxis], axis=1)[:, 0], 0.0)
+
+    tail = observed & (batch <= var[:, np.newaxis])
+    tail_counts = tail.sum(axis=1)
+    tail_sums = np.where(tail, batch, 0.0).sum(axis=1)
+    cvar = np.divide(tail_sums, tail_counts, out=var.copy(), where=tail_counts > 0)
+
+    return ReturnMetrics(
+        annualized_volatility=daily_vol * annualization,
+        sharpe_ratio=sharpe,
+        var_95=var,
+        cvar_95=cvar,
+    )
+
+
+def max_drawdown(values: np.ndarray) -> np.ndarray:
+    batch = as_batch(values)
+    if batch.shape[1] == 0:
+        return np.zeros(batch.shape[0])
+
+    peaks = np.fmax.accumulate(batch, axis=1)
+    drawdowns = np.divide(batch, peaks, out=np.full(batch.shape, np.nan), where=peaks > 0) - 1.0
+    drawdowns = np.where(np.isnan(drawdowns), 0.0, drawdowns)
+    return np.minimum(drawdowns.min(axis=1), 0.0)
+
+
+def correlation_matrix(returns: np.ndarray, min_observations: int = 2) -> np.ndarray:
+    # Pairwise-complete Pearson correlation: each pair uses only the observations both rows share.
+    # All sums come from matrix products over the observation mask, so the whole matrix is built
+    # without a Python loop over pairs.
+    batch = as_batch(returns)
+    observed = ~np.isnan(batch)
+    mask = observed.astype(np.float64)
+    # Centering each row first keeps the one-pass sums below well conditioned.
+    row_means = np.where(observed, batch, 0.0).sum(axis=1) / np.maximum(mask.sum(axis=1), 1.0)
+    x = np.where(observed, batch - row_means[:, np.newaxis], 0.0)
+    x2 = x * x
+
+    shared = mask @ mask.T
+    sum_x = x @ mask.T
+    sum_y = sum_x.T
+    sum_xy = x @ x.T
+    sum_x2 = x2 @ mask.T
+    sum_y2 = sum_x2.T
+
+    safe_shared = np.maximum(shared, 1.0)
+    cov = sum_xy - sum_x * sum_y / safe_shared
+    var_x = sum_x2 - sum_x * sum_x / safe_shared
+    var_y = sum_y2 - sum_y * sum_y / safe_shared
+
+    tolerance = 1e-12
+    valid = (
+        (shared >= min_observations) & (var_x > tolerance * sum_x2) & (var_y > tolerance * sum_y2)
+    )
+    denom = np.sqrt(np.where(valid, var_x * var_y, 1.0))
+    corr = np.divide(cov, denom, out=np.zeros_like(cov), where=valid)
+    np.clip(corr, -1.0, 1.0, out=corr)
+    np.fill_diagonal(corr, 1.0)
+    return corr
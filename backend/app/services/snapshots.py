@@ -0,0 +1,74 @@
+import json
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+from decimal import Context, Decimal
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.models import JobRun, PositionSnapshot
+from app.services.portfolio import calculate_positions
+
+STATE_QUANTUM = Decimal("0.000000000000000001")
+REPORT_QUANTUM = Decimal("0.000001")
+SNAPSHOT_CONTEXT = Context(prec=38)
+
+
+@dataclass
+class PositionSnapshotResult:
+    snapshot_date: date
+    rows_written: int
+    job_run_id: int
+
+
+def _quantize(value: Decimal | None, quantum: Decimal) -> Decimal | None:
+    return value.quantize(quantum, context=SNAPSHOT_CONTEXT) if value is not None else None
+
+
+def invalidate_position_snapshots(db: Session, from_date: date) -> int:
+    result = db.execute(delete(PositionSnapshot).where(PositionSnapshot.snapshot_date >= from_date))
+    return result.rowcount or 0
+
+
+def write_position_snapshot(db: Session, snapshot_date: date) -> PositionSnapshotResult:
+    job_run = JobRun(
+        job_name="position_snapshot",
+        status="RUNNING",
+        started_at=datetime.now(UTC),
+        rows_processed=0,
+        run_details=json.dumps({"snapshot_date": snapshot_date.isoformat()}),
+    )
+    db.add(job_run)
+
+    # Rebuild the day from the previous snapshot rather than from whatever is stored for it.
+    db.execute(delete(PositionSnapshot).where(PositionSnapshot.snapshot_date == snapshot_date))
+    db.flush()
+
+    positions = calculate_positions(db=db, snapshot_date=snapshot_date)
+    db.add_all(
+        [
+            PositionSnapshot(
+                snapshot_date=snapshot_date,
+                account=pos.account,
+                symbol=pos.symbol,
+                quantity=pos.quantity,
+                avg_cost=_quantize(pos.avg_cost, STATE_QUANTUM),
+                realized_pnl=_quantize(pos.realized_pnl, STATE_QUANTUM),
+                market_price=_quantize(pos.market_price, REPORT_QUANTUM),
+                market_value=_quantize(pos.market_value, REPORT_QUANTUM),
+                unrealized_pnl=_quantize(pos.unrealized_pnl, REPORT_QUANTUM),
+                currency=pos.currency,
+                created_at=datetime.now(UTC),
+            )
+            for pos in positions
+        ]
+    )
+
+    job_run.rows_processed = len(positions)
+    job_run.status = "SUCCESS"
+    job_run.finished_at = datetime.now(UTC)
+    db.commit()
+
+    return PositionSnapshotResult(
+        snapshot_date=snapshot_date, rows_written=len(positions), job_run_id=job_run.id
+    )
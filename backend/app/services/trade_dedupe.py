@@ -0,0 +1,154 @@
+import math
+import threading
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Trade
+from app.services.trade_loader import TradeRecord
+
+PROBE_CHUNK_SIZE = 500
+FALSE_POSITIVE_RATE = 0.01
+MIN_FILTER_CAPACITY = 4_096
+
+
+class UidBloomFilter:
+    """Bloom filter over trade_uid hex digests.
+
+    The uids are already SHA-256 digests, so the bit positions are taken straight from
+    32-bit slices of the digest instead of rehashing.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(capacity, MIN_FILTER_CAPACITY)
+        self.count = 0
+        self._bits_len = math.ceil(
+            -self.capacity * math.log(FALSE_POSITIVE_RATE) / math.log(2) ** 2
+        )
+        self._hashes = min(8, max(1, round(self._bits_len / self.capacity * math.log(2))))
+        self._bits = bytearray(self._bits_len // 8 + 1)
+
+    @property
+    def full(self) -> bool:
+        return self.count > self.capacity
+
+    def _positions(self, uid: str) -> Iterable[int]:
+        for idx in range(self._hashes):
+            yield int(uid[idx * 8 : idx * 8 + 8], 16) % self._bits_len
+
+    def add(self, uid: str) -> None:
+        for position in self._positions(uid):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, uid: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(uid)
+        )
+
+
+class KnownTradeUids:
+    """Per-account bloom filters of stored trade uids, built from the database on first use.
+
+    Writes from other processes are not seen, so a miss only means "probably new"; the
+    ON CONFLICT insert in load_trades still has the final say.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._filters: dict[str, UidBloomFilter] = {}
+
+    def _build(self, db: Session, account: str) -> UidBloomFilter:
+        stored = (
+            db.scalar(select(func.count()).select_from(Trade).where(Trade.account == account)) or 0
+        )
+        bloom = UidBloomFilter(capacity=2 * stored)
+        for uid in db.scalars(
+            select(Trade.trade_uid)
+            .where(Trade.account == account)
+            .execution_options(yield_per=10_000)
+        ):
+            bloom.add(uid)
+        return bloom
+
+    def maybe_stored(self, db: Session, records: Sequence[TradeRecord]) -> list[str]:
+        with self._lock:
+            for account in {record[1] for record in records}:
+                bloom = self._filters.get(account)
+                if bloom is None or bloom.full:
+                    self._filters[account] = self._build(db, account)
+            return [record[0] for record in records if record[0] in self._filters[record[1]]]
+
+    def add(self, records: Iterable[TradeRecord]) -> None:
+        with self._lock:
+            for record in records:
+                bloom = self._filters.get(record[1])
+                if bloom is not None:
+                    bloom.add(record[0])
+
+
+_known_uids: "WeakKeyDictionary[Engine, KnownTradeUids]" = WeakKeyDictionary()
+_registry_lock = threading.Lock()
+
+
+def _engine_for(db: Session) -> Engine:
+    bind = db.get_bind()
+    return getattr(bind, "engine", bind)
+
+
+def get_known_trade_uids(db: Session) -> KnownTradeUids:
+    engine = _engine_for(db)
+    with _registry_lock:
+        known = _known_uids.get(engine)
+        if known is None:
+            known = KnownTradeUids()
+            _known_uids[engine] = known
+        return known
+
+
+@dataclass
+class DedupeResult:
+    records: list[TradeRecord] = field(default_factory=list)
+    in_file_duplicates: int = 0
+    stored_duplicates: int = 0
+
+    @property
+    def duplicate_rows(self) -> int:
+        return self.in_file_duplicates + self.stored_duplicates
+
+
+def dedupe_trade_records(db: Session, records: Sequence[TradeRecord]) -> DedupeResult:
+    result = DedupeResult()
+    unique: dict[str, TradeRecord] = {}
+    for record in records:
+        if record[0] in unique:
+            result.in_file_duplicates += 1
+        else:
+            unique[record[0]] = record
+
+    if not settings.trade_uid_filter_enabled:
+        # Without the filter, stored duplicates are left to the staging-table join in load_trades.
+        result.records = list(unique.values())
+        return result
+
+    known = get_known_trade_uids(db)
+    candidates = known.maybe_stored(db, list(unique.values()))
+    stored: set[str] = set()
+    for offset in range(0, len(candidates), PROBE_CHUNK_SIZE):
+        chunk = candidates[offset : offset + PROBE_CHUNK_SIZE]
+        stored.update(db.scalars(select(Trade.trade_uid).where(Trade.trade_uid.in_(chunk))))
+
+    result.stored_duplicates = len(stored)
+    result.records = [record for uid, record in unique.items() if uid not in stored]
+    return result
+
+
+def remember_trade_records(db: Session, records: Iterable[TradeRecord]) -> None:
+    known = _known_uids.get(_engine_for(db))
+    if known is not None:
+        known.add(records)
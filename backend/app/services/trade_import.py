@@ -0,0 +1,534 @@
+import csv
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import shutil
+import threading
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO
+from zipfile import BadZipFile
+
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+from sqlalchemy import select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import JobRun
+from app.schemas import TradeImportRow
+from app.services.metrics_snapshot import mark_metrics_dirty, metrics_versions
+from app.services.snapshots import invalidate_position_snapshots
+from app.services.trade_dedupe import dedupe_trade_records, remember_trade_records
+from app.services.trade_loader import TradeRecord, load_trades
+
+REQUIRED_FIELDS = {"account", "symbol", "trade_date", "side", "quantity", "price"}
+OPTIONAL_FIELDS = {"fees", "currency", "broker_ref"}
+IMPORT_FIELDS = REQUIRED_FIELDS.union(OPTIONAL_FIELDS)
+
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%Y/%m/%d")
+DEFAULT_BATCH_SIZE = 5_000
+MIN_VALIDATION_CHUNK = 500
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TradeImportProgress:
+    rows_read: int = 0
+    imported_rows: int = 0
+    duplicate_rows: int = 0
+    batches: int = 0
+
+
+@dataclass
+class TradeImportResult:
+    filename: str
+    total_rows: int
+    imported_rows: int
+    duplicate_rows: int
+    job_run_id: int
+
+
+class DateParser:
+    """Parses trade dates for one import, trying the format that matched last before the rest.
+
+    Files use one date format throughout, so the hint is usually right. No string matches more
+    than one of the formats, so the order never changes the result.
+    """
+
+    def __init__(self) -> None:
+        self.last_format = DATE_FORMATS[0]
+
+    def parse(self, value: object) -> date:
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        candidate = str(value).strip()
+        last = self.last_format
+        for fmt in (last, *(fmt for fmt in DATE_FORMATS if fmt != last)):
+            try:
+                parsed = datetime.strptime(candidate, fmt).date()
+            except ValueError:
+                continue
+            self.last_format = fmt
+            return parsed
+        raise ValueError(f"Unsupported date format: {value}")
+
+
+def _parse_decimal(value: object, field: str) -> Decimal:
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, int) and not isinstance(value, bool):
+        return Decimal(value)
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    try:
+        return Decimal(str(value).strip())
+    except (InvalidOperation, AttributeError):
+        raise ValueError(f"Invalid decimal value for {field}: {value}") from None
+
+
+def _normalize_header(value: str) -> str:
+    return value.strip().lower()
+
+
+def build_trade_uid(row: TradeImportRow) -> str:
+    raw = "|".join(
+        [
+            row.account.strip().upper(),
+            row.symbol.strip().upper(),
+            row.trade_date.isoformat(),
+            row.side.strip().upper(),
+            str(row.quantity),
+            str(row.price),
+            str(row.fees),
+            row.currency.strip().upper(),
+            (row.broker_ref or "").strip().upper(),
+        ]
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def row_from_mapping(
+    mapping: dict[str, object], row_number: int, dates: DateParser | None = None
+) -> TradeImportRow:
+    fields = {k: (v if v is not None else "") for k, v in mapping.items()}
+    missing = sorted(field for field in REQUIRED_FIELDS if not str(fields.get(field, "")).strip())
+    if missing:
+        raise ValueError(f"Row {row_number}: missing required fields: {', '.join(missing)}")
+
+    side = str(fields["side"]).strip().upper()
+    if side not in {"BUY", "SELL"}:
+        raise ValueError(f"Row {row_number}: side must be BUY or SELL")
+
+    quantity = _parse_decimal(fields["quantity"], "quantity")
+    price = _parse_decimal(fields["price"], "price")
+    fees = _parse_decimal(fields.get("fees", "0") or "0", "fees")
+
+    if quantity <= 0:
+        raise ValueError(f"Row {row_number}: quantity must be > 0")
+    if price < 0:
+        raise ValueError(f"Row {row_number}: price must be >= 0")
+    if fees < 0:
+        raise ValueError(f"Row {row_number}: fees must be >= 0")
+
+    return TradeImportRow(
+        account=str(fields["account"]).strip(),
+        symbol=str(fields["symbol"]).strip().upper(),
+        trade_date=(dates or DateParser()).parse(fields["trade_date"]),
+        side=side,
+        quantity=quantity,
+        price=price,
+        fees=fees,
+        currency=str(fields.get("currency", "USD") or "USD").strip().upper(),
+        broker_ref=str(fields.get("broker_ref", "") or "").strip() or None,
+    )
+
+
+def _check_headers(headers: list[str]) -> None:
+    if not REQUIRED_FIELDS.issubset(set(headers)):
+        missing = ", ".join(sorted(REQUIRED_FIELDS.difference(headers)))
+        raise ValueError(f"Missing required columns: {missing}")
+
+
+def _iter_csv(stream: BinaryIO) -> Iterator[dict[str, str]]:
+    # Decodes incrementally from the upload's file object; only the current row is held.
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        if not reader.fieldnames:
+            raise ValueError("CSV file must include headers")
+        reader.fieldnames = [_normalize_header(h) for h in reader.fieldnames]
+        _check_headers(reader.fieldnames)
+
+        for row in reader:
+            yield {k: row.get(k, "") for k in IMPORT_FIELDS}
+    finally:
+        text.detach()
+
+
+def _iter_xlsx(stream: BinaryIO, sheet: str | None) -> Iterator[dict[str, object]]:
+    # Read-only mode streams rows from the worksheet XML instead of building the cell model, and
+    # cells keep their types so dates and numbers skip the string round trip.
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except (BadZipFile, InvalidFileException):
+        raise ValueError("Invalid .xlsx file") from None
+    try:
+        if sheet is None:
+            worksheet = workbook.active
+        elif sheet in workbook.sheetnames:
+            worksheet = workbook[sheet]
+        else:
+            raise ValueError(f"Worksheet not found: {sheet}")
+
+        rows = worksheet.iter_rows(values_only=True)
+        raw_headers = next(rows, None)
+        if not raw_headers:
+            raise ValueError("XLSX sheet must include headers")
+        headers = [_normalize_header(str(h or "")) for h in raw_headers]
+        _check_headers(headers)
+
+        for row in rows:
+            normalized = {
+                header: value
+                for header, value in zip(headers, row)
+                if value is not None and value != ""
+            }
+            if not normalized:
+                continue
+            yield {k: normalized.get(k, "") for k in IMPORT_FIELDS}
+    finally:
+        workbook.close()
+
+
+def iter_upload_rows(
+    filename: str, stream: BinaryIO, sheet: str | None = None
+) -> Iterator[dict[str, object]]:
+    lower = filename.lower()
+    if lower.endswith(".csv"):
+        if sheet is not None:
+            raise ValueError("sheet is only supported for .xlsx files")
+        return _iter_csv(stream)
+    if lower.endswith(".xlsx"):
+        return _iter_xlsx(stream, sheet)
+    raise ValueError("Only .csv and .xlsx files are supported")
+
+
+def _batches(
+    rows: Iterable[dict[str, object]], size: int
+) -> Iterator[list[tuple[int, dict[str, object]]]]:
+    numbered = enumerate(rows, start=2)
+    while batch := list(islice(numbered, size)):
+        yield batch
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_import_pool() -> None:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+        _pool_workers = 0
+
+
+def validate_trade_rows(
+    batch: list[tuple[int, dict[str, object]]],
+    source_file: str,
+    imported_at: datetime,
+    dates: DateParser | None = None,
+) -> list[TradeRecord]:
+    dates = dates or DateParser()
+    records: list[TradeRecord] = []
+    for row_number, mapping in batch:
+        row = row_from_mapping(mapping, row_number=row_number, dates=dates)
+        records.append(
+            (
+                build_trade_uid(row),
+                row.account,
+                row.symbol,
+                row.trade_date,
+                row.side,
+                row.quantity,
+                row.price,
+                row.fees,
+                row.currency,
+                row.broker_ref,
+                source_file,
+                imported_at,
+            )
+        )
+    return records
+
+
+def _validate_batch(
+    batch: list[tuple[int, dict[str, object]]],
+    source_file: str,
+    workers: int,
+    dates: DateParser | None = None,
+) -> list[TradeRecord]:
+    imported_at = datetime.now(UTC)
+    if workers <= 1 or len(batch) < 2 * MIN_VALIDATION_CHUNK:
+        return validate_trade_rows(batch, source_file, imported_at, dates)
+
+    # Chunks are collected in submission order, so records keep file order and the first error
+    # raised is the one with the lowest row number, as in a serial run.
+    chunk_size = max(MIN_VALIDATION_CHUNK, -(-len(batch) // workers))
+    pool = _get_pool(workers)
+    futures = [
+        pool.submit(
+            validate_trade_rows,
+            batch[offset : offset + chunk_size],
+            source_file,
+            imported_at,
+            dates,
+        )
+        for offset in range(0, len(batch), chunk_size)
+    ]
+    records: list[TradeRecord] = []
+    try:
+        for future in futures:
+            records.extend(future.result())
+    finally:
+        for future in futures:
+            future.cancel()
+    return records
+
+
+def _insert_batch(db: Session, records: list[TradeRecord], progress: TradeImportProgress) -> None:
+    deduped = dedupe_trade_records(db, records)
+    before = metrics_versions(db)
+    loaded = load_trades(db, deduped.records)
+    remember_trade_records(db, deduped.records)
+    progress.imported_rows += loaded.inserted_rows
+    progress.duplicate_rows += deduped.duplicate_rows + loaded.duplicate_rows
+
+    if loaded.first_trade_date is not None:
+        invalidate_position_snapshots(db, from_date=loaded.first_trade_date)
+        mark_metrics_dirty(
+            db, from_date=loaded.first_trade_date, accounts=loaded.accounts, before=before
+        )
+
+
+def _record_progress(db: Session, job_run: JobRun, rows_read: int, atomic: bool) -> None:
+    if not atomic:
+        job_run.rows_processed = rows_read
+        return
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite allows one writer, so progress of an atomic import shows up when it finishes.
+        return
+    # The import's own transaction stays open until the end; publish progress from a separate one.
+    with Session(bind=db.get_bind()) as progress_db:
+        progress_db.execute(
+            update(JobRun).where(JobRun.id == job_run.id).values(rows_processed=rows_read)
+        )
+        progress_db.commit()
+
+
+def import_trade_file(
+    db: Session,
+    filename: str,
+    stream: BinaryIO,
+    atomic: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sheet: str | None = None,
+    on_progress: Callable[[TradeImportProgress], None] | None = None,
+    job_run_id: int | None = None,
+) -> TradeImportResult:
+    """Validate, dedupe and insert trades from an upload, ``batch_size`` rows at a time.
+
+    With ``atomic`` (the default) every batch runs in one transaction and a bad row imports
+    nothing. Otherwise each batch commits as it completes, and a bad row leaves earlier batches
+    in place.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+
+    details: dict[str, object] = {
+        "filename": filename,
+        "atomic": atomic,
+        "batch_size": batch_size,
+        "sheet": sheet,
+    }
+    if job_run_id is None:
+        job_run = JobRun(job_name="trade_import", rows_processed=0)
+        db.add(job_run)
+    else:
+        job_run = db.get(JobRun, job_run_id)
+        if job_run is None:
+            raise ValueError(f"Job run not found: {job_run_id}")
+        # Keep the spool path so a restart can clean up after a run it interrupted.
+        queued = json.loads(job_run.run_details or "{}")
+        if "spool_path" in queued:
+            details["spool_path"] = queued["spool_path"]
+    job_run.status = "RUNNING"
+    job_run.started_at = datetime.now(UTC)
+    job_run.run_details = json.dumps(details)
+    db.commit()
+
+    progress = TradeImportProgress()
+    dates = DateParser()
+    try:
+        rows = iter_upload_rows(filename, stream, sheet=sheet)
+        for batch in _batches(rows, batch_size):
+            records = _validate_batch(batch, filename, settings.import_validation_workers, dates)
+            _insert_batch(db, records, progress)
+            progress.rows_read += len(batch)
+            progress.batches += 1
+            _record_progress(db, job_run, progress.rows_read, atomic)
+            if atomic:
+                db.flush()
+            else:
+                db.commit()
+            if on_progress is not None:
+                on_progress(progress)
+    except Exception as exc:
+        db.rollback()
+        job_run.status = "FAILED"
+        job_run.finished_at = datetime.now(UTC)
+        # An atomic import rolled every batch back; a non-atomic one keeps its committed batches.
+        job_run.rows_processed = progress.rows_read if not atomic else 0
+        job_run.run_details = json.dumps(
+            {**details, "error": str(exc), "rows_read_before_failure": progress.rows_read}
+        )
+        db.commit()
+        raise
+
+    job_run.status = "SUCCESS"
+    job_run.finished_at = datetime.now(UTC)
+    job_run.rows_processed = progress.rows_read
+    job_run.run_details = json.dumps(
+        {
+            **details,
+            "total_rows": progress.rows_read,
+            "imported_rows": progress.imported_rows,
+            "duplicate_rows": progress.duplicate_rows,
+        }
+    )
+    db.commit()
+
+    return TradeImportResult(
+        filename=filename,
+        total_rows=progress.rows_read,
+        imported_rows=progress.imported_rows,
+        duplicate_rows=progress.duplicate_rows,
+        job_run_id=job_run.id,
+    )
+
+
+def spool_trade_import(
+    db: Session,
+    filename: str,
+    stream: BinaryIO,
+    atomic: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sheet: str | None = None,
+) -> int:
+    lower = filename.lower()
+    if not lower.endswith((".csv", ".xlsx")):
+        raise ValueError("Only .csv and .xlsx files are supported")
+    if sheet is not None and not lower.endswith(".xlsx"):
+        raise ValueError("sheet is only supported for .xlsx files")
+
+    spool_dir = Path(settings.trade_import_spool_dir)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    spool_path = spool_dir / f"{uuid.uuid4().hex}{Path(lower).suffix}"
+    with spool_path.open("wb") as spooled:
+        shutil.copyfileobj(stream, spooled)
+
+    job_run = JobRun(
+        job_name="trade_import",
+        status="QUEUED",
+        started_at=datetime.now(UTC),
+        rows_processed=0,
+        run_details=json.dumps(
+            {
+                "filename": filename,
+                "atomic": atomic,
+                "batch_size": batch_size,
+                "sheet": sheet,
+                "spool_path": str(spool_path),
+            }
+        ),
+    )
+    db.add(job_run)
+    db.commit()
+    return job_run.id
+
+
+def run_spooled_trade_import(bind: Engine, job_run_id: int) -> None:
+    with Session(bind=bind, autoflush=False) as db:
+        job_run = db.get(JobRun, job_run_id)
+        if job_run is None or job_run.status != "QUEUED":
+            return
+        details = json.loads(job_run.run_details or "{}")
+        spool_path = Path(details["spool_path"])
+        try:
+            with spool_path.open("rb") as stream:
+                import_trade_file(
+                    db,
+                    details["filename"],
+                    stream,
+                    atomic=details["atomic"],
+                    batch_size=details["batch_size"],
+                    sheet=details["sheet"],
+                    job_run_id=job_run_id,
+                )
+        except Exception:
+            # import_trade_file has already marked the run FAILED with the error.
+            logger.exception("Trade import job %s failed", job_run_id)
+        finally:
+            spool_path.unlink(missing_ok=True)
+
+
+def recover_trade_import_jobs(db: Session) -> int:
+    """Fail the async imports a previous process queued or started but never finished.
+
+    Background imports run inside the API process, so after a restart nothing resumes them.
+    Their spool files are deleted. Returns the number of runs marked FAILED.
+    """
+    orphaned = db.scalars(
+        select(JobRun).where(
+            JobRun.job_name == "trade_import", JobRun.status.in_(("QUEUED", "RUNNING"))
+        )
+    ).all()
+    for job_run in orphaned:
+        details = json.loads(job_run.run_details or "{}")
+        if "spool_path" in details:
+            Path(details["spool_path"]).unlink(missing_ok=True)
+        if details.get("atomic", True):
+            job_run.rows_processed = 0
+        job_run.status = "FAILED"
+        job_run.finished_at = datetime.now(UTC)
+        job_run.run_details = json.dumps({**details, "error": "Interrupted by a server restart"})
+    db.commit()
+    return len(orphaned)
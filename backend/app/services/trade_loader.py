@@ -0,0 +1,127 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Integer,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+    delete,
+    insert,
+    select,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import Trade
+
+STAGING_COLUMNS = (
+    "trade_uid",
+    "account",
+    "symbol",
+    "trade_date",
+    "side",
+    "quantity",
+    "price",
+    "fees",
+    "currency",
+    "broker_ref",
+    "source_file",
+    "imported_at",
+)
+
+TradeRecord = tuple[
+    str, str, str, date, str, Decimal, Decimal, Decimal, str, str | None, str | None, datetime
+]
+
+# Session-local scratch table: created on first use per connection, emptied before each load.
+# ``ordinal`` is each record's position in the load, so trade ids follow file order.
+trade_staging = Table(
+    "trade_import_staging",
+    MetaData(),
+    Column("ordinal", Integer, nullable=False),
+    Column("trade_uid", String(64), nullable=False),
+    Column("account", String(64), nullable=False),
+    Column("symbol", String(32), nullable=False),
+    Column("trade_date", Date, nullable=False),
+    Column("side", String(8), nullable=False),
+    Column("quantity", Numeric(18, 6), nullable=False),
+    Column("price", Numeric(18, 6), nullable=False),
+    Column("fees", Numeric(18, 6), nullable=False),
+    Column("currency", String(8), nullable=False),
+    Column("broker_ref", String(128)),
+    Column("source_file", String(255)),
+    Column("imported_at", DateTime(timezone=True), nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+
+@dataclass
+class TradeLoadResult:
+    staged_rows: int = 0
+    inserted_rows: int = 0
+    first_trade_date: date | None = None
+    accounts: set[str] = field(default_factory=set)
+
+    @property
+    def duplicate_rows(self) -> int:
+        return self.staged_rows - self.inserted_rows
+
+
+def _copy_into_staging(db: Session, records: Sequence[TradeRecord]) -> None:
+    raw = db.connection().connection.driver_connection
+    statement = f"COPY {trade_staging.name} ({', '.join(('ordinal', *STAGING_COLUMNS))}) FROM STDIN"
+    with raw.cursor() as cursor, cursor.copy(statement) as copy:
+        for ordinal, record in enumerate(records):
+            copy.write_row((ordinal, *record))
+
+
+def load_trades(db: Session, records: Sequence[TradeRecord]) -> TradeLoadResult:
+    """Insert trades through a staging table, skipping uids that already exist.
+
+    Postgres stages rows with COPY; other databases stage them with executemany. Both then
+    run one INSERT ... SELECT ... ON CONFLICT (trade_uid) DO NOTHING, so duplicates (against
+    the table or within ``records``) are decided by the unique constraint. Rows are inserted in
+    ``records`` order, so same-day trades replay in file order.
+    """
+    result = TradeLoadResult(staged_rows=len(records))
+    if not records:
+        return result
+
+    connection = db.connection()
+    dialect = connection.dialect.name
+    trade_staging.create(connection, checkfirst=True)
+    connection.execute(delete(trade_staging))
+
+    if dialect == "postgresql":
+        _copy_into_staging(db, records)
+        dialect_insert = postgresql.insert
+    else:
+        connection.execute(
+            insert(trade_staging),
+            [
+                {"ordinal": ordinal, **dict(zip(STAGING_COLUMNS, record, strict=True))}
+                for ordinal, record in enumerate(records)
+            ],
+        )
+        dialect_insert = sqlite.insert
+
+    columns = [trade_staging.c[name] for name in STAGING_COLUMNS]
+    statement = (
+        dialect_insert(Trade)
+        .from_select(list(STAGING_COLUMNS), select(*columns).order_by(trade_staging.c.ordinal))
+        .on_conflict_do_nothing(index_elements=["trade_uid"])
+        .returning(Trade.trade_date, Trade.account)
+    )
+    for trade_date, account in connection.execute(statement):
+        result.inserted_rows += 1
+        result.accounts.add(account)
+        if result.first_trade_date is None or trade_date < result.first_trade_date:
+            result.first_trade_date = trade_date
+    return result
@@ -0,0 +1,52 @@
+"""Demo market data benchmark: the simple per-day loop vs the vectorized GBM generator.
+
+Run from backend/:
+    python -m benchmarks.bench_demo_generator [--symbols 10000] [--years 20] [--sample 100]
+
+The simple model builds one Decimal PricePoint per symbol and day in Python, so it is timed on
+--sample symbols and scaled up. The GBM generator is timed on the full universe as a matrix, and
+through fetch_history on the sample for a like-for-like PricePoint comparison.
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+
+from app.market_data.providers.demo import DemoMarketDataProvider, generate_gbm_closes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=10_000)
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--sample", type=int, default=100)
+    args = parser.parse_args()
+
+    end = date(2025, 12, 31)
+    start = end - timedelta(days=365 * args.years)
+    symbols = [f"SYM{idx:05d}" for idx in range(args.symbols)]
+    sample = symbols[: args.sample]
+    print(f"{args.symbols} symbols x {args.years} years ({start} to {end})")
+
+    started = time.perf_counter()
+    DemoMarketDataProvider("simple").fetch_history(sample, start, end)
+    simple = (time.perf_counter() - started) * args.symbols / len(sample)
+    print(f"  simple loop, PricePoints (scaled from {len(sample)}): {simple:8.2f} s")
+
+    started = time.perf_counter()
+    DemoMarketDataProvider("gbm").fetch_history(sample, start, end)
+    gbm_points = (time.perf_counter() - started) * args.symbols / len(sample)
+    print(f"  gbm, PricePoints (scaled from {len(sample)}):         {gbm_points:8.2f} s")
+
+    started = time.perf_counter()
+    _, closes = generate_gbm_closes(symbols, start, end)
+    matrix = time.perf_counter() - started
+    print(
+        f"  gbm matrix, full universe:                {matrix:8.2f} s "
+        f"({closes.size:,} closes, {closes.nbytes / 2**20:,.0f} MiB)"
+    )
+    print(f"  speedup (matrix vs simple loop): {simple / matrix:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Ledger hot-loop benchmark: Decimal ledger vs fixed-point ledger.
+
+Run from backend/: python -m benchmarks.bench_ledger [--trades 1000000] [--db-trades 200000]
+
+The in-memory section feeds each core the values it reads from the database: Decimals for the
+Decimal ledger, and integers scaled to 6 decimal places (ROUND(x * 1e6) in SQL) for the
+fixed-point ledger. The database section runs calculate_positions end to end on SQLite
+with LEDGER_ENGINE=decimal and LEDGER_ENGINE=fixed.
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models import Base, Trade
+from app.services.fixed_ledger import (
+    AVG_COST_DIGITS,
+    PNL_DIGITS,
+    VALUE_DIGITS,
+    FixedLedgerState,
+    replay_fixed_trades,
+    scale,
+    unscale,
+)
+from app.services.portfolio import LedgerState, apply_trade, calculate_positions
+
+SIX_DP = Decimal("0.000001")
+
+
+def _generate(
+    count: int, keys: int, seed: int
+) -> list[tuple[str, str, str, Decimal, Decimal, Decimal]]:
+    rng = random.Random(seed)
+    trades = []
+    for _ in range(count):
+        trades.append(
+            (
+                f"ACC{rng.randrange(10)}",
+                f"S{rng.randrange(keys // 10)}",
+                "BUY" if rng.random() < 0.6 else "SELL",
+                Decimal(rng.randint(1, 50_000_000)).scaleb(-4),
+                Decimal(rng.randint(1_000_000, 900_000_000)).scaleb(-6),
+                Decimal(rng.randint(0, 2_000_000)).scaleb(-6),
+            )
+        )
+    return trades
+
+
+def _run_decimal(trades) -> dict[tuple[str, str], LedgerState]:
+    ledgers: dict[tuple[str, str], LedgerState] = {}
+    for account, symbol, side, quantity, price, fees in trades:
+        state = ledgers.setdefault((account, symbol), LedgerState.empty("USD"))
+        apply_trade(
+            state, side=side, quantity=Decimal(quantity), price=Decimal(price), fees=Decimal(fees)
+        )
+    return ledgers
+
+
+def _bench_in_memory(count: int, keys: int) -> None:
+    decimal_trades = _generate(count, keys, seed=11)
+    scaled_trades = [
+        (
+            account,
+            symbol,
+            side,
+            "USD",
+            scale(qty, VALUE_DIGITS),
+            scale(px, VALUE_DIGITS),
+            scale(fees, VALUE_DIGITS),
+        )
+        for account, symbol, side, qty, px, fees in decimal_trades
+    ]
+
+    started = time.perf_counter()
+    decimal_ledgers = _run_decimal(decimal_trades)
+    decimal_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    fixed_ledgers: dict[tuple[str, str], FixedLedgerState] = replay_fixed_trades({}, scaled_trades)
+    fixed_time = time.perf_counter() - started
+
+    mismatches = 0
+    for key, expected in decimal_ledgers.items():
+        actual = fixed_ledgers[key]
+        if (
+            unscale(actual.quantity, VALUE_DIGITS) != expected.quantity
+            or unscale(actual.avg_cost, AVG_COST_DIGITS).quantize(SIX_DP)
+            != expected.avg_cost.quantize(SIX_DP)
+            or unscale(actual.realized_pnl, PNL_DIGITS).quantize(SIX_DP)
+            != expected.realized_pnl.quantize(SIX_DP)
+        ):
+            mismatches += 1
+
+    print(f"in-memory: {count} trades over {len(decimal_ledgers)} ledgers")
+    print(f"  decimal ledger:     {decimal_time:7.2f} s  ({count / decimal_time:12,.0f} trades/s)")
+    print(f"  fixed-point ledger: {fixed_time:7.2f} s  ({count / fixed_time:12,.0f} trades/s)")
+    print(f"  speedup:            {decimal_time / fixed_time:7.2f}x")
+    print(f"  ledgers differing at 6 decimal places: {mismatches}")
+
+
+def _bench_database(count: int, keys: int) -> None:
+    engine = create_engine("sqlite+pysqlite://", future=True)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False, future=True)
+
+    start = date(2020, 1, 1)
+    rows = [
+        {
+            "trade_uid": f"{idx:064d}",
+            "account": account,
+            "symbol": symbol,
+            "trade_date": start + timedelta(days=idx * 2000 // count),
+            "side": side,
+            "quantity": quantity,
+            "price": price,
+            "fees": fees,
+            "currency": "USD",
+        }
+        for idx, (account, symbol, side, quantity, price, fees) in enumerate(
+            _generate(count, keys, seed=12)
+        )
+    ]
+    with session_factory() as db:
+        db.execute(insert(Trade), rows)
+        db.commit()
+
+    snapshot_date = start + timedelta(days=2001)
+    original_engine = settings.ledger_engine
+    timings: dict[str, float] = {}
+    results = {}
+    try:
+        for engine_name in ("decimal", "fixed"):
+            settings.ledger_engine = engine_name
+            with session_factory() as db:
+                started = time.perf_counter()
+                results[engine_name] = calculate_positions(db, snapshot_date=snapshot_date)
+                timings[engine_name] = time.perf_counter() - started
+    finally:
+        settings.ledger_engine = original_engine
+
+    print(f"calculate_positions on SQLite: {count} trades")
+    print(f"  LEDGER_ENGINE=decimal: {timings['decimal']:7.2f} s")
+    print(f"  LEDGER_ENGINE=fixed:   {timings['fixed']:7.2f} s")
+    print(f"  speedup:               {timings['decimal'] / timings['fixed']:7.2f}x")
+    mismatches = sum(
+        1
+        for left, right in zip(results["decimal"], results["fixed"], strict=True)
+        if (left.quantity, left.avg_cost.quantize(SIX_DP), left.realized_pnl.quantize(SIX_DP))
+        != (right.quantity, right.avg_cost.quantize(SIX_DP), right.realized_pnl.quantize(SIX_DP))
+    )
+    print(f"  positions differing at 6 decimal places: {mismatches}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trades", type=int, default=1_000_000)
+    parser.add_argument("--keys", type=int, default=2_000)
+    parser.add_argument("--db-trades", type=int, default=200_000)
+    args = parser.parse_args()
+
+    _bench_in_memory(args.trades, args.keys)
+    if args.db_trades:
+        _bench_database(args.db_trades, args.keys)
+
+
+if __name__ == "__main__":
+    main()
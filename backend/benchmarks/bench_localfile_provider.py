@@ -0,0 +1,89 @@
+"""Local-file provider benchmark: parsing each symbol's CSV per request vs the memory-mapped .npy
+layout.
+
+Run from backend/: python -m benchmarks.bench_localfile_provider [--symbols 2000] [--years 20]
+
+Writes one date,close CSV per symbol (business days only) into a temporary directory, then asks
+for a one-year history window of every symbol three ways: parsing the CSVs with the csv module on
+every request, the provider's first request (which converts every CSV to .npy), and a warm request
+that only maps and slices the converted files. All three build the same PricePoint lists.
+"""
+
+import argparse
+import csv
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+
+from app.market_data.base import PricePoint
+from app.market_data.providers.localfile import LocalFileMarketDataProvider
+
+
+def _write_files(directory: Path, symbols: list[str], start: date, end: date) -> None:
+    days = np.arange(np.datetime64(start), np.datetime64(end) + 1)
+    days = days[np.is_busday(days)]
+    day_strings = days.astype(str).tolist()
+    rng = np.random.default_rng(7)
+    for symbol in symbols:
+        closes = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(days)))), 4)
+        lines = ["date,close"] + [
+            f"{dt},{close}" for dt, close in zip(day_strings, closes.tolist(), strict=True)
+        ]
+        (directory / f"{symbol}.csv").write_text("\n".join(lines) + "\n")
+
+
+def _parse_csvs(directory: Path, symbols: list[str], start: date, end: date) -> list[PricePoint]:
+    points: list[PricePoint] = []
+    for symbol in symbols:
+        with (directory / f"{symbol}.csv").open(newline="") as handle:
+            for row in csv.DictReader(handle):
+                price_date = date.fromisoformat(row["date"])
+                if start <= price_date <= end:
+                    points.append(PricePoint(symbol, price_date, Decimal(row["close"]), "USD"))
+    return points
+
+
+def _timed(label: str, fetch) -> float:
+    started = time.perf_counter()
+    count = len(fetch())
+    elapsed = time.perf_counter() - started
+    print(f"  {label:28s} {elapsed:7.2f} s ({count:,} points)")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=2_000)
+    parser.add_argument("--years", type=int, default=20)
+    args = parser.parse_args()
+
+    end = date(2025, 12, 31)
+    start = end - timedelta(days=365 * args.years)
+    window_start = end - timedelta(days=365)
+    symbols = [f"SYM{idx:05d}" for idx in range(args.symbols)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        _write_files(directory, symbols, start, end)
+        print(f"{args.symbols} symbols x {args.years} years, one-year window")
+
+        provider = LocalFileMarketDataProvider(directory)
+        parsed = _timed(
+            "parse CSV per request", lambda: _parse_csvs(directory, symbols, window_start, end)
+        )
+        _timed(
+            "first request (convert)", lambda: provider.fetch_history(symbols, window_start, end)[0]
+        )
+        mapped = _timed(
+            "warm request (mmap slice)",
+            lambda: provider.fetch_history(symbols, window_start, end)[0],
+        )
+        print(f"  speedup (warm vs parse): {parsed / mapped:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Risk kernel micro-benchmark: pure-Python loops vs app.services.risk.
+
+Run from backend/: python -m benchmarks.bench_risk [--symbols 50] [--days 504]
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from app.services.risk import correlation_matrix, max_drawdown, return_metrics, simple_returns
+
+
+# Reference loops, as previously implemented in analytics.py and companies.py.
+def _stddev(values: list[float]) -> float:
+    if len(values) < 2:
+        return 0.0
+    mean_val = sum(values) / len(values)
+    variance = sum((x - mean_val) ** 2 for x in values) / (len(values) - 1)
+    return math.sqrt(variance)
+
+
+def _percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = max(0, min(len(ordered) - 1, round((len(ordered) - 1) * p)))
+    return ordered[idx]
+
+
+def _max_drawdown(prices: list[float]) -> float:
+    if not prices:
+        return 0.0
+    peak = prices[0]
+    max_dd = 0.0
+    for px in prices:
+        peak = max(peak, px)
+        if peak > 0:
+            max_dd = min(max_dd, (px / peak) - 1.0)
+    return max_dd
+
+
+def _pearson(x: list[float], y: list[float]) -> float:
+    if len(x) < 2 or len(y) < 2 or len(x) != len(y):
+        return 0.0
+    mean_x = sum(x) / len(x)
+    mean_y = sum(y) / len(y)
+    cov = sum((a - mean_x) * (b - mean_y) for a, b in zip(x, y, strict=True))
+    var_x = sum((a - mean_x) ** 2 for a in x)
+    var_y = sum((b - mean_y) ** 2 for b in y)
+    if var_x <= 0 or var_y <= 0:
+        return 0.0
+    return cov / math.sqrt(var_x * var_y)
+
+
+def _loop_metrics(prices: list[list[float]]) -> None:
+    returns = []
+    for series in prices:
+        rets = [(series[i] / series[i - 1]) - 1.0 for i in range(1, len(series))]
+        returns.append(rets)
+        _stddev(rets) * math.sqrt(252)
+        var = _percentile(rets, 0.05)
+        tail = [r for r in rets if r <= var]
+        (sum(tail) / len(tail)) if tail else var
+        _max_drawdown(series)
+    for left in returns:
+        for right in returns:
+            _pearson(left, right)
+
+
+def _vector_metrics(prices: np.ndarray) -> None:
+    returns = simple_returns(prices)
+    return_metrics(returns)
+    max_drawdown(prices)
+    correlation_matrix(returns)
+
+
+def _best_of(fn, arg, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--days", type=int, default=504)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    log_returns = rng.normal(0.0003, 0.015, size=(args.symbols, args.days))
+    prices = 100.0 * np.exp(np.cumsum(log_returns, axis=1))
+
+    loop_time = _best_of(_loop_metrics, prices.tolist(), args.repeat)
+    vector_time = _best_of(_vector_metrics, prices, args.repeat)
+
+    print(f"{args.symbols} symbols x {args.days} days")
+    print(f"pure-python loops: {loop_time * 1000:9.2f} ms")
+    print(f"numpy kernel:      {vector_time * 1000:9.2f} ms")
+    print(f"speedup:           {loop_time / vector_time:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
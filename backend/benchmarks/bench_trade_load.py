@@ -0,0 +1,136 @@
+"""Trade insert benchmark: ORM add_all with an in_() duplicate probe vs the staging-table bulk
+loader, with and without the per-account trade_uid bloom filter.
+
+Run from backend/:
+    python -m benchmarks.bench_trade_load [--rows 100000 1000000] [--database-url URL]
+
+Each loader starts from an empty trades table, loads the rows in import-sized batches, then loads
+the same rows again so every row is a duplicate. With a postgresql+psycopg URL the bulk loader
+stages rows with COPY; point it at a scratch database, since its tables are dropped and recreated.
+"""
+
+import argparse
+import hashlib
+import random
+import time
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.models import Base, Trade
+from app.services.trade_dedupe import dedupe_trade_records, remember_trade_records
+from app.services.trade_loader import STAGING_COLUMNS, TradeRecord, load_trades
+
+
+def _generate(count: int, seed: int) -> list[TradeRecord]:
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    imported_at = datetime.now(UTC)
+    return [
+        (
+            hashlib.sha256(str(idx).encode()).hexdigest(),
+            f"ACC{rng.randrange(50)}",
+            f"S{rng.randrange(500)}",
+            start + timedelta(days=rng.randrange(2000)),
+            "BUY" if rng.random() < 0.6 else "SELL",
+            Decimal(rng.randint(1, 50_000_000)).scaleb(-4),
+            Decimal(rng.randint(1_000_000, 900_000_000)).scaleb(-6),
+            Decimal(rng.randint(0, 2_000_000)).scaleb(-6),
+            "USD",
+            f"REF-{idx}",
+            "bench.csv",
+            imported_at,
+        )
+        for idx in range(count)
+    ]
+
+
+def _load_orm(db, records: list[TradeRecord]) -> int:
+    existing = set(
+        db.scalars(
+            select(Trade.trade_uid).where(Trade.trade_uid.in_([r[0] for r in records]))
+        ).all()
+    )
+    imports = [
+        Trade(**dict(zip(STAGING_COLUMNS, record, strict=True)))
+        for record in records
+        if record[0] not in existing
+    ]
+    db.add_all(imports)
+    db.flush()
+    return len(imports)
+
+
+def _load_bulk(db, records: list[TradeRecord]) -> int:
+    deduped = dedupe_trade_records(db, records)
+    inserted = load_trades(db, deduped.records).inserted_rows
+    remember_trade_records(db, deduped.records)
+    return inserted
+
+
+def _run(
+    database_url: str, loader, records: list[TradeRecord], batch_size: int
+) -> tuple[float, float, int]:
+    if database_url.startswith("sqlite"):
+        engine = create_engine(
+            database_url, poolclass=StaticPool, connect_args={"check_same_thread": False}
+        )
+    else:
+        engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    timings = []
+    for _ in range(2):
+        with session_factory() as db:
+            started = time.perf_counter()
+            for offset in range(0, len(records), batch_size):
+                loader(db, records[offset : offset + batch_size])
+                db.commit()
+            timings.append(time.perf_counter() - started)
+
+    with session_factory() as db:
+        stored = db.scalar(select(func.count()).select_from(Trade))
+    engine.dispose()
+    return timings[0], timings[1], stored
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--database-url", default="sqlite+pysqlite://")
+    args = parser.parse_args()
+
+    for count in args.rows:
+        records = _generate(count, seed=21)
+        print(f"{count} trades in batches of {args.batch_size} on {args.database_url.split('://')[0]}")
+        results = {}
+        original_filter = settings.trade_uid_filter_enabled
+        for name, loader, filter_enabled in (
+            ("orm add_all", _load_orm, False),
+            ("bulk loader", _load_bulk, False),
+            ("bulk + uid filter", _load_bulk, True),
+        ):
+            settings.trade_uid_filter_enabled = filter_enabled
+            try:
+                fresh, duplicates, stored = _run(
+                    args.database_url, loader, records, args.batch_size
+                )
+            finally:
+                settings.trade_uid_filter_enabled = original_filter
+            results[name] = fresh
+            print(
+                f"  {name}: {fresh:7.2f} s fresh ({count / fresh:10,.0f} rows/s), "
+                f"{duplicates:7.2f} s all-duplicate reload, {stored} rows stored"
+            )
+        print(f"  speedup (fresh): {results['orm add_all'] / results['bulk loader']:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Trade row validation benchmark: serial vs process-pool validation, with and without the date
+format cache.
+
+Run from backend/: python -m benchmarks.bench_trade_validation [--rows 200000] [--workers 2 4]
+
+Rows use MM/DD/YYYY dates, the second of the accepted formats, so the uncached parser fails one
+strptime call per row before matching. Each run validates and hashes import-sized batches the
+way import_trade_file does, without touching the database.
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+from app.services import trade_import
+from app.services.trade_import import (
+    DATE_FORMATS,
+    DEFAULT_BATCH_SIZE,
+    _validate_batch,
+    shutdown_import_pool,
+)
+
+
+def _uncached_parse_date(value: object):
+    candidate = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(candidate, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unsupported date format: {value}")
+
+
+def _rows(count: int) -> list[tuple[int, dict[str, object]]]:
+    return [
+        (
+            idx + 2,
+            {
+                "account": f"ACC{idx % 40}",
+                "symbol": f"S{idx % 700}",
+                "trade_date": f"{idx % 12 + 1:02d}/{idx % 28 + 1:02d}/2025",
+                "side": "BUY" if idx % 3 else "SELL",
+                "quantity": f"{idx % 5000 + 1}.25",
+                "price": f"{idx % 900 + 10}.123456",
+                "fees": "1.10",
+                "currency": "USD",
+                "broker_ref": f"BRK-{idx}",
+            },
+        )
+        for idx in range(count)
+    ]
+
+
+def _run(rows, workers: int) -> float:
+    started = time.perf_counter()
+    for offset in range(0, len(rows), DEFAULT_BATCH_SIZE):
+        _validate_batch(rows[offset : offset + DEFAULT_BATCH_SIZE], "bench.csv", workers)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    args = parser.parse_args()
+
+    rows = _rows(args.rows)
+    print(f"{args.rows} rows in batches of {DEFAULT_BATCH_SIZE}, {os.cpu_count()} CPU(s)")
+
+    cached_parse_date = trade_import._parse_date
+    trade_import._parse_date = _uncached_parse_date
+    try:
+        baseline = _run(rows, workers=0)
+    finally:
+        trade_import._parse_date = cached_parse_date
+    print(f"  serial, no format cache: {baseline:7.2f} s ({args.rows / baseline:9,.0f} rows/s)")
+
+    serial = _run(rows, workers=0)
+    print(
+        f"  serial, format cache:    {serial:7.2f} s ({args.rows / serial:9,.0f} rows/s)  "
+        f"{baseline / serial:5.2f}x"
+    )
+
+    for workers in args.workers:
+        _run(rows[:DEFAULT_BATCH_SIZE], workers)
+        elapsed = _run(rows, workers)
+        print(
+            f"  {workers} workers, format cache: {elapsed:6.2f} s "
+            f"({args.rows / elapsed:9,.0f} rows/s)  {baseline / elapsed:5.2f}x"
+        )
+    shutdown_import_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""XLSX trade parsing benchmark: full-mode openpyxl with stringified cells vs read-only streaming.
+
+Run from backend/: python -m benchmarks.bench_xlsx_import [--rows 100000]
+
+Scales the rows of sample-data/trades_seed.xlsx up to --rows (unique broker_ref per copy) and
+writes them twice: as text cells, like the seed file, and as typed date/number cells, like most
+broker exports. Each parser reads and validates every row; nothing touches the database. The
+full-mode baseline cannot read typed date cells (str() of a datetime is not an accepted date
+format), so it only runs on the text workbook.
+"""
+
+import argparse
+import io
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from openpyxl import Workbook, load_workbook
+
+from app.services.trade_import import IMPORT_FIELDS, iter_upload_rows, row_from_mapping
+
+SEED = Path(__file__).resolve().parents[2] / "sample-data" / "trades_seed.xlsx"
+TYPED_FIELDS = {"quantity", "price", "fees"}
+
+
+def _scaled_workbook(count: int, typed: bool) -> bytes:
+    seed = load_workbook(SEED, data_only=True).active
+    rows = seed.iter_rows(values_only=True)
+    headers = [str(value) for value in next(rows)]
+    seed_rows = [row for row in rows if any(row)]
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Trades")
+    worksheet.append(headers)
+    for idx in range(count):
+        values = dict(zip(headers, seed_rows[idx % len(seed_rows)], strict=True))
+        values["broker_ref"] = f"{values['broker_ref']}-{idx}"
+        if typed:
+            values["trade_date"] = datetime.strptime(values["trade_date"], "%Y-%m-%d")
+            for field in TYPED_FIELDS:
+                values[field] = float(values[field])
+        worksheet.append([values[header] for header in headers])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def _parse_full_mode(contents: bytes) -> int:
+    sheet = load_workbook(io.BytesIO(contents), data_only=True).active
+    headers = [
+        str(h or "").strip().lower()
+        for h in next(sheet.iter_rows(min_row=1, max_row=1, values_only=True))
+    ]
+    count = 0
+    for idx, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
+        normalized = {
+            headers[col]: ("" if value is None else str(value)) for col, value in enumerate(row)
+        }
+        if not any(normalized.values()):
+            continue
+        row_from_mapping({k: normalized.get(k, "") for k in IMPORT_FIELDS}, row_number=idx)
+        count += 1
+    return count
+
+
+def _parse_read_only(contents: bytes) -> int:
+    count = 0
+    for idx, mapping in enumerate(iter_upload_rows("bench.xlsx", io.BytesIO(contents)), start=2):
+        row_from_mapping(mapping, row_number=idx)
+        count += 1
+    return count
+
+
+def _measure(parser, contents: bytes) -> tuple[float, float, int]:
+    started = time.perf_counter()
+    count = parser(contents)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    parser(contents)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    text_workbook = _scaled_workbook(args.rows, typed=False)
+    typed_workbook = _scaled_workbook(args.rows, typed=True)
+    print(f"{args.rows} trades from {SEED.name}: {len(text_workbook) / 2**20:.1f} MiB text, "
+          f"{len(typed_workbook) / 2**20:.1f} MiB typed")
+
+    results = {}
+    for name, parse, contents in (
+        ("full mode, text cells", _parse_full_mode, text_workbook),
+        ("read-only, text cells", _parse_read_only, text_workbook),
+        ("read-only, typed cells", _parse_read_only, typed_workbook),
+    ):
+        elapsed, peak, count = _measure(parse, contents)
+        results[name] = elapsed
+        print(
+            f"  {name:24s} {elapsed:7.2f} s ({count / elapsed:9,.0f} rows/s), "
+            f"peak {peak:8.1f} MiB, {count} rows"
+        )
+    speedup = results["full mode, text cells"] / results["read-only, text cells"]
+    print(f"  speedup (text cells): {speedup:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
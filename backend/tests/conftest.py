@@ -1,11 +1,23 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
 import pytest
 from sqlalchemy import create_engine
-from sqlalchemy.pool import StaticPool
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from app.db import get_db
 from app.main import app
-from app.models import Base
+from app.market_data.health import reset_provider_health
+from app.models import Base, PriceEOD
+
+
+@pytest.fixture(autouse=True)
+def provider_health():
+    # Breaker state is process-wide; keep one test's failures from opening breakers in the next.
+    reset_provider_health()
+    yield
+    reset_provider_health()
 
 
 @pytest.fixture()
@@ -50,3 +62,58 @@ def client(db_session_factory):
         yield test_client
 
     app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def seeded_book(client, db_session):
+    csv_content = """account,symbol,trade_date,side,quantity,price,fees,currency,broker_ref
+ACC1,AAPL,2026-01-05,BUY,10,100.125,1.5,USD,R1
+ACC1,MSFT,2026-01-05,BUY,7,50.333333,0.25,USD,R2
+ACC2,AAPL,2026-01-06,BUY,3,101,0,USD,R3
+ACC1,AAPL,2026-01-08,SELL,4,104.75,0.5,USD,R4
+ACC2,NVDA,2026-01-10,BUY,2,700,1,USD,R5
+ACC1,MSFT,2026-01-13,BUY,3,49.1,0.1,USD,R6
+ACC2,AAPL,2026-01-14,SELL,3,99.5,0,USD,R7
+ACC1,GOOG,2026-01-15,BUY,5,150,0,USD,R8
+ACC1,MSFT,2026-01-16,SELL,10,51,0.2,USD,R9
+"""
+    response = client.post(
+        "/v1/trades/import", files={"file": ("book.csv", csv_content, "text/csv")}
+    )
+    assert response.status_code == 200
+
+    start = date(2026, 1, 5)
+    rows = []
+    for offset in range(15):
+        dt = start + timedelta(days=offset)
+        if dt.weekday() >= 5:
+            continue
+        rows.append(
+            PriceEOD(
+                symbol="AAPL",
+                price_date=dt,
+                close_price=Decimal(100) + Decimal(offset) / 3,
+                source="test",
+            )
+        )
+        if offset % 2 == 0:
+            rows.append(
+                PriceEOD(
+                    symbol="MSFT",
+                    price_date=dt,
+                    close_price=Decimal(50) - Decimal(offset) / 7,
+                    source="test",
+                )
+            )
+        if offset >= 6:
+            rows.append(
+                PriceEOD(
+                    symbol="NVDA",
+                    price_date=dt,
+                    close_price=Decimal("705.5") + offset,
+                    source="test",
+                )
+            )
+    db_session.add_all(rows)
+    db_session.commit()
+    return db_session
@@ -0,0 +1,54 @@
+from datetime import date
+
+import pytest
+
+from app.services.analytics import calculate_analytics, calculate_batch_analytics
+
+
+@pytest.mark.parametrize("start_date", [None, date(2026, 1, 9)])
+def test_batch_analytics_matches_single_account_requests(seeded_book, start_date) -> None:
+    snapshot_date = date(2026, 1, 18)
+    batch = calculate_batch_analytics(
+        seeded_book, snapshot_date=snapshot_date, accounts=["ACC2", "ACC1"], start_date=start_date
+    )
+
+    assert [result.account_filter for result in batch.results] == ["ACC2", "ACC1"]
+    for result in batch.results:
+        single = calculate_analytics(
+            seeded_book,
+            snapshot_date=snapshot_date,
+            account=result.account_filter,
+            start_date=start_date,
+        )
+        assert result == single
+
+
+def test_batch_analytics_endpoint_groups_all_accounts(client, seeded_book) -> None:
+    response = client.post("/v1/analytics/batch", json={"snapshot_date": "2026-01-18"})
+    assert response.status_code == 200
+
+    payload = response.json()
+    assert payload["snapshot_date"] == "2026-01-18"
+    assert [item["account_filter"] for item in payload["results"]] == ["ACC1", "ACC2"]
+
+    single = client.get("/v1/analytics", params={"snapshot_date": "2026-01-18", "account": "ACC2"})
+    assert payload["results"][1] == single.json()
+
+
+def test_batch_analytics_endpoint_returns_empty_result_for_unknown_account(
+    client, seeded_book
+) -> None:
+    response = client.post(
+        "/v1/analytics/batch", json={"snapshot_date": "2026-01-18", "accounts": ["ACC1", "NOPE"]}
+    )
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert [item["account_filter"] for item in results] == ["ACC1", "NOPE"]
+    assert results[1]["series"] == []
+    assert results[1]["concentration_top_symbol"] is None
+
+
+def test_batch_analytics_endpoint_rejects_blank_accounts(client) -> None:
+    response = client.post("/v1/analytics/batch", json={"accounts": [" "]})
+    assert response.status_code == 400
@@ -0,0 +1,63 @@
+from datetime import date
+
+import pytest
+
+from app.config import settings
+from app.services.analytics import (
+    calculate_analytics,
+    calculate_batch_analytics,
+    shutdown_analytics_pool,
+)
+
+
+@pytest.fixture()
+def parallel_analytics(monkeypatch):
+    monkeypatch.setattr(settings, "analytics_workers", 2)
+    yield
+    shutdown_analytics_pool()
+
+
+def _serial(monkeypatch, fn, *args, **kwargs):
+    with monkeypatch.context() as patch:
+        patch.setattr(settings, "analytics_workers", 0)
+        return fn(*args, **kwargs)
+
+
+def test_parallel_batch_matches_serial(seeded_book, parallel_analytics, monkeypatch) -> None:
+    snapshot_date = date(2026, 1, 18)
+    parallel = calculate_batch_analytics(seeded_book, snapshot_date=snapshot_date)
+    serial = _serial(
+        monkeypatch, calculate_batch_analytics, seeded_book, snapshot_date=snapshot_date
+    )
+
+    assert [result.account_filter for result in parallel.results] == ["ACC1", "ACC2"]
+    assert parallel == serial
+
+
+@pytest.mark.parametrize("start_date", [None, date(2026, 1, 9)])
+def test_parallel_all_accounts_merges_partial_totals(
+    seeded_book, parallel_analytics, monkeypatch, start_date
+) -> None:
+    snapshot_date = date(2026, 1, 18)
+    parallel = calculate_analytics(seeded_book, snapshot_date=snapshot_date, start_date=start_date)
+    serial = _serial(
+        monkeypatch,
+        calculate_analytics,
+        seeded_book,
+        snapshot_date=snapshot_date,
+        start_date=start_date,
+    )
+
+    # Per-account partial sums are added in a different order than the serial replay.
+    assert [p.date for p in parallel.series] == [p.date for p in serial.series]
+    for left, right in zip(parallel.series, serial.series, strict=True):
+        assert left.market_value == pytest.approx(right.market_value, rel=1e-12)
+        assert left.total_pnl == pytest.approx(right.total_pnl, rel=1e-12, abs=1e-9)
+        assert left.daily_return == pytest.approx(right.daily_return, rel=1e-9, abs=1e-12)
+        assert left.drawdown == pytest.approx(right.drawdown, rel=1e-9, abs=1e-12)
+    assert parallel.annualized_volatility == pytest.approx(serial.annualized_volatility, rel=1e-9)
+    assert parallel.max_drawdown == pytest.approx(serial.max_drawdown, rel=1e-9, abs=1e-12)
+    assert parallel.concentration_top_symbol == serial.concentration_top_symbol
+    assert parallel.concentration_top_weight == pytest.approx(
+        serial.concentration_top_weight, rel=1e-12
+    )
@@ -0,0 +1,108 @@
+import math
+from datetime import date
+from statistics import mean
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models import PriceEOD, Trade
+from app.services.analytics import calculate_analytics
+from app.services.portfolio import calculate_positions
+
+
+def _expected_timeline(
+    db, snapshot_date: date, account: str | None, start_date: date | None
+) -> list[date]:
+    # Price dates of the symbols traded by the snapshot, from the first trade or start_date on.
+    # The seeded prices are all on weekdays before the Jan 19 holiday, so no calendar is needed.
+    trade_filter = [Trade.trade_date <= snapshot_date]
+    if account:
+        trade_filter.append(Trade.account == account)
+    first_trade = db.scalar(select(func.min(Trade.trade_date)).where(*trade_filter))
+    traded = set(db.scalars(select(Trade.symbol).where(*trade_filter)))
+    window_start = start_date or first_trade
+    return sorted(
+        {
+            row.price_date
+            for row in db.scalars(select(PriceEOD))
+            if row.symbol in traded and window_start <= row.price_date <= snapshot_date
+        }
+    )
+
+
+def _expected_risk(daily_returns: list[float]) -> dict[str, float]:
+    # Reference: the original per-series formulas, with the sample standard deviation and the
+    # rounded-rank historical VaR.
+    daily_vol = 0.0
+    if len(daily_returns) >= 2:
+        avg = mean(daily_returns)
+        daily_vol = math.sqrt(sum((r - avg) ** 2 for r in daily_returns) / (len(daily_returns) - 1))
+    ordered = sorted(daily_returns)
+    var_95 = ordered[round((len(ordered) - 1) * 0.05)] if ordered else 0.0
+    tail = [r for r in daily_returns if r <= var_95]
+    return {
+        "annualized_volatility": daily_vol * math.sqrt(252),
+        "sharpe_ratio": mean(daily_returns) / daily_vol * math.sqrt(252) if daily_vol > 0 else 0.0,
+        "var_95": var_95,
+        "cvar_95": sum(tail) / len(tail) if tail else var_95,
+    }
+
+
+def _per_date_series(
+    db, snapshot_date: date, account: str | None, timeline: list[date]
+) -> list[tuple]:
+    # Reference: the original implementation, which re-ran calculate_positions for every date.
+    rows = []
+    prev_market = 0.0
+    base_market = None
+    running_peak = 0.0
+    for dt in timeline:
+        positions = calculate_positions(db=db, snapshot_date=dt, account=account)
+        market_value = sum(float(pos.market_value or 0) for pos in positions)
+        total_pnl = sum(float((pos.unrealized_pnl or 0) + pos.realized_pnl) for pos in positions)
+        daily_return = (market_value / prev_market) - 1.0 if prev_market > 0 else 0.0
+        if base_market is None and market_value > 0:
+            base_market = market_value
+        cumulative_return = (
+            ((market_value / base_market) - 1.0) if (base_market and base_market > 0) else 0.0
+        )
+        running_peak = max(running_peak, market_value)
+        drawdown = ((market_value - running_peak) / running_peak) if running_peak > 0 else 0.0
+        rows.append((dt, market_value, total_pnl, daily_return, cumulative_return, drawdown))
+        prev_market = market_value
+    return rows
+
+
+@pytest.mark.parametrize("account", [None, "ACC1", "ACC2"])
+@pytest.mark.parametrize("start_date", [None, date(2026, 1, 9)])
+def test_single_pass_replay_matches_per_date_positions(seeded_book, account, start_date) -> None:
+    snapshot_date = date(2026, 1, 18)
+    result = calculate_analytics(
+        seeded_book, snapshot_date=snapshot_date, account=account, start_date=start_date
+    )
+
+    timeline = _expected_timeline(seeded_book, snapshot_date, account, start_date)
+    assert timeline
+    expected = _per_date_series(seeded_book, snapshot_date, account, timeline)
+    actual = [
+        (p.date, p.market_value, p.total_pnl, p.daily_return, p.cumulative_return, p.drawdown)
+        for p in result.series
+    ]
+    assert actual == expected
+
+    risk = _expected_risk([row[3] for row in expected[1:]])
+    assert result.annualized_volatility == pytest.approx(risk["annualized_volatility"])
+    assert result.sharpe_ratio == pytest.approx(risk["sharpe_ratio"])
+    assert result.var_95 == risk["var_95"]
+    assert result.cvar_95 == pytest.approx(risk["cvar_95"])
+    assert result.max_drawdown == min(row[5] for row in expected)
+
+    latest = calculate_positions(seeded_book, snapshot_date=snapshot_date, account=account)
+    exposure = [
+        (pos.symbol, float(pos.market_value or 0))
+        for pos in latest
+        if float(pos.market_value or 0) > 0
+    ]
+    top_symbol, top_value = max(exposure, key=lambda t: t[1])
+    assert result.concentration_top_symbol == top_symbol
+    assert result.concentration_top_weight == top_value / sum(v for _, v in exposure)
@@ -0,0 +1,46 @@
+def test_analytics_columnar_matches_row_series(client, seeded_book) -> None:
+    query = {"snapshot_date": "2026-01-18", "account": "ACC1"}
+    rows = client.get("/v1/analytics", params=query).json()
+
+    response = client.get("/v1/analytics", params={**query, "format": "columnar"})
+    assert response.status_code == 200
+    payload = response.json()
+
+    columns = payload.pop("series")
+    assert payload == {key: value for key, value in rows.items() if key != "series"}
+    assert set(columns) == set(rows["series"][0])
+    for key, values in columns.items():
+        assert values == [point[key] for point in rows["series"]]
+
+
+def test_compare_columnar_matches_row_series(client) -> None:
+    body = {
+        "symbols": ["AAPL", "MSFT", "XFAIL_GONE"],
+        "start_date": "2026-01-05",
+        "end_date": "2026-01-20",
+        "providers": ["demo"],
+    }
+    rows = client.post("/v1/companies/compare", json=body).json()
+
+    response = client.post("/v1/companies/compare", params={"format": "columnar"}, json=body)
+    assert response.status_code == 200
+    payload = response.json()
+
+    columns = payload.pop("series")
+    assert payload == {key: value for key, value in rows.items() if key != "series"}
+    assert columns["date"] == [point["date"] for point in rows["series"]]
+    for symbol in body["symbols"]:
+        assert columns["prices"][symbol] == [point["prices"][symbol] for point in rows["series"]]
+        assert columns["normalized"][symbol] == [
+            point["normalized"][symbol] for point in rows["series"]
+        ]
+
+
+def test_columnar_format_cannot_be_streamed(client) -> None:
+    response = client.get("/v1/analytics", params={"format": "columnar", "stream": "true"})
+    assert response.status_code == 400
+
+
+def test_unknown_series_format_is_rejected(client) -> None:
+    response = client.get("/v1/analytics", params={"format": "csv"})
+    assert response.status_code == 422
@@ -0,0 +1,119 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.market_data import fetching
+from app.market_data.providers.demo import DemoMarketDataProvider
+from app.models import PriceCoverage, PriceEOD
+from app.services.companies import compare_companies
+from app.services.price_coverage import coverage_gaps, record_coverage
+
+
+class CountingProvider(DemoMarketDataProvider):
+    def __init__(self, calls: list) -> None:
+        super().__init__()
+        self.calls = calls
+
+    def fetch_history(self, symbols, start_date, end_date):
+        self.calls.append((list(symbols), start_date, end_date))
+        return super().fetch_history(symbols, start_date, end_date)
+
+
+def _counting(monkeypatch) -> list:
+    calls: list = []
+    monkeypatch.setattr(fetching, "get_market_data_provider", lambda name: CountingProvider(calls))
+    return calls
+
+
+def test_coverage_gaps_and_merging(db_session) -> None:
+    record_coverage(db_session, "AAPL", "demo", date(2026, 1, 5), date(2026, 1, 9))
+    record_coverage(db_session, "AAPL", "demo", date(2026, 1, 20), date(2026, 1, 31))
+    record_coverage(db_session, "AAPL", "yfinance", date(2026, 1, 1), date(2026, 1, 31))
+
+    gaps = coverage_gaps(db_session, ["AAPL", "MSFT"], ["demo"], date(2026, 1, 1), date(2026, 2, 3))
+    assert gaps == {
+        "AAPL": [
+            (date(2026, 1, 1), date(2026, 1, 4)),
+            (date(2026, 1, 10), date(2026, 1, 19)),
+            (date(2026, 2, 1), date(2026, 2, 3)),
+        ],
+        "MSFT": [(date(2026, 1, 1), date(2026, 2, 3))],
+    }
+
+    record_coverage(db_session, "AAPL", "demo", date(2026, 1, 10), date(2026, 1, 19))
+    ranges = db_session.execute(
+        select(PriceCoverage.start_date, PriceCoverage.end_date).where(
+            PriceCoverage.source == "demo"
+        )
+    ).all()
+    assert ranges == [(date(2026, 1, 5), date(2026, 1, 31))]
+
+
+@pytest.mark.parametrize("fetch_async", [False, True])
+def test_repeat_compare_is_served_from_the_database(db_session, monkeypatch, fetch_async) -> None:
+    monkeypatch.setattr(settings, "price_fetch_async", fetch_async)
+    calls = _counting(monkeypatch)
+
+    first = compare_companies(
+        db_session, ["AAPL", "MSFT"], date(2026, 1, 5), date(2026, 1, 16), ["demo"]
+    )
+    assert calls == [(["AAPL", "MSFT"], date(2026, 1, 5), date(2026, 1, 16))]
+
+    second = compare_companies(
+        db_session, ["AAPL", "MSFT"], date(2026, 1, 5), date(2026, 1, 16), ["demo"]
+    )
+    assert len(calls) == 1
+    assert second.dates == first.dates
+    assert second.prices.tolist() == first.prices.tolist()
+
+    compare_companies(
+        db_session, ["AAPL", "MSFT", "NVDA"], date(2026, 1, 1), date(2026, 1, 16), ["demo"]
+    )
+    assert sorted(calls[1:]) == [
+        (["AAPL", "MSFT"], date(2026, 1, 2), date(2026, 1, 2)),
+        (["NVDA"], date(2026, 1, 2), date(2026, 1, 16)),
+    ]
+
+
+def test_read_through_ignores_coverage_from_providers_outside_the_chain(
+    db_session, monkeypatch
+) -> None:
+    calls = _counting(monkeypatch)
+    record_coverage(db_session, "AAPL", "yfinance", date(2026, 1, 5), date(2026, 1, 9))
+    db_session.add(
+        PriceEOD(symbol="AAPL", price_date=date(2026, 1, 6), close_price=1, source="yfinance")
+    )
+    db_session.commit()
+
+    result = compare_companies(db_session, ["AAPL"], date(2026, 1, 5), date(2026, 1, 9), ["demo"])
+
+    assert len(calls) == 1
+    assert len(result.dates) == 5
+    assert 1.0 not in result.prices[0].tolist()
+    assert set(db_session.scalars(select(PriceEOD.source)).all()) == {"demo"}
+
+
+def test_failed_symbols_are_not_marked_covered(db_session, monkeypatch) -> None:
+    calls = _counting(monkeypatch)
+
+    for _ in range(2):
+        result = compare_companies(
+            db_session, ["XFAILCO"], date(2026, 1, 5), date(2026, 1, 9), ["demo"]
+        )
+        assert result.failed_symbols == ["XFAILCO"]
+
+    assert len(calls) == 2
+    assert db_session.scalars(select(PriceCoverage)).all() == []
+
+
+def test_read_through_can_be_disabled(db_session, monkeypatch) -> None:
+    calls = _counting(monkeypatch)
+
+    for _ in range(2):
+        compare_companies(
+            db_session, ["AAPL"], date(2026, 1, 5), date(2026, 1, 9), ["demo"], read_through=False
+        )
+
+    assert len(calls) == 2
@@ -0,0 +1,85 @@
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.market_data.factory import get_market_data_provider
+from app.market_data.providers.demo import DemoMarketDataProvider, generate_gbm_closes
+
+
+def test_gbm_closes_depend_only_on_symbol_and_date() -> None:
+    days, closes = generate_gbm_closes(["AAPL", "MSFT"], date(2025, 12, 20), date(2026, 1, 12))
+    window_days, window = generate_gbm_closes(["MSFT"], date(2026, 1, 2), date(2026, 1, 6))
+
+    assert all(np.is_busday(days))
+    assert days[0] == np.datetime64("2025-12-22")
+    start = int(np.flatnonzero(days == window_days[0])[0])
+    np.testing.assert_allclose(window[0], closes[1, start : start + len(window_days)])
+    assert not np.allclose(closes[0], closes[1])
+
+    again_days, again = generate_gbm_closes(["AAPL", "MSFT"], date(2025, 12, 20), date(2026, 1, 12))
+    np.testing.assert_array_equal(again_days, days)
+    np.testing.assert_array_equal(again, closes)
+
+
+def test_gbm_closes_are_a_plausible_random_walk() -> None:
+    _, closes = generate_gbm_closes(
+        [f"S{idx}" for idx in range(200)], date(2016, 1, 1), date(2025, 12, 31)
+    )
+    log_returns = np.diff(np.log(closes), axis=1)
+    annualized = log_returns.std(axis=1) * np.sqrt(252)
+
+    assert np.isfinite(closes).all() and (closes > 0).all()
+    assert annualized.min() > 0.1
+    assert annualized.max() < 0.4
+
+
+def test_demo_seed_changes_the_series(monkeypatch) -> None:
+    _, default = generate_gbm_closes(["AAPL"], date(2026, 1, 5), date(2026, 1, 9))
+    monkeypatch.setattr(settings, "demo_seed", 7)
+    _, reseeded = generate_gbm_closes(["AAPL"], date(2026, 1, 5), date(2026, 1, 9))
+
+    assert not np.allclose(default, reseeded)
+
+
+def test_gbm_mode_keeps_xfail_symbols_failing(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "demo_price_model", "gbm")
+    provider = get_market_data_provider("demo")
+
+    points, failed = provider.fetch_history(
+        [" aapl", "XFAIL1", ""], date(2026, 1, 5), date(2026, 1, 11)
+    )
+    assert failed == ["XFAIL1"]
+    assert [point.price_date for point in points] == [date(2026, 1, day) for day in range(5, 10)]
+    assert all(
+        point.symbol == "AAPL" and point.close_price == point.close_price.quantize(Decimal("0.01"))
+        for point in points
+    )
+
+    eod, failed = provider.fetch_eod(["AAPL", "XFAIL2"], date(2026, 1, 11))
+    assert failed == ["XFAIL2"]
+    assert eod[0].price_date == date(2026, 1, 11)
+    assert eod[0].close_price == points[-1].close_price
+
+
+def test_gbm_mode_has_no_closes_before_its_epoch(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "demo_price_model", "gbm")
+    provider = get_market_data_provider("demo")
+
+    assert provider.fetch_eod(["AAPL", "XFAIL1"], date(1999, 12, 31)) == ([], ["AAPL", "XFAIL1"])
+    history = provider.fetch_history(["AAPL", "XFAIL1"], date(1999, 1, 1), date(1999, 12, 31))
+    assert history == ([], ["AAPL", "XFAIL1"])
+    # A range with no sessions at all has nothing to fail.
+    assert provider.fetch_history(["AAPL"], date(2026, 1, 17), date(2026, 1, 19)) == ([], [])
+    # A range straddling the epoch returns the closes from 2000 on.
+    points, failed = provider.fetch_history(["AAPL"], date(1999, 12, 20), date(2000, 1, 7))
+    assert failed == []
+    assert points[0].price_date == date(2000, 1, 3)
+
+
+def test_simple_model_is_the_default_and_unknown_models_are_rejected() -> None:
+    assert DemoMarketDataProvider().model == "simple"
+    with pytest.raises(ValueError, match="Unsupported demo price model"):
+        DemoMarketDataProvider("brownian")
@@ -0,0 +1,98 @@
+import random
+from datetime import date
+from decimal import Decimal
+
+from app.config import settings
+from app.models import PriceEOD
+from app.services.fixed_ledger import (
+    AVG_COST_DIGITS,
+    PNL_DIGITS,
+    VALUE_DIGITS,
+    FixedLedgerState,
+    replay_fixed_trades,
+    scale,
+    unscale,
+)
+from app.services.portfolio import LedgerState, apply_trade, calculate_positions
+
+SIX_DP = Decimal("0.000001")
+
+
+def _random_trades(seed: int, count: int) -> list[tuple[str, Decimal, Decimal, Decimal]]:
+    rng = random.Random(seed)
+    trades = []
+    for _ in range(count):
+        side = "BUY" if rng.random() < 0.6 else "SELL"
+        quantity = Decimal(rng.randint(1, 5_000_000)).scaleb(-rng.choice([0, 2, 6]))
+        price = Decimal(rng.randint(1, 900_000_000)).scaleb(-6)
+        fees = Decimal(rng.randint(0, 5_000_000)).scaleb(-6)
+        trades.append((side, quantity, price, fees))
+    return trades
+
+
+def test_fixed_point_core_matches_decimal_at_six_places() -> None:
+    for seed in range(20):
+        decimal_state = LedgerState.empty("USD")
+        fixed_state = FixedLedgerState("USD")
+        for side, quantity, price, fees in _random_trades(seed, 500):
+            apply_trade(decimal_state, side, quantity, price, fees)
+            row = (
+                "ACC",
+                "SYM",
+                side,
+                "USD",
+                scale(quantity, VALUE_DIGITS),
+                scale(price, VALUE_DIGITS),
+                scale(fees, VALUE_DIGITS),
+            )
+            replay_fixed_trades({("ACC", "SYM"): fixed_state}, [row])
+
+            fixed_avg_cost = unscale(fixed_state.avg_cost, AVG_COST_DIGITS)
+            fixed_realized = unscale(fixed_state.realized_pnl, PNL_DIGITS)
+            assert unscale(fixed_state.quantity, VALUE_DIGITS) == decimal_state.quantity
+            assert fixed_avg_cost.quantize(SIX_DP) == decimal_state.avg_cost.quantize(SIX_DP)
+            assert fixed_realized.quantize(SIX_DP) == decimal_state.realized_pnl.quantize(SIX_DP)
+
+
+def test_fixed_ledger_engine_positions_match_decimal(client, db_session, monkeypatch) -> None:
+    csv_content = """account,symbol,trade_date,side,quantity,price,fees,currency,broker_ref
+ACC1,AAPL,2026-02-02,BUY,3,100.333333,0.7,USD,F1
+ACC1,AAPL,2026-02-03,BUY,7.5,101.1,0.3,USD,F2
+ACC2,MSFT,2026-02-03,BUY,11,49.9,0,USD,F3
+ACC1,AAPL,2026-02-05,SELL,4.25,104.2,0.5,USD,F4
+ACC2,MSFT,2026-02-06,SELL,12,51,0.1,USD,F5
+ACC2,MSFT,2026-02-07,BUY,2,50.5,0,USD,F6
+"""
+    files = {"file": ("fx.csv", csv_content, "text/csv")}
+    assert client.post("/v1/trades/import", files=files).status_code == 200
+    db_session.add(
+        PriceEOD(
+            symbol="AAPL", price_date=date(2026, 2, 6), close_price=Decimal("103.3"), source="test"
+        )
+    )
+    db_session.commit()
+
+    def rounded(positions):
+        return [
+            tuple(
+                value.quantize(SIX_DP) if isinstance(value, Decimal) else value
+                for value in (
+                    pos.account,
+                    pos.symbol,
+                    pos.quantity,
+                    pos.avg_cost,
+                    pos.cost_basis,
+                    pos.market_value,
+                    pos.unrealized_pnl,
+                    pos.realized_pnl,
+                )
+            )
+            for pos in positions
+        ]
+
+    expected = rounded(calculate_positions(db_session, snapshot_date=date(2026, 2, 10)))
+    monkeypatch.setattr(settings, "ledger_engine", "fixed")
+    assert rounded(calculate_positions(db_session, snapshot_date=date(2026, 2, 10))) == expected
+
+    client.post("/v1/positions/snapshot", params={"snapshot_date": "2026-02-03"})
+    assert rounded(calculate_positions(db_session, snapshot_date=date(2026, 2, 10))) == expected
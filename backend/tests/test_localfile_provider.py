@@ -0,0 +1,104 @@
+import asyncio
+import os
+import threading
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.market_data.factory import get_market_data_provider, resolve_provider_chain
+from app.market_data.providers import localfile
+from app.market_data.providers.localfile import LocalFileMarketDataProvider
+
+
+@pytest.fixture()
+def price_dir(tmp_path, monkeypatch):
+    (tmp_path / "AAPL.csv").write_text(
+        "date,close\n2026-01-07,102.5\n2026-01-05,100.123456\n2026-01-06,101\n2026-01-09,103.75\n"
+    )
+    (tmp_path / "SAP.csv").write_text(
+        "date,close,currency\n2026-01-06,180.2,eur\n2026-01-06,181,eur\n"
+    )
+    monkeypatch.setattr(settings, "localfile_price_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_history_is_sliced_from_the_converted_file(price_dir) -> None:
+    provider = get_market_data_provider("localfile")
+    assert isinstance(provider, LocalFileMarketDataProvider)
+
+    points, failed = provider.fetch_history(
+        ["aapl", "SAP", "NOPE", "../AAPL"], date(2026, 1, 6), date(2026, 1, 9)
+    )
+
+    assert failed == ["NOPE", "../AAPL"]
+    assert [(p.symbol, p.price_date, p.close_price, p.currency) for p in points] == [
+        ("AAPL", date(2026, 1, 6), Decimal(101), "USD"),
+        ("AAPL", date(2026, 1, 7), Decimal("102.5"), "USD"),
+        ("AAPL", date(2026, 1, 9), Decimal("103.75"), "USD"),
+        ("SAP", date(2026, 1, 6), Decimal(181), "EUR"),
+    ]
+    assert isinstance(np.load(price_dir / ".npy" / "AAPL.npy", mmap_mode="r"), np.memmap)
+
+    _, failed = provider.fetch_history(["AAPL"], date(2026, 2, 1), date(2026, 2, 5))
+    assert failed == ["AAPL"]
+
+
+def test_eod_uses_the_last_close_within_the_lookback(price_dir) -> None:
+    provider = LocalFileMarketDataProvider()
+
+    points, failed = provider.fetch_eod(["AAPL", "SAP", "NOPE"], date(2026, 1, 8))
+    assert failed == ["NOPE"]
+    assert [(p.symbol, p.price_date, p.close_price) for p in points] == [
+        ("AAPL", date(2026, 1, 8), Decimal("102.5")),
+        ("SAP", date(2026, 1, 8), Decimal(181)),
+    ]
+
+    assert provider.fetch_eod(["AAPL"], date(2026, 1, 4)) == ([], ["AAPL"])
+    assert provider.fetch_eod(["AAPL"], date(2026, 3, 1)) == ([], ["AAPL"])
+
+
+def test_files_are_converted_once_and_again_when_the_csv_changes(price_dir) -> None:
+    provider = LocalFileMarketDataProvider()
+    provider.fetch_eod(["AAPL"], date(2026, 1, 9))
+    npy_path = price_dir / ".npy" / "AAPL.npy"
+    converted_at = npy_path.stat().st_mtime_ns
+
+    provider.fetch_eod(["AAPL"], date(2026, 1, 9))
+    assert npy_path.stat().st_mtime_ns == converted_at
+
+    csv_path = price_dir / "AAPL.csv"
+    csv_path.write_text("date,close\n2026-01-09,200\n")
+    os.utime(csv_path, ns=(converted_at + 1_000_000_000, converted_at + 1_000_000_000))
+    points, _ = provider.fetch_eod(["AAPL"], date(2026, 1, 9))
+    assert points[0].close_price == Decimal(200)
+
+
+def test_async_methods_convert_off_the_event_loop(price_dir, monkeypatch) -> None:
+    converted_on = []
+    convert = localfile.convert_price_csv
+
+    def recording(csv_path, npy_path):
+        converted_on.append(threading.get_ident())
+        convert(csv_path, npy_path)
+
+    monkeypatch.setattr(localfile, "convert_price_csv", recording)
+    provider = LocalFileMarketDataProvider()
+
+    async def fetch():
+        loop_thread = threading.get_ident()
+        eod = await provider.afetch_eod(["AAPL"], date(2026, 1, 9))
+        history = await provider.afetch_history(["SAP"], date(2026, 1, 5), date(2026, 1, 9))
+        return loop_thread, eod, history
+
+    loop_thread, eod, history = asyncio.run(fetch())
+    assert len(converted_on) == 2
+    assert loop_thread not in converted_on
+    assert eod == provider.fetch_eod(["AAPL"], date(2026, 1, 9))
+    assert history == provider.fetch_history(["SAP"], date(2026, 1, 5), date(2026, 1, 9))
+
+
+def test_localfile_is_a_valid_chain_member() -> None:
+    assert resolve_provider_chain(["localfile", "demo"]) == ["localfile", "demo"]
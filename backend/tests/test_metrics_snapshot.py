@@ -0,0 +1,182 @@
+from dataclasses import astuple
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models import JobRun, PortfolioMetricsSnapshot, PortfolioMetricsState, PriceEOD
+from app.services import metrics_snapshot
+from app.services.analytics import calculate_analytics
+from app.services.metrics_snapshot import read_portfolio_analytics, refresh_metrics_snapshots
+from app.services.snapshots import write_position_snapshot
+
+SNAPSHOT_DATE = date(2026, 1, 18)
+# The last seeded price date; a holiday, so the series itself ends on Jan 16.
+THROUGH = date(2026, 1, 19)
+
+
+def _rows(db, account: str) -> dict[date, tuple[int, float]]:
+    db.expire_all()
+    return {
+        row.metric_date: (row.id, row.market_value)
+        for row in db.scalars(
+            select(PortfolioMetricsSnapshot).where(PortfolioMetricsSnapshot.account == account)
+        )
+    }
+
+
+def _state(db, account: str) -> PortfolioMetricsState:
+    db.expire_all()
+    return db.scalar(select(PortfolioMetricsState).where(PortfolioMetricsState.account == account))
+
+
+def _no_live_reads(monkeypatch) -> None:
+    def fail(*args, **kwargs):
+        raise AssertionError("expected a read from the materialized rows")
+
+    monkeypatch.setattr(metrics_snapshot, "calculate_analytics_series", fail)
+
+
+@pytest.mark.parametrize("account", [None, "ACC1", "ACC2"])
+@pytest.mark.parametrize("start_date", [None, date(2026, 1, 9)])
+def test_materialized_analytics_matches_live_replay(
+    seeded_book, account, start_date, monkeypatch
+) -> None:
+    assert refresh_metrics_snapshots(seeded_book) == 3
+    assert _state(seeded_book, account or "*").computed_through == THROUGH
+
+    expected = {
+        snapshot_date: calculate_analytics(
+            seeded_book, snapshot_date=snapshot_date, account=account, start_date=start_date
+        )
+        for snapshot_date in (SNAPSHOT_DATE, date(2026, 1, 12), date(2026, 1, 7))
+    }
+    _no_live_reads(monkeypatch)
+    for snapshot_date, result in expected.items():
+        actual = read_portfolio_analytics(
+            seeded_book, snapshot_date=snapshot_date, account=account, start_date=start_date
+        )
+        assert actual == result
+
+
+def test_analytics_endpoint_does_not_write(client, seeded_book) -> None:
+    # The prices were added after the import's refresh, so the stored series is stale.
+    params = {"snapshot_date": "2026-01-18", "account": "ACC1"}
+    rows = _rows(seeded_book, "ACC1")
+    updated_at = _state(seeded_book, "ACC1").updated_at
+
+    response = client.get("/v1/analytics", params=params)
+    assert response.status_code == 200
+    live = calculate_analytics(seeded_book, snapshot_date=SNAPSHOT_DATE, account="ACC1")
+    assert [point["date"] for point in response.json()["series"]] == [
+        point.date.isoformat() for point in live.series
+    ]
+    assert _rows(seeded_book, "ACC1") == rows
+    assert _state(seeded_book, "ACC1").updated_at == updated_at
+
+
+def test_analytics_endpoint_reads_materialized_rows(client, seeded_book, monkeypatch) -> None:
+    refresh_metrics_snapshots(seeded_book)
+    params = {"snapshot_date": "2026-01-18", "account": "ACC1"}
+    live = client.get("/v1/analytics", params=params).json()
+
+    _no_live_reads(monkeypatch)
+    assert client.get("/v1/analytics", params=params).json() == live
+    assert refresh_metrics_snapshots(seeded_book) == 0
+
+
+def test_trade_import_recomputes_only_from_the_dirty_date(client, seeded_book) -> None:
+    refresh_metrics_snapshots(seeded_book)
+    before = _rows(seeded_book, "ACC1")
+    acc2_before = _rows(seeded_book, "ACC2")
+
+    csv_content = """account,symbol,trade_date,side,quantity,price,fees,currency,broker_ref
+ACC1,AAPL,2026-01-13,BUY,5,103,0,USD,N1
+"""
+    files = {"file": ("late.csv", csv_content, "text/csv")}
+    response = client.post("/v1/trades/import", files=files)
+    assert response.status_code == 200
+
+    # The import's background refresh has already recomputed the dirty tail.
+    assert _state(seeded_book, "ACC1").dirty_from is None
+    after = _rows(seeded_book, "ACC1")
+    assert {dt: row for dt, row in after.items() if dt < date(2026, 1, 13)} == {
+        dt: row for dt, row in before.items() if dt < date(2026, 1, 13)
+    }
+    assert after[date(2026, 1, 14)][1] > before[date(2026, 1, 14)][1]
+    assert _rows(seeded_book, "ACC2") == acc2_before
+    assert seeded_book.scalar(
+        select(JobRun.status).where(JobRun.job_name == "metrics_refresh").order_by(JobRun.id.desc())
+    ) == "SUCCESS"
+
+    actual = read_portfolio_analytics(seeded_book, snapshot_date=SNAPSHOT_DATE, account="ACC1")
+    assert actual == calculate_analytics(seeded_book, snapshot_date=SNAPSHOT_DATE, account="ACC1")
+
+
+def test_price_refresh_recomputes_the_series(client, seeded_book) -> None:
+    refresh_metrics_snapshots(seeded_book)
+
+    response = client.post(
+        "/v1/prices/refresh", json={"price_date": "2026-01-16", "symbols": ["AAPL"]}
+    )
+    assert response.status_code == 200
+    state = _state(seeded_book, "*")
+    assert state.dirty_from is None
+    versions = metrics_snapshot.metrics_versions(seeded_book)
+    assert (state.trade_version, state.price_version) == versions
+
+    actual = read_portfolio_analytics(seeded_book, snapshot_date=SNAPSHOT_DATE)
+    assert actual == calculate_analytics(seeded_book, snapshot_date=SNAPSHOT_DATE)
+
+
+def test_tail_refresh_starts_from_the_position_snapshot(client, seeded_book, monkeypatch) -> None:
+    refresh_metrics_snapshots(seeded_book)
+    write_position_snapshot(seeded_book, date(2026, 1, 12))
+
+    replayed_after = []
+    load_trade_records = metrics_snapshot.load_trade_records
+
+    def recording(db, snapshot_date, account=None, after=None):
+        replayed_after.append(after)
+        return load_trade_records(db, snapshot_date=snapshot_date, account=account, after=after)
+
+    monkeypatch.setattr(metrics_snapshot, "load_trade_records", recording)
+    csv_content = """account,symbol,trade_date,side,quantity,price,fees,currency,broker_ref
+ACC1,AAPL,2026-01-14,BUY,5,103,0,USD,N1
+"""
+    files = {"file": ("late.csv", csv_content, "text/csv")}
+    response = client.post("/v1/trades/import", files=files)
+    assert response.status_code == 200
+
+    # The all-accounts and ACC1 series replay only the trades after the Jan 12 snapshot.
+    assert replayed_after == [date(2026, 1, 12), date(2026, 1, 12)]
+    # Snapshot ledger state is rounded to 18 places, so seeded totals can differ in the last bits.
+    for account in (None, "ACC1"):
+        actual = read_portfolio_analytics(seeded_book, snapshot_date=SNAPSHOT_DATE, account=account)
+        expected = calculate_analytics(seeded_book, snapshot_date=SNAPSHOT_DATE, account=account)
+        assert [point.date for point in actual.series] == [point.date for point in expected.series]
+        for point, live in zip(actual.series, expected.series, strict=True):
+            assert astuple(point)[1:] == pytest.approx(astuple(live)[1:])
+        assert actual.sharpe_ratio == pytest.approx(expected.sharpe_ratio)
+
+
+def test_unmarked_price_write_rebuilds_the_series(seeded_book) -> None:
+    refresh_metrics_snapshots(seeded_book)
+
+    seeded_book.add(
+        PriceEOD(
+            symbol="NVDA", price_date=date(2026, 1, 17), close_price=Decimal(650), source="test"
+        )
+    )
+    seeded_book.commit()
+
+    # Until the next refresh the stale series is bypassed.
+    actual = read_portfolio_analytics(seeded_book, snapshot_date=SNAPSHOT_DATE, account="ACC2")
+    assert actual == calculate_analytics(seeded_book, snapshot_date=SNAPSHOT_DATE, account="ACC2")
+
+    assert refresh_metrics_snapshots(seeded_book) == 3
+    assert _state(seeded_book, "ACC2").computed_through == THROUGH
+    # A Saturday is not a trading day, so the rebuilt series still skips it.
+    assert date(2026, 1, 17) not in _rows(seeded_book, "ACC2")
+    assert seeded_book.scalar(select(func.count()).select_from(PortfolioMetricsSnapshot)) > 0
@@ -0,0 +1,69 @@
+import json
+from datetime import date
+
+import pytest
+
+from app.api import portfolio as portfolio_api
+from app.services.analytics import calculate_analytics_series
+
+
+def _lines(response) -> list[dict]:
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.parametrize(
+    ("params", "headers"),
+    [({"stream": "true"}, {}), ({}, {"Accept": "application/x-ndjson"})],
+)
+def test_analytics_ndjson_matches_json_response(client, seeded_book, params, headers) -> None:
+    query = {"snapshot_date": "2026-01-18", "start_date": "2026-01-06"}
+    expected = client.get("/v1/analytics", params=query).json()
+
+    response = client.get("/v1/analytics", params={**query, **params}, headers=headers)
+    assert response.status_code == 200
+    header, *points = _lines(response)
+
+    assert header.pop("type") == "summary"
+    assert header == {key: value for key, value in expected.items() if key != "series"}
+    assert [point.pop("type") for point in points] == ["point"] * len(points)
+    assert points == expected["series"]
+
+
+def test_analytics_ndjson_yields_the_summary_before_the_points(seeded_book) -> None:
+    series = calculate_analytics_series(seeded_book, snapshot_date=date(2026, 1, 18))
+    summary, *points = portfolio_api._analytics_lines(series)
+
+    assert summary["type"] == "summary"
+    assert [point["type"] for point in points] == ["point"] * len(series.totals)
+    assert points[0]["date"] == series.totals[0][0]
+
+
+def test_analytics_ndjson_without_trades_emits_only_summary(client) -> None:
+    response = client.get("/v1/analytics", params={"snapshot_date": "2026-01-18", "stream": "true"})
+    assert response.status_code == 200
+
+    lines = _lines(response)
+    assert len(lines) == 1
+    assert lines[0]["type"] == "summary"
+    assert lines[0]["concentration_top_symbol"] is None
+
+
+def test_compare_ndjson_matches_json_response(client) -> None:
+    body = {
+        "symbols": ["AAPL", "MSFT", "XFAIL_GONE"],
+        "start_date": "2026-01-05",
+        "end_date": "2026-01-20",
+        "providers": ["demo"],
+    }
+    expected = client.post("/v1/companies/compare", json=body).json()
+
+    response = client.post("/v1/companies/compare", params={"stream": "true"}, json=body)
+    assert response.status_code == 200
+    header, *points = _lines(response)
+
+    assert header.pop("type") == "summary"
+    assert header == {key: value for key, value in expected.items() if key != "series"}
+    assert [point.pop("type") for point in points] == ["point"] * len(points)
+    assert points == expected["series"]
+    assert all(point["prices"]["XFAIL_GONE"] is None for point in points)
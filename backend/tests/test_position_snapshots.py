@@ -0,0 +1,114 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import delete, select
+
+from app.models import PositionSnapshot, PriceEOD, Trade
+from app.services.portfolio import calculate_positions
+
+SIX_DP = Decimal("0.000001")
+
+CSV_CONTENT = """account,symbol,trade_date,side,quantity,price,fees,currency,broker_ref
+ACC1,AAPL,2026-02-02,BUY,3,100.333333,0.7,USD,S1
+ACC1,AAPL,2026-02-03,BUY,7,101.1,0.3,USD,S2
+ACC2,MSFT,2026-02-03,BUY,11,49.9,0,USD,S3
+ACC1,AAPL,2026-02-05,SELL,4,104.2,0.5,USD,S4
+ACC2,MSFT,2026-02-06,SELL,11,51,0.1,USD,S5
+ACC1,AAPL,2026-02-09,BUY,2,99.75,0,USD,S6
+"""
+
+
+def _rounded(positions) -> list[tuple]:
+    def q(value):
+        return value.quantize(SIX_DP) if value is not None else None
+
+    return [
+        (
+            pos.account,
+            pos.symbol,
+            q(pos.quantity),
+            q(pos.avg_cost),
+            q(pos.cost_basis),
+            q(pos.market_value),
+            q(pos.unrealized_pnl),
+            q(pos.realized_pnl),
+        )
+        for pos in positions
+    ]
+
+
+def _seed(client, db_session) -> None:
+    response = client.post(
+        "/v1/trades/import", files={"file": ("snap.csv", CSV_CONTENT, "text/csv")}
+    )
+    assert response.status_code == 200
+    db_session.add_all(
+        [
+            PriceEOD(
+                symbol="AAPL",
+                price_date=date(2026, 2, 4),
+                close_price=Decimal("103.5"),
+                source="test",
+            ),
+            PriceEOD(
+                symbol="MSFT",
+                price_date=date(2026, 2, 4),
+                close_price=Decimal("50.25"),
+                source="test",
+            ),
+            PriceEOD(
+                symbol="AAPL",
+                price_date=date(2026, 2, 10),
+                close_price=Decimal("98.125"),
+                source="test",
+            ),
+        ]
+    )
+    db_session.commit()
+
+
+def test_positions_roll_forward_from_snapshot(client, db_session) -> None:
+    _seed(client, db_session)
+    full_replay = _rounded(calculate_positions(db_session, snapshot_date=date(2026, 2, 10)))
+
+    response = client.post("/v1/positions/snapshot", params={"snapshot_date": "2026-02-05"})
+    assert response.status_code == 200
+    assert response.json()["rows_written"] == 2
+
+    # Removing trades covered by the snapshot must not change the result: only later trades
+    # are replayed.
+    db_session.execute(delete(Trade).where(Trade.trade_date <= date(2026, 2, 5)))
+    db_session.commit()
+
+    assert _rounded(calculate_positions(db_session, snapshot_date=date(2026, 2, 10))) == full_replay
+
+    acc2 = calculate_positions(db_session, snapshot_date=date(2026, 2, 10), account="ACC2")
+    assert [(pos.symbol, pos.quantity) for pos in acc2] == [("MSFT", Decimal(0))]
+
+
+def test_snapshot_stores_ledger_state(client, db_session) -> None:
+    _seed(client, db_session)
+    client.post("/v1/positions/snapshot", params={"snapshot_date": "2026-02-05"})
+
+    rows = {row.symbol: row for row in db_session.scalars(select(PositionSnapshot)).all()}
+    assert rows["AAPL"].quantity == Decimal(6)
+    assert rows["AAPL"].market_price == Decimal("103.5")
+    assert rows["AAPL"].realized_pnl.quantize(SIX_DP) == Decimal("12.420000")
+
+
+def test_trade_import_invalidates_later_snapshots(client, db_session) -> None:
+    _seed(client, db_session)
+    client.post("/v1/positions/snapshot", params={"snapshot_date": "2026-02-03"})
+    client.post("/v1/positions/snapshot", params={"snapshot_date": "2026-02-09"})
+
+    backfill = """account,symbol,trade_date,side,quantity,price,fees,currency,broker_ref
+ACC1,AAPL,2026-02-04,BUY,1,100,0,USD,S7
+"""
+    response = client.post("/v1/trades/import", files={"file": ("late.csv", backfill, "text/csv")})
+    assert response.status_code == 200
+
+    remaining = set(db_session.scalars(select(PositionSnapshot.snapshot_date)).all())
+    assert remaining == {date(2026, 2, 3)}
+
+    positions = calculate_positions(db_session, snapshot_date=date(2026, 2, 9), account="ACC1")
+    assert positions[0].quantity == Decimal(9)
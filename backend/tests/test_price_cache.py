@@ -0,0 +1,143 @@
+from datetime import date
+from decimal import Decimal
+
+from app.models import PriceEOD
+from app.services.portfolio import _query_latest_prices
+from app.services.price_cache import PriceMatrix, get_price_matrix, price_version
+from app.services.price_store import upsert_prices
+
+
+def _add_prices(db_session, rows: list[tuple[str, date, str]]) -> None:
+    db_session.add_all(
+        [
+            PriceEOD(symbol=s, price_date=d, close_price=Decimal(px), source="test")
+            for s, d, px in rows
+        ]
+    )
+    db_session.commit()
+
+
+def test_price_matrix_as_of_lookup_matches_sql(db_session) -> None:
+    _add_prices(
+        db_session,
+        [
+            ("AAPL", date(2026, 2, 2), "101.123456"),
+            ("AAPL", date(2026, 2, 5), "99.5"),
+            ("MSFT", date(2026, 2, 3), "400.25"),
+            ("MSFT", date(2026, 2, 9), "410"),
+        ],
+    )
+    matrix = PriceMatrix(max_bytes=1 << 20)
+    symbols = ["AAPL", "MSFT", "NONE"]
+
+    for day in range(1, 12):
+        as_of = date(2026, 2, day)
+        assert matrix.latest_closes(db_session, symbols, as_of) == _query_latest_prices(
+            db_session, symbols, as_of
+        )
+
+    assert matrix.latest_closes(db_session, ["AAPL"], date(2026, 2, 3)) == {
+        "AAPL": Decimal("101.123456")
+    }
+
+
+def test_price_matrix_respects_memory_bound(db_session) -> None:
+    _add_prices(
+        db_session,
+        [
+            (f"S{idx}", date(2026, 1, 1 + day), str(10 + day))
+            for idx in range(6)
+            for day in range(20)
+        ],
+    )
+    row_bytes = 2 * 8 * 20
+    matrix = PriceMatrix(max_bytes=3 * row_bytes + 20 * 8)
+
+    for idx in range(6):
+        assert matrix.latest_closes(db_session, [f"S{idx}"], date(2026, 1, 10)) == {
+            f"S{idx}": Decimal(19)
+        }
+        assert matrix.nbytes <= matrix.max_bytes
+    assert matrix.symbols == ["S3", "S4", "S5"]
+
+    assert (
+        matrix.latest_closes(db_session, [f"S{idx}" for idx in range(6)], date(2026, 1, 10)) is None
+    )
+    assert matrix.nbytes <= matrix.max_bytes
+
+
+def test_price_refresh_updates_cached_positions_incrementally(client, db_session) -> None:
+    csv_content = """account,symbol,trade_date,side,quantity,price,fees,currency,broker_ref
+ACC1,AAPL,2026-02-10,BUY,2,100,0,USD,T1
+"""
+    files = {"file": ("seed.csv", csv_content, "text/csv")}
+    assert client.post("/v1/trades/import", files=files).status_code == 200
+    _add_prices(
+        db_session, [("AAPL", date(2026, 2, 10), "100"), ("AAPL", date(2026, 2, 20), "120")]
+    )
+
+    first = client.get("/v1/positions", params={"snapshot_date": "2026-02-16"}).json()
+    assert Decimal(first["positions"][0]["market_price"]) == Decimal(100)
+    matrix = get_price_matrix(db_session)
+    assert matrix.symbols == ["AAPL"]
+
+    refresh = client.post(
+        "/v1/prices/refresh", json={"price_date": "2026-02-13", "symbols": ["AAPL"]}
+    )
+    assert refresh.status_code == 200
+    assert matrix.symbols == ["AAPL"]
+    assert matrix.version == price_version(db_session)
+
+    second = client.get("/v1/positions", params={"snapshot_date": "2026-02-16"}).json()
+    demo_close = Decimal(second["positions"][0]["market_price"])
+    assert demo_close != Decimal(100)
+
+    later = client.get("/v1/positions", params={"snapshot_date": "2026-02-25"}).json()
+    assert Decimal(later["positions"][0]["market_price"]) == Decimal(120)
+
+
+def test_out_of_band_price_inserts_reset_the_cache(client, db_session) -> None:
+    csv_content = """account,symbol,trade_date,side,quantity,price,fees,currency,broker_ref
+ACC1,AAPL,2026-02-10,BUY,2,100,0,USD,T1
+"""
+    client.post("/v1/trades/import", files={"file": ("seed.csv", csv_content, "text/csv")})
+    _add_prices(db_session, [("AAPL", date(2026, 2, 10), "100")])
+    payload = client.get("/v1/positions", params={"snapshot_date": "2026-02-12"}).json()
+    assert Decimal(payload["positions"][0]["market_price"]) == Decimal(100)
+
+    _add_prices(db_session, [("AAPL", date(2026, 2, 11), "105")])
+    payload = client.get("/v1/positions", params={"snapshot_date": "2026-02-12"}).json()
+    assert Decimal(payload["positions"][0]["market_price"]) == Decimal(105)
+
+
+def test_price_corrections_from_another_process_reset_the_cache(client, db_session) -> None:
+    csv_content = """account,symbol,trade_date,side,quantity,price,fees,currency,broker_ref
+ACC1,AAPL,2026-02-10,BUY,2,100,0,USD,T1
+"""
+    client.post("/v1/trades/import", files={"file": ("seed.csv", csv_content, "text/csv")})
+    _add_prices(db_session, [("AAPL", date(2026, 2, 10), "100")])
+    payload = client.get("/v1/positions", params={"snapshot_date": "2026-02-12"}).json()
+    assert Decimal(payload["positions"][0]["market_price"]) == Decimal(100)
+
+    # An update leaves max(id) alone, and skipping record_price_writes stands in for another worker.
+    upsert_prices(db_session, [("AAPL", date(2026, 2, 10), Decimal(104), "USD", "test")])
+    db_session.commit()
+    payload = client.get("/v1/positions", params={"snapshot_date": "2026-02-12"}).json()
+    assert Decimal(payload["positions"][0]["market_price"]) == Decimal(104)
+
+
+def test_apply_reloads_when_another_writer_got_in_between(db_session) -> None:
+    _add_prices(db_session, [("AAPL", date(2026, 2, 2), "100")])
+    matrix = PriceMatrix(max_bytes=1 << 20)
+    matrix.latest_closes(db_session, ["AAPL"], date(2026, 2, 3))
+
+    first = upsert_prices(db_session, [("AAPL", date(2026, 2, 3), Decimal(101), "USD", "x")])
+    db_session.commit()
+    second = upsert_prices(db_session, [("AAPL", date(2026, 2, 3), Decimal(102), "USD", "x")])
+    db_session.commit()
+
+    # Only the second write is applied here; moving the version on would hide the first one.
+    matrix.apply([("AAPL", date(2026, 2, 3), Decimal(102))], *second.versions)
+    assert matrix.version is None
+    assert first.versions[1] == second.versions[0]
+    assert matrix.latest_closes(db_session, ["AAPL"], date(2026, 2, 3)) == {"AAPL": Decimal(102)}
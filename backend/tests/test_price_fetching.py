@@ -0,0 +1,211 @@
+import asyncio
+import threading
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.config import settings
+from app.market_data import fetching
+from app.market_data.adapters import AsyncProviderAdapter, SyncProviderAdapter, adapt_provider
+from app.market_data.base import PricePoint
+from app.market_data.fetching import (
+    TokenBucket,
+    afetch_through_chain,
+    fetch_through_chain,
+    parse_rate_limits,
+)
+from app.market_data.providers.demo import DemoMarketDataProvider
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RecordingProvider:
+    def __init__(self, failing_prefix: str) -> None:
+        self.failing_prefix = failing_prefix
+        self.calls: list[list[str]] = []
+        self.lock = threading.Lock()
+
+    def fetch_eod(self, symbols: list[str], as_of_date: date) -> tuple[list[PricePoint], list[str]]:
+        with self.lock:
+            self.calls.append(list(symbols))
+        failed = [symbol for symbol in symbols if symbol.startswith(self.failing_prefix)]
+        points = [
+            PricePoint(symbol, as_of_date, Decimal(10), "USD")
+            for symbol in symbols
+            if symbol not in failed
+        ]
+        return points, failed
+
+
+def test_token_bucket_spaces_out_acquisitions() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+
+    for _ in range(6):
+        bucket.acquire()
+
+    assert clock.now == pytest.approx(2.0)
+    assert all(delay == pytest.approx(0.5) for delay in clock.sleeps)
+
+
+def test_parse_rate_limits() -> None:
+    assert parse_rate_limits(" yfinance=2.5, Demo=0 ,") == {"yfinance": 2.5, "demo": 0.0}
+    with pytest.raises(ValueError, match="Invalid provider rate limit"):
+        parse_rate_limits("yfinance=fast")
+
+
+def test_failed_chunks_fall_through_the_chain(monkeypatch) -> None:
+    primary = RecordingProvider(failing_prefix="X")
+    backup = RecordingProvider(failing_prefix="XX")
+    providers = {"primary": primary, "backup": backup}
+    monkeypatch.setattr(fetching, "get_market_data_provider", lambda name: providers[name])
+    monkeypatch.setattr(settings, "price_provider_rate_limits", "")
+
+    symbols = ["A1", "XB", "A2", "XXC", "A3", "XD", "A4"]
+    result = fetch_through_chain(
+        ["primary", "backup"],
+        symbols,
+        lambda provider, chunk: provider.fetch_eod(chunk, date(2026, 2, 14)),
+        workers=3,
+        chunk_size=2,
+    )
+
+    assert sorted(primary.calls) == [["A1", "XB"], ["A2", "XXC"], ["A3", "XD"], ["A4"]]
+    assert sorted(backup.calls) == [["XB"], ["XD"], ["XXC"]]
+    assert sorted((name, point.symbol) for name, point in result.points) == [
+        ("backup", "XB"),
+        ("backup", "XD"),
+        ("primary", "A1"),
+        ("primary", "A2"),
+        ("primary", "A3"),
+        ("primary", "A4"),
+    ]
+    assert result.failed == ["XXC"]
+
+
+def test_provider_errors_fail_the_whole_chunk(monkeypatch) -> None:
+    class BrokenProvider:
+        def fetch_eod(self, symbols, as_of_date):
+            raise RuntimeError("provider down")
+
+    monkeypatch.setattr(fetching, "get_market_data_provider", lambda name: BrokenProvider())
+    result = fetch_through_chain(
+        ["broken"],
+        ["A", "B", "C"],
+        lambda provider, chunk: provider.fetch_eod(chunk, None),
+        chunk_size=2,
+    )
+
+    assert result.points == []
+    assert sorted(result.failed) == ["A", "B", "C"]
+
+
+def test_rate_limiter_is_shared_per_provider(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "price_provider_rate_limits", "yfinance=3")
+    limiter = fetching.get_rate_limiter("yfinance")
+
+    assert limiter is fetching.get_rate_limiter("yfinance")
+    assert limiter.rate == 3
+    assert fetching.get_rate_limiter("demo") is None
+
+
+class AsyncOnlyProvider:
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.peak = 0
+
+    async def afetch_eod(
+        self, symbols: list[str], as_of_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        failed = [symbol for symbol in symbols if symbol.startswith("X")]
+        points = [
+            PricePoint(symbol, as_of_date, Decimal(5), "USD")
+            for symbol in symbols
+            if symbol not in failed
+        ]
+        return points, failed
+
+
+def test_adapters_fill_in_the_missing_side() -> None:
+    demo = DemoMarketDataProvider()
+    assert adapt_provider(demo) is demo
+
+    sync_only = adapt_provider(RecordingProvider(failing_prefix="X"))
+    assert isinstance(sync_only, SyncProviderAdapter)
+    points, failed = asyncio.run(sync_only.afetch_eod(["A", "XB"], date(2026, 2, 13)))
+    assert [point.symbol for point in points] == ["A"]
+    assert failed == ["XB"]
+
+    async_only = adapt_provider(AsyncOnlyProvider())
+    assert isinstance(async_only, AsyncProviderAdapter)
+    points, failed = async_only.fetch_eod(["A", "XB"], date(2026, 2, 13))
+    assert [point.symbol for point in points] == ["A"]
+    assert failed == ["XB"]
+
+    with pytest.raises(TypeError, match="implements neither"):
+        adapt_provider(object())
+
+
+def test_async_chain_fans_out_on_one_loop_and_falls_through(monkeypatch) -> None:
+    primary = AsyncOnlyProvider()
+    backup = RecordingProvider(failing_prefix="XX")
+    providers = {"primary": primary, "backup": backup}
+    monkeypatch.setattr(fetching, "get_market_data_provider", lambda name: providers[name])
+    monkeypatch.setattr(settings, "price_provider_rate_limits", "")
+
+    symbols = [f"A{idx}" for idx in range(200)] + ["XB", "XXC"]
+    result = asyncio.run(
+        afetch_through_chain(
+            ["primary", "backup"],
+            symbols,
+            lambda provider, chunk: provider.afetch_eod(chunk, date(2026, 2, 14)),
+            concurrency=50,
+            chunk_size=2,
+        )
+    )
+
+    assert primary.peak == 50
+    assert backup.calls == [["XB", "XXC"]]
+    assert len(result.points) == 201
+    assert ("backup", "XB") in {(name, point.symbol) for name, point in result.points}
+    assert result.failed == ["XXC"]
+
+
+def test_refresh_and_compare_give_the_same_results_in_async_mode(client, monkeypatch) -> None:
+    def run() -> tuple[dict, dict]:
+        refresh = client.post(
+            "/v1/prices/refresh",
+            json={"price_date": "2026-02-13", "symbols": ["AAPL", "XFAIL1"], "providers": ["demo"]},
+        ).json()
+        compare = client.post(
+            "/v1/companies/compare",
+            json={
+                "symbols": ["AAPL", "MSFT"],
+                "start_date": "2026-01-05",
+                "end_date": "2026-01-16",
+                "providers": ["demo"],
+            },
+        ).json()
+        refresh.pop("job_run_id")
+        return refresh, compare
+
+    monkeypatch.setattr(settings, "price_history_read_through", False)
+    blocking = run()
+    monkeypatch.setattr(settings, "price_fetch_async", True)
+    assert run() == blocking
@@ -24,7 +24,7 @@ ACC1,MSFT,2026-02-10,BUY,3,100,0,USD,T2
     price_rows = db_session.query(PriceEOD).all()
     assert len(price_rows) == 2
 
-    run_rows = db_session.query(JobRun).all()
+    run_rows = db_session.query(JobRun).filter(JobRun.job_name == "price_refresh").all()
     assert len(run_rows) == 2
 
 
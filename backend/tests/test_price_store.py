@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from app.models import PriceEOD
+from app.services import price_store
+from app.services.price_store import upsert_prices
+
+
+def _closes(db) -> dict[tuple[str, date], tuple[Decimal, str]]:
+    db.expire_all()
+    return {
+        (row.symbol, row.price_date): (row.close_price, row.source)
+        for row in db.scalars(select(PriceEOD))
+    }
+
+
+def test_upsert_counts_inserts_and_updates_across_batches(db_session, monkeypatch) -> None:
+    monkeypatch.setattr(price_store, "UPSERT_BATCH_SIZE", 3)
+    start = date(2026, 1, 5)
+    first = upsert_prices(
+        db_session,
+        [
+            ("AAPL", start + timedelta(days=idx), Decimal(100 + idx), "USD", "demo")
+            for idx in range(5)
+        ],
+    )
+    db_session.commit()
+    assert (first.inserted_rows, first.updated_rows) == (5, 0)
+
+    second = upsert_prices(
+        db_session,
+        [
+            ("AAPL", start, Decimal(99), "USD", "yfinance"),
+            ("AAPL", start, Decimal("98.5"), "USD", "yfinance"),
+            ("AAPL", start + timedelta(days=4), Decimal(110), "USD", "yfinance"),
+            ("MSFT", start, Decimal(400), "USD", "yfinance"),
+        ],
+    )
+    db_session.commit()
+
+    assert (second.inserted_rows, second.updated_rows) == (1, 2)
+    closes = _closes(db_session)
+    assert len(closes) == 6
+    assert closes[("AAPL", start)] == (Decimal("98.5"), "yfinance")
+    assert closes[("AAPL", start + timedelta(days=1))] == (Decimal(101), "demo")
+    assert closes[("MSFT", start)] == (Decimal(400), "yfinance")
+
+
+def test_upsert_of_nothing_writes_nothing(db_session) -> None:
+    assert upsert_prices(db_session, []).written_rows == 0
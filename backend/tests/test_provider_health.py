@@ -0,0 +1,188 @@
+import asyncio
+import time
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.config import settings
+from app.market_data import fetching
+from app.market_data.base import PricePoint
+from app.market_data.fetching import afetch_through_chain, fetch_through_chain
+from app.market_data.health import ProviderHealth, get_provider_health
+from app.market_data.providers.demo import DemoMarketDataProvider
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ScriptedProvider:
+    def __init__(self, delay: float = 0.0, error: bool = False) -> None:
+        self.delay = delay
+        self.error = error
+        self.calls: list[list[str]] = []
+
+    def fetch_eod(self, symbols: list[str], as_of_date: date) -> tuple[list[PricePoint], list[str]]:
+        self.calls.append(list(symbols))
+        time.sleep(self.delay)
+        if self.error:
+            raise RuntimeError("provider down")
+        return [PricePoint(symbol, as_of_date, Decimal(10), "USD") for symbol in symbols], []
+
+    async def afetch_eod(
+        self, symbols: list[str], as_of_date: date
+    ) -> tuple[list[PricePoint], list[str]]:
+        self.calls.append(list(symbols))
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise RuntimeError("provider down")
+        return [PricePoint(symbol, as_of_date, Decimal(10), "USD") for symbol in symbols], []
+
+
+@pytest.fixture()
+def chain(monkeypatch):
+    providers: dict[str, ScriptedProvider] = {}
+    monkeypatch.setattr(fetching, "get_market_data_provider", lambda name: providers[name])
+    monkeypatch.setattr(settings, "price_provider_rate_limits", "")
+    return providers
+
+
+def test_breaker_opens_cools_down_and_closes() -> None:
+    clock = FakeClock()
+    health = ProviderHealth("primary", failure_threshold=2, cooldown_seconds=30, clock=clock)
+
+    for _ in range(2):
+        assert health.allow()
+        health.record_failure(0.1)
+    assert health.state == "open"
+    assert not health.allow()
+    assert health.snapshot().retry_in_seconds == 30
+
+    clock.now = 30
+    assert health.allow()
+    assert not health.allow()
+    health.record_failure(0.1)
+    assert health.state == "open"
+
+    clock.now = 60
+    assert health.allow()
+    health.record_success(0.3)
+    snapshot = health.snapshot()
+    assert snapshot.state == "closed"
+    assert (snapshot.calls, snapshot.failures, snapshot.skipped_calls) == (4, 3, 2)
+    assert snapshot.latency_p50_ms == pytest.approx(100)
+    assert snapshot.retry_in_seconds is None
+
+
+def test_open_breaker_sends_chunks_straight_to_the_fallback(chain, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "provider_breaker_failures", 2)
+    chain["primary"] = ScriptedProvider(error=True)
+    chain["backup"] = ScriptedProvider()
+
+    result = fetch_through_chain(
+        ["primary", "backup"],
+        ["A", "B", "C", "D", "E"],
+        lambda provider, chunk: provider.fetch_eod(chunk, date(2026, 2, 13)),
+        workers=1,
+        chunk_size=1,
+    )
+
+    assert len(chain["primary"].calls) == 2
+    backup_symbols = sorted(point.symbol for name, point in result.points if name == "backup")
+    assert backup_symbols == ["A", "B", "C", "D", "E"]
+    assert get_provider_health("primary").snapshot().state == "open"
+    assert get_provider_health("primary").snapshot().skipped_calls == 3
+
+
+@pytest.mark.parametrize("fetch_async", [False, True])
+def test_unknown_symbols_do_not_open_the_breaker(chain, monkeypatch, fetch_async) -> None:
+    monkeypatch.setattr(settings, "provider_breaker_failures", 2)
+    chain["primary"] = DemoMarketDataProvider()
+
+    def fetch(symbols: list[str]):
+        if fetch_async:
+            return asyncio.run(
+                afetch_through_chain(
+                    ["primary"],
+                    symbols,
+                    lambda provider, chunk: provider.afetch_eod(chunk, date(2026, 2, 13)),
+                )
+            )
+        return fetch_through_chain(
+            ["primary"],
+            symbols,
+            lambda provider, chunk: provider.fetch_eod(chunk, date(2026, 2, 13)),
+        )
+
+    # Each request is a single symbol the provider answers as failed, not a provider error.
+    for _ in range(5):
+        assert fetch(["XFAIL1"]).failed == ["XFAIL1"]
+
+    snapshot = get_provider_health("primary").snapshot()
+    assert (snapshot.state, snapshot.calls, snapshot.failures) == ("closed", 5, 0)
+    assert [point.symbol for _, point in fetch(["AAPL"]).points] == ["AAPL"]
+
+
+@pytest.mark.parametrize("fetch_async", [False, True])
+def test_slow_primary_is_hedged_to_the_fallback(chain, monkeypatch, fetch_async) -> None:
+    monkeypatch.setattr(settings, "price_fetch_hedge_after_ms", 50)
+    chain["primary"] = ScriptedProvider(delay=1.0)
+    chain["backup"] = ScriptedProvider()
+    symbols = ["A", "B"]
+
+    started = time.perf_counter()
+    if fetch_async:
+        result = asyncio.run(
+            afetch_through_chain(
+                ["primary", "backup"],
+                symbols,
+                lambda provider, chunk: provider.afetch_eod(chunk, date(2026, 2, 13)),
+            )
+        )
+    else:
+        result = fetch_through_chain(
+            ["primary", "backup"],
+            symbols,
+            lambda provider, chunk: provider.fetch_eod(chunk, date(2026, 2, 13)),
+        )
+
+    assert time.perf_counter() - started < 0.5
+    assert [(name, point.symbol) for name, point in result.points] == [
+        ("backup", "A"),
+        ("backup", "B"),
+    ]
+    assert result.failed == []
+    assert get_provider_health("primary").snapshot().hedged_calls == 1
+
+
+def test_hedging_is_off_by_default(chain) -> None:
+    chain["primary"] = ScriptedProvider(delay=0.1)
+    chain["backup"] = ScriptedProvider()
+
+    result = fetch_through_chain(
+        ["primary", "backup"], ["A"], lambda provider, chunk: provider.fetch_eod(chunk, None)
+    )
+
+    assert [name for name, _ in result.points] == ["primary"]
+    assert chain["backup"].calls == []
+
+
+def test_provider_health_endpoint(client) -> None:
+    client.post(
+        "/v1/prices/refresh",
+        json={"price_date": "2026-02-13", "symbols": ["AAPL"], "providers": ["demo"]},
+    )
+
+    response = client.get("/v1/prices/providers/health")
+    assert response.status_code == 200
+    by_provider = {item["provider"]: item for item in response.json()["providers"]}
+    assert set(by_provider) == {"demo", "yfinance", "localfile"}
+    assert by_provider["demo"]["state"] == "closed"
+    assert by_provider["demo"]["calls"] == 1
+    assert by_provider["demo"]["latency_p50_ms"] is not None
+    assert by_provider["yfinance"]["calls"] == 0
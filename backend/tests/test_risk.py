@@ -0,0 +1,85 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from app.services.risk import correlation_matrix, max_drawdown, return_metrics, simple_returns
+
+
+def _stddev(values: list[float]) -> float:
+    if len(values) < 2:
+        return 0.0
+    m = sum(values) / len(values)
+    return math.sqrt(sum((x - m) ** 2 for x in values) / (len(values) - 1))
+
+
+def _pearson(x: list[float], y: list[float]) -> float:
+    mean_x = sum(x) / len(x)
+    mean_y = sum(y) / len(y)
+    cov = sum((a - mean_x) * (b - mean_y) for a, b in zip(x, y, strict=True))
+    var_x = sum((a - mean_x) ** 2 for a in x)
+    var_y = sum((b - mean_y) ** 2 for b in y)
+    if var_x <= 0 or var_y <= 0:
+        return 0.0
+    return cov / math.sqrt(var_x * var_y)
+
+
+def test_return_metrics_match_scalar_definitions() -> None:
+    rng = random.Random(7)
+    series = [[rng.gauss(0.0005, 0.01) for _ in range(n)] for n in (1, 2, 40, 250)]
+    width = max(len(s) for s in series)
+    batch = np.full((len(series), width), np.nan)
+    for idx, values in enumerate(series):
+        batch[idx, : len(values)] = values
+
+    metrics = return_metrics(batch)
+
+    for idx, values in enumerate(series):
+        daily_vol = _stddev(values)
+        assert metrics.annualized_volatility[idx] == pytest.approx(daily_vol * math.sqrt(252))
+        expected_sharpe = (
+            (sum(values) / len(values)) / daily_vol * math.sqrt(252) if daily_vol > 0 else 0.0
+        )
+        assert metrics.sharpe_ratio[idx] == pytest.approx(expected_sharpe)
+
+        ordered = sorted(values)
+        var = ordered[max(0, min(len(ordered) - 1, round((len(ordered) - 1) * 0.05)))]
+        tail = [r for r in values if r <= var]
+        assert metrics.var_95[idx] == var
+        assert metrics.cvar_95[idx] == pytest.approx(sum(tail) / len(tail))
+
+
+def test_return_metrics_empty_series() -> None:
+    metrics = return_metrics([])
+    assert metrics.annualized_volatility.tolist() == [0.0]
+    assert metrics.var_95.tolist() == [0.0]
+
+
+def test_simple_returns_skip_gaps_and_drawdown() -> None:
+    prices = np.array([[100.0, np.nan, 110.0, 99.0, 121.0], [np.nan, 50.0, 25.0, np.nan, 30.0]])
+
+    returns = simple_returns(prices)
+    assert np.isnan(returns[0, 0]) and np.isnan(returns[0, 1])
+    assert returns[0, 2] == pytest.approx(0.1)
+    assert returns[1, 4] == pytest.approx(0.2)
+
+    assert max_drawdown(prices).tolist() == pytest.approx([99.0 / 110.0 - 1.0, -0.5])
+
+
+def test_correlation_matrix_is_pairwise_complete() -> None:
+    rng = np.random.default_rng(3)
+    returns = rng.normal(0, 0.01, size=(4, 60))
+    returns[1] = returns[0] * 2 + rng.normal(0, 0.001, 60)
+    returns[2, ::3] = np.nan
+    returns[3, :] = 0.001
+
+    corr = correlation_matrix(returns)
+
+    shared = ~np.isnan(returns[0]) & ~np.isnan(returns[2])
+    expected = _pearson(returns[0, shared].tolist(), returns[2, shared].tolist())
+    assert corr[0, 2] == pytest.approx(expected)
+    assert corr[2, 0] == pytest.approx(expected)
+    assert corr[0, 1] > 0.99
+    assert corr[0, 3] == 0.0
+    assert np.diag(corr).tolist() == [1.0, 1.0, 1.0, 1.0]
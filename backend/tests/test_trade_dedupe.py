@@ -0,0 +1,78 @@
+import hashlib
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.config import settings
+from app.services.trade_dedupe import UidBloomFilter, dedupe_trade_records, get_known_trade_uids
+from app.services.trade_loader import load_trades
+
+
+def _uid(idx: int) -> str:
+    return hashlib.sha256(str(idx).encode()).hexdigest()
+
+
+def _record(idx: int, account: str = "ACC1") -> tuple:
+    return (
+        _uid(idx),
+        account,
+        "AAPL",
+        date(2026, 1, 5),
+        "BUY",
+        Decimal(1),
+        Decimal(100),
+        Decimal(0),
+        "USD",
+        None,
+        "dedupe.csv",
+        datetime(2026, 3, 1, tzinfo=UTC),
+    )
+
+
+def test_bloom_filter_has_no_false_negatives() -> None:
+    bloom = UidBloomFilter(capacity=10_000)
+    for idx in range(10_000):
+        bloom.add(_uid(idx))
+
+    assert all(_uid(idx) in bloom for idx in range(10_000))
+    false_positives = sum(_uid(idx) in bloom for idx in range(10_000, 20_000))
+    assert false_positives < 300
+
+
+@pytest.mark.parametrize("filter_enabled", [True, False])
+def test_dedupe_splits_in_file_and_stored_duplicates(
+    db_session, monkeypatch, filter_enabled
+) -> None:
+    monkeypatch.setattr(settings, "trade_uid_filter_enabled", filter_enabled)
+    load_trades(db_session, [_record(1), _record(2, "ACC2")])
+    db_session.commit()
+
+    result = dedupe_trade_records(
+        db_session, [_record(1), _record(3), _record(3), _record(2, "ACC2"), _record(4, "ACC3")]
+    )
+
+    assert result.in_file_duplicates == 1
+    if filter_enabled:
+        assert result.stored_duplicates == 2
+        assert [record[0] for record in result.records] == [_uid(3), _uid(4)]
+    else:
+        assert result.stored_duplicates == 0
+        assert len(result.records) == 4
+    assert load_trades(db_session, result.records).inserted_rows == 2
+
+
+def test_import_keeps_the_filter_current(client, db_session) -> None:
+    csv_content = """account,symbol,trade_date,side,quantity,price,fees,currency,broker_ref
+ACC1,AAPL,2026-02-14,BUY,10,185.5,1.2,USD,BRK-1
+ACC1,AAPL,2026-02-14,BUY,10,185.5,1.2,USD,BRK-1
+ACC2,MSFT,2026-02-14,BUY,3,410,0,USD,BRK-2
+"""
+    files = {"file": ("trades.csv", csv_content, "text/csv")}
+    first = client.post("/v1/trades/import", files=files).json()
+    second = client.post("/v1/trades/import", files=files).json()
+
+    assert (first["imported_rows"], first["duplicate_rows"]) == (2, 1)
+    assert (second["imported_rows"], second["duplicate_rows"]) == (0, 3)
+    known = get_known_trade_uids(db_session)
+    assert known.maybe_stored(db_session, [_record(99)]) == []
@@ -0,0 +1,141 @@
+import json
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.models import JobRun
+
+CSV_CONTENT = """account,symbol,trade_date,side,quantity,price,fees,currency,broker_ref
+ACC1,AAPL,2026-02-14,BUY,10,185.5,1.2,USD,BRK-1
+ACC1,MSFT,2026-02-14,BUY,5,410.0,0.5,USD,BRK-2
+ACC2,NVDA,2026-02-13,BUY,2,650.0,0,USD,BRK-3
+"""
+
+
+@pytest.fixture()
+def spool_dir(tmp_path, monkeypatch) -> Path:
+    monkeypatch.setattr(settings, "trade_import_spool_dir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize("atomic", ["true", "false"])
+def test_async_import_runs_in_the_background(client, spool_dir, atomic) -> None:
+    files = {"file": ("trades.csv", CSV_CONTENT, "text/csv")}
+    response = client.post(
+        "/v1/trades/import",
+        params={"async": "true", "atomic": atomic, "batch_size": 2},
+        files=files,
+    )
+
+    assert response.status_code == 202
+    job = response.json()
+    assert (job["filename"], job["status"]) == ("trades.csv", "QUEUED")
+
+    status_response = client.get(f"/v1/jobs/{job['job_run_id']}")
+    assert status_response.status_code == 200
+    run = status_response.json()
+    assert (run["job_name"], run["status"], run["rows_processed"]) == ("trade_import", "SUCCESS", 3)
+    assert run["details"]["imported_rows"] == 3
+    assert run["finished_at"] is not None
+    assert list(spool_dir.iterdir()) == []
+
+    positions = client.get("/v1/positions", params={"snapshot_date": "2026-02-14"}).json()
+    assert len(positions["positions"]) == 3
+
+
+def test_async_import_records_row_errors(client, spool_dir) -> None:
+    bad_csv = CSV_CONTENT + "ACC1,AAPL,2026-02-14,HOLD,1,1,0,USD,BRK-4\n"
+    response = client.post(
+        "/v1/trades/import",
+        params={"async": "true"},
+        files={"file": ("bad.csv", bad_csv, "text/csv")},
+    )
+    assert response.status_code == 202
+
+    run = client.get(f"/v1/jobs/{response.json()['job_run_id']}").json()
+    assert run["status"] == "FAILED"
+    assert run["details"]["error"] == "Row 5: side must be BUY or SELL"
+    # The atomic import rolled back the rows it had read before the bad one.
+    assert run["rows_processed"] == 0
+    positions = client.get("/v1/positions", params={"snapshot_date": "2026-02-14"}).json()
+    assert positions["positions"] == []
+    assert list(spool_dir.iterdir()) == []
+
+
+def test_startup_fails_imports_left_behind_by_a_previous_process(
+    client, db_session, spool_dir, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "trade_import_recover_on_startup", True)
+    spooled = spool_dir / "left-behind.csv"
+    spooled.write_text(CSV_CONTENT)
+    runs = [
+        JobRun(
+            job_name="trade_import",
+            status=status,
+            started_at=datetime.now(UTC),
+            rows_processed=rows_processed,
+            run_details=json.dumps(
+                {"filename": "trades.csv", "atomic": True, "spool_path": str(path)}
+            ),
+        )
+        for status, rows_processed, path in [
+            ("QUEUED", 0, spooled),
+            ("RUNNING", 2, spool_dir / "gone.csv"),
+            ("SUCCESS", 3, spool_dir / "done.csv"),
+        ]
+    ]
+    db_session.add_all(runs)
+    db_session.commit()
+
+    with TestClient(app):
+        pass
+
+    statuses = [client.get(f"/v1/jobs/{run.id}").json() for run in runs]
+    assert [(run["status"], run["rows_processed"]) for run in statuses] == [
+        ("FAILED", 0),
+        ("FAILED", 0),
+        ("SUCCESS", 3),
+    ]
+    assert statuses[0]["details"]["error"] == "Interrupted by a server restart"
+    assert list(spool_dir.iterdir()) == []
+
+
+def test_startup_leaves_running_imports_alone_by_default(client, db_session, spool_dir) -> None:
+    spooled = spool_dir / "in-flight.csv"
+    spooled.write_text(CSV_CONTENT)
+    job_run = JobRun(
+        job_name="trade_import",
+        status="RUNNING",
+        started_at=datetime.now(UTC),
+        rows_processed=2,
+        run_details=json.dumps({"filename": "trades.csv", "atomic": True, "spool_path": str(spooled)}),
+    )
+    db_session.add(job_run)
+    db_session.commit()
+
+    # Another API process starting up must not fail an import this one is still running.
+    with TestClient(app):
+        pass
+
+    run = client.get(f"/v1/jobs/{job_run.id}").json()
+    assert (run["status"], run["rows_processed"]) == ("RUNNING", 2)
+    assert spooled.exists()
+
+
+def test_async_import_rejects_unsupported_files_up_front(client, spool_dir) -> None:
+    response = client.post(
+        "/v1/trades/import",
+        params={"async": "true"},
+        files={"file": ("trades.txt", "x", "text/plain")},
+    )
+
+    assert response.status_code == 422
+    assert list(spool_dir.iterdir()) == []
+
+
+def test_unknown_job_run_is_404(client) -> None:
+    assert client.get("/v1/jobs/999").status_code == 404
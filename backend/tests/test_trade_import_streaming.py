@@ -0,0 +1,79 @@
+import io
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models import JobRun, Trade
+from app.services.trade_import import import_trade_file
+
+HEADER = "account,symbol,trade_date,side,quantity,price,fees,currency,broker_ref\n"
+
+
+def _csv(rows: int, bad_row: int | None = None) -> io.BytesIO:
+    lines = [HEADER]
+    for idx in range(rows):
+        side = "HOLD" if idx == bad_row else "BUY"
+        lines.append(
+            f"ACC{idx % 3},AAPL,2026-02-{idx % 28 + 1:02d},{side},{idx + 1},100,0,USD,REF-{idx}\n"
+        )
+    return io.BytesIO("".join(lines).encode("utf-8"))
+
+
+def _trade_count(db) -> int:
+    return db.scalar(select(func.count()).select_from(Trade))
+
+
+def test_import_runs_in_batches_and_reports_progress(db_session) -> None:
+    seen = []
+    result = import_trade_file(
+        db_session,
+        "trades.csv",
+        _csv(25),
+        batch_size=10,
+        on_progress=lambda p: seen.append((p.batches, p.rows_read)),
+    )
+
+    assert (result.total_rows, result.imported_rows, result.duplicate_rows) == (25, 25, 0)
+    assert seen == [(1, 10), (2, 20), (3, 25)]
+    assert _trade_count(db_session) == 25
+
+    job_run = db_session.get(JobRun, result.job_run_id)
+    assert (job_run.job_name, job_run.status, job_run.rows_processed) == (
+        "trade_import",
+        "SUCCESS",
+        25,
+    )
+
+    again = import_trade_file(db_session, "trades.csv", _csv(25), batch_size=10)
+    assert (again.imported_rows, again.duplicate_rows) == (0, 25)
+
+
+def test_atomic_import_rolls_back_every_batch(db_session) -> None:
+    with pytest.raises(ValueError, match="Row 24: side must be BUY or SELL"):
+        import_trade_file(db_session, "trades.csv", _csv(25, bad_row=22), batch_size=10)
+
+    assert _trade_count(db_session) == 0
+    job_run = db_session.scalar(select(JobRun).where(JobRun.job_name == "trade_import"))
+    assert job_run.status == "FAILED"
+    assert "Row 24" in job_run.run_details
+
+
+def test_non_atomic_import_keeps_completed_batches(client, db_session) -> None:
+    files = {"file": ("trades.csv", _csv(25, bad_row=22).getvalue(), "text/csv")}
+    response = client.post(
+        "/v1/trades/import", params={"atomic": "false", "batch_size": 10}, files=files
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Row 24: side must be BUY or SELL"
+    assert _trade_count(db_session) == 20
+
+
+def test_import_rejects_missing_columns_before_reading_rows(client) -> None:
+    files = {"file": ("trades.csv", "account,symbol\nACC1,AAPL\n", "text/csv")}
+    response = client.post("/v1/trades/import", files=files)
+
+    assert response.status_code == 422
+    assert (
+        response.json()["detail"] == "Missing required columns: price, quantity, side, trade_date"
+    )
@@ -0,0 +1,85 @@
+from datetime import UTC, date, datetime
+
+import pytest
+
+from app.config import settings
+from app.services import trade_import
+from app.services.trade_import import (
+    DateParser,
+    _validate_batch,
+    shutdown_import_pool,
+    validate_trade_rows,
+)
+
+IMPORTED_AT = datetime(2026, 3, 1, tzinfo=UTC)
+
+
+def _batch(count: int, bad_rows: tuple[int, ...] = ()) -> list[tuple[int, dict[str, object]]]:
+    dates = ("2026-02-14", "02/13/2026", "2026/02/12")
+    return [
+        (
+            idx + 2,
+            {
+                "account": f"ACC{idx % 3}",
+                "symbol": "aapl",
+                "trade_date": dates[idx // 7 % 3],
+                "side": "HOLD" if idx in bad_rows else "buy",
+                "quantity": str(idx + 1),
+                "price": "100.5",
+                "fees": "",
+                "currency": "",
+                "broker_ref": f"REF-{idx}",
+            },
+        )
+        for idx in range(count)
+    ]
+
+
+@pytest.fixture()
+def parallel_validation(monkeypatch):
+    monkeypatch.setattr(trade_import, "MIN_VALIDATION_CHUNK", 10)
+    yield 3
+    shutdown_import_pool()
+
+
+def test_parallel_validation_matches_serial(parallel_validation) -> None:
+    batch = _batch(95)
+    parallel = _validate_batch(batch, "trades.csv", workers=parallel_validation)
+    serial = validate_trade_rows(batch, "trades.csv", parallel[0][-1])
+
+    assert parallel == serial
+    assert [record[9] for record in parallel] == [f"REF-{idx}" for idx in range(95)]
+
+
+def test_parallel_validation_reports_the_first_bad_row(parallel_validation) -> None:
+    with pytest.raises(ValueError, match=r"^Row 43: side must be BUY or SELL$"):
+        _validate_batch(_batch(95, bad_rows=(41, 80)), "trades.csv", workers=parallel_validation)
+
+
+def test_import_with_validation_workers(client, monkeypatch, parallel_validation) -> None:
+    monkeypatch.setattr(settings, "import_validation_workers", parallel_validation)
+    header = "account,symbol,trade_date,side,quantity,price\n"
+    rows = "".join(f"ACC1,AAPL,02/{idx % 28 + 1:02d}/2026,BUY,{idx + 1},10\n" for idx in range(60))
+    response = client.post(
+        "/v1/trades/import", files={"file": ("trades.csv", header + rows, "text/csv")}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["imported_rows"] == 60
+
+
+def test_date_parsing_switches_between_formats() -> None:
+    dates = DateParser()
+    records = validate_trade_rows(_batch(21), "trades.csv", IMPORTED_AT, dates)
+
+    assert [record[3] for record in records[::7]] == [
+        date(2026, 2, 14),
+        date(2026, 2, 13),
+        date(2026, 2, 12),
+    ]
+    assert dates.last_format == "%Y/%m/%d"
+
+    # Each import keeps its own hint, so a concurrent import in another format leaves it alone.
+    other = DateParser()
+    assert other.parse("02/14/2026") == date(2026, 2, 14)
+    assert (dates.last_format, other.last_format) == ("%Y/%m/%d", "%m/%d/%Y")
@@ -0,0 +1,96 @@
+import io
+from datetime import datetime
+
+from openpyxl import Workbook
+
+HEADERS = [
+    "account",
+    "symbol",
+    "trade_date",
+    "side",
+    "quantity",
+    "price",
+    "fees",
+    "currency",
+    "broker_ref",
+]
+
+
+def _workbook(**sheets: list[list]) -> bytes:
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for title, rows in sheets.items():
+        worksheet = workbook.create_sheet(title)
+        worksheet.append(HEADERS)
+        for row in rows:
+            worksheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def test_import_xlsx_reads_typed_cells(client) -> None:
+    contents = _workbook(
+        Trades=[
+            ["ACC1", "aapl", datetime(2026, 2, 14), "BUY", 10, 185.5, 1.2, "USD", "BRK-1"],
+            [None, None, None, None, None, None, None, None, None],
+            ["ACC1", "MSFT", "02/14/2026", "sell", 5, 410, None, None, None],
+        ]
+    )
+    response = client.post(
+        "/v1/trades/import", files={"file": ("trades.xlsx", contents, XLSX_TYPE)}
+    )
+
+    assert response.status_code == 200
+    assert (response.json()["total_rows"], response.json()["imported_rows"]) == (2, 2)
+
+    payload = client.get("/v1/positions", params={"snapshot_date": "2026-02-14"}).json()
+    positions = {item["symbol"]: item for item in payload["positions"]}
+    assert float(positions["AAPL"]["quantity"]) == 10
+    assert float(positions["MSFT"]["quantity"]) == -5
+
+
+def test_typed_xlsx_cells_dedupe_against_the_same_csv_rows(client) -> None:
+    csv_content = "\n".join(
+        [",".join(HEADERS), "ACC1,AAPL,2026-02-14,BUY,10,185.5,1.2,USD,BRK-1", ""]
+    )
+    client.post("/v1/trades/import", files={"file": ("trades.csv", csv_content, "text/csv")})
+
+    contents = _workbook(
+        Trades=[["ACC1", "AAPL", datetime(2026, 2, 14), "BUY", 10, 185.5, 1.2, "USD", "BRK-1"]]
+    )
+    response = client.post(
+        "/v1/trades/import", files={"file": ("trades.xlsx", contents, XLSX_TYPE)}
+    )
+
+    assert response.json()["duplicate_rows"] == 1
+
+
+def test_import_xlsx_from_a_named_sheet(client) -> None:
+    contents = _workbook(
+        Summary=[],
+        Fills=[["ACC2", "NVDA", datetime(2026, 2, 13), "BUY", 3, 650.25, 0, "USD", None]],
+    )
+    files = {"file": ("broker.xlsx", contents, XLSX_TYPE)}
+
+    assert client.post("/v1/trades/import", files=files).json()["total_rows"] == 0
+
+    response = client.post("/v1/trades/import", params={"sheet": "Fills"}, files=files)
+    assert response.status_code == 200
+    assert response.json()["imported_rows"] == 1
+
+    missing = client.post("/v1/trades/import", params={"sheet": "Nope"}, files=files)
+    assert missing.status_code == 422
+    assert missing.json()["detail"] == "Worksheet not found: Nope"
+
+
+def test_import_rejects_corrupt_xlsx(client) -> None:
+    response = client.post(
+        "/v1/trades/import", files={"file": ("trades.xlsx", b"not a workbook", XLSX_TYPE)}
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Invalid .xlsx file"
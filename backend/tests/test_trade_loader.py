@@ -0,0 +1,77 @@
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+from sqlalchemy import func, select
+
+from app.models import Trade
+from app.services.trade_loader import load_trades
+
+
+def _record(uid: str, account: str, trade_date: date, side: str = "BUY") -> tuple:
+    return (
+        uid,
+        account,
+        "AAPL",
+        trade_date,
+        side,
+        Decimal(10),
+        Decimal(100),
+        Decimal(0),
+        "USD",
+        None,
+        "bulk.csv",
+        datetime(2026, 3, 1, tzinfo=UTC),
+    )
+
+
+def test_load_trades_counts_duplicates_in_the_database(db_session) -> None:
+    first = load_trades(
+        db_session, [_record("a", "ACC1", date(2026, 1, 5)), _record("b", "ACC2", date(2026, 1, 6))]
+    )
+    assert (first.inserted_rows, first.duplicate_rows) == (2, 0)
+
+    second = load_trades(
+        db_session,
+        [
+            _record("b", "ACC2", date(2026, 1, 6)),
+            _record("c", "ACC3", date(2026, 1, 9)),
+            _record("c", "ACC3", date(2026, 1, 9)),
+            _record("d", "ACC1", date(2026, 1, 8)),
+        ],
+    )
+    db_session.commit()
+
+    assert (second.staged_rows, second.inserted_rows, second.duplicate_rows) == (4, 2, 2)
+    assert second.first_trade_date == date(2026, 1, 8)
+    assert second.accounts == {"ACC1", "ACC3"}
+    assert db_session.scalar(select(func.count()).select_from(Trade)) == 4
+    assert db_session.scalar(select(Trade.source_file).where(Trade.trade_uid == "d")) == "bulk.csv"
+
+
+def test_load_trades_keeps_record_order_within_a_day(db_session) -> None:
+    # The uids sort the other way round, so only the staging order can put the buy first.
+    result = load_trades(
+        db_session,
+        [
+            _record("z-buy", "ACC1", date(2026, 1, 5)),
+            _record("a-sell", "ACC1", date(2026, 1, 5), side="SELL"),
+        ],
+    )
+    db_session.commit()
+
+    assert result.inserted_rows == 2
+    ordered = db_session.execute(select(Trade.trade_uid, Trade.side).order_by(Trade.id)).all()
+    assert ordered == [("z-buy", "BUY"), ("a-sell", "SELL")]
+
+
+def test_import_counts_repeated_rows_within_a_file_as_duplicates(client) -> None:
+    csv_content = """account,symbol,trade_date,side,quantity,price,fees,currency,broker_ref
+ACC1,AAPL,2026-02-14,BUY,10,185.5,1.2,USD,BRK-1
+ACC1,AAPL,2026-02-14,BUY,10,185.5,1.2,USD,BRK-1
+"""
+    response = client.post(
+        "/v1/trades/import", files={"file": ("dupes.csv", csv_content, "text/csv")}
+    )
+
+    assert response.status_code == 200
+    assert (response.json()["imported_rows"], response.json()["duplicate_rows"]) == (1, 1)
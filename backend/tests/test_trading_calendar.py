@@ -0,0 +1,113 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.market_data import fetching
+from app.market_data.calendar import get_calendar, nyse_holidays
+from app.market_data.providers import yfinance_provider
+from app.market_data.providers.demo import DemoMarketDataProvider
+from app.market_data.providers.yfinance_provider import YFinanceMarketDataProvider
+from app.models import PriceCoverage, PriceEOD
+from app.services.companies import compare_companies
+
+
+def test_nyse_holidays_follow_the_exchange_rules() -> None:
+    assert nyse_holidays(2026, 2026).astype(str).tolist() == [
+        "2026-01-01",
+        "2026-01-19",
+        "2026-02-16",
+        "2026-04-03",
+        "2026-05-25",
+        "2026-06-19",
+        "2026-07-03",
+        "2026-09-07",
+        "2026-11-26",
+        "2026-12-25",
+    ]
+    holidays = set(nyse_holidays(2021, 2025).astype(str).tolist())
+    # Saturday New Year's Day 2022 is not observed on Friday Dec 31; Sunday Juneteenth moves to
+    # Monday.
+    assert "2021-12-31" not in holidays
+    assert {"2022-06-20", "2022-12-26", "2025-01-09"} <= holidays
+
+
+def test_calendar_arithmetic() -> None:
+    calendar = get_calendar()
+    assert calendar.name == "NYSE"
+    assert not calendar.is_trading_day(date(2026, 1, 19))
+    assert calendar.previous_trading_day(date(2026, 1, 19)) == date(2026, 1, 16)
+    assert calendar.previous_trading_day(date(2026, 1, 16)) == date(2026, 1, 16)
+    assert calendar.next_trading_day(date(2026, 1, 17)) == date(2026, 1, 20)
+    assert calendar.trading_days(date(2026, 1, 15), date(2026, 1, 20)).astype(str).tolist() == [
+        "2026-01-15",
+        "2026-01-16",
+        "2026-01-20",
+    ]
+    days = [date(2026, 1, 17), date(2026, 1, 19), date(2026, 1, 20)]
+    assert calendar.trading_dates(days) == {date(2026, 1, 20)}
+    assert np.busday_count("2026-01-01", "2026-02-01", busdaycal=calendar.busdaycal) == 20
+
+    assert get_calendar("weekdays").is_trading_day(date(2026, 1, 19))
+    with pytest.raises(ValueError, match="Unsupported trading calendar"):
+        get_calendar("LSE")
+
+
+def test_demo_history_skips_holidays(monkeypatch) -> None:
+    points, _ = DemoMarketDataProvider().fetch_history(
+        ["AAPL"], date(2026, 1, 16), date(2026, 1, 20)
+    )
+    assert [point.price_date for point in points] == [date(2026, 1, 16), date(2026, 1, 20)]
+
+    monkeypatch.setattr(settings, "trading_calendar", "WEEKDAYS")
+    points, _ = DemoMarketDataProvider().fetch_history(
+        ["AAPL"], date(2026, 1, 16), date(2026, 1, 20)
+    )
+    assert len(points) == 3
+
+
+def test_yfinance_history_without_a_session_downloads_nothing(monkeypatch) -> None:
+    class Offline:
+        def download(self, *args, **kwargs):
+            raise AssertionError("no download expected")
+
+    monkeypatch.setattr(yfinance_provider, "yf", Offline())
+    provider = YFinanceMarketDataProvider(batch=True)
+    result = provider.fetch_history(["aapl", "MSFT"], date(2026, 1, 17), date(2026, 1, 19))
+    assert result == ([], ["AAPL", "MSFT"])
+
+
+def test_refresh_on_a_holiday_stores_the_previous_session(client, db_session) -> None:
+    response = client.post(
+        "/v1/prices/refresh", json={"price_date": "2026-01-19", "symbols": ["AAPL"]}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["price_date"] == "2026-01-16"
+    assert db_session.scalars(select(PriceEOD.price_date)).all() == [date(2026, 1, 16)]
+
+
+def test_compare_records_sessionless_gaps_without_fetching(db_session, monkeypatch) -> None:
+    calls: list = []
+
+    class CountingProvider(DemoMarketDataProvider):
+        def fetch_history(self, symbols, start_date, end_date):
+            calls.append((list(symbols), start_date, end_date))
+            return super().fetch_history(symbols, start_date, end_date)
+
+    monkeypatch.setattr(fetching, "get_market_data_provider", lambda name: CountingProvider())
+
+    result = compare_companies(db_session, ["AAPL"], date(2026, 1, 17), date(2026, 1, 19), ["demo"])
+    assert calls == []
+    assert result.dates == []
+    assert db_session.execute(select(PriceCoverage.start_date, PriceCoverage.end_date)).all() == [
+        (date(2026, 1, 17), date(2026, 1, 19))
+    ]
+
+    compare_companies(db_session, ["AAPL"], date(2026, 1, 16), date(2026, 1, 20), ["demo"])
+    assert sorted(calls) == [
+        (["AAPL"], date(2026, 1, 16), date(2026, 1, 16)),
+        (["AAPL"], date(2026, 1, 20), date(2026, 1, 20)),
+    ]
@@ -0,0 +1,123 @@
+import asyncio
+import json
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.market_data.providers import yfinance_provider
+from app.market_data.providers.yfinance_provider import YFinanceMarketDataProvider
+
+FIXTURE = json.loads((Path(__file__).parent / "fixtures" / "yfinance_download.json").read_text())
+
+
+class FixtureYFinance:
+    """Stand-in for the yfinance module.
+
+    Serves the fixture closes in yf.download's (Price, Ticker) column layout.
+    """
+
+    def __init__(self) -> None:
+        self.downloads: list[list[str]] = []
+        self.index = pd.DatetimeIndex(pd.to_datetime(FIXTURE["dates"]), name="Date")
+
+    def _closes(self, symbol: str, start: str, end: str) -> pd.Series:
+        values = FIXTURE["close"].get(symbol, [None] * len(self.index))
+        series = pd.Series(
+            [np.nan if v is None else v for v in values], index=self.index, dtype=float
+        )
+        return series[(series.index >= pd.Timestamp(start)) & (series.index < pd.Timestamp(end))]
+
+    def download(self, tickers, start, end, **kwargs) -> pd.DataFrame:
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        self.downloads.append(tickers)
+        closes = {symbol: self._closes(symbol, start, end) for symbol in tickers}
+        columns = pd.MultiIndex.from_product(
+            [FIXTURE["fields"], tickers], names=["Price", "Ticker"]
+        )
+        frame = pd.DataFrame(index=next(iter(closes.values())).index, columns=columns, dtype=float)
+        for symbol, series in closes.items():
+            for field in FIXTURE["fields"]:
+                frame[(field, symbol)] = series
+        return frame.dropna(how="all")
+
+    def Ticker(self, symbol: str):
+        fixture = self
+
+        class _Ticker:
+            def history(self, start, end, auto_adjust):
+                return pd.DataFrame({"Close": fixture._closes(symbol, start, end)}).dropna()
+
+        return _Ticker()
+
+
+@pytest.fixture()
+def fixture_yfinance(monkeypatch) -> FixtureYFinance:
+    stand_in = FixtureYFinance()
+    monkeypatch.setattr(yfinance_provider, "yf", stand_in)
+    return stand_in
+
+
+def test_batched_history_is_one_download(fixture_yfinance) -> None:
+    provider = YFinanceMarketDataProvider(batch=True)
+    points, failed = provider.fetch_history(
+        ["aapl", "MSFT", "NVDA", "NOPE", "AAPL"], date(2026, 1, 6), date(2026, 1, 12)
+    )
+
+    assert fixture_yfinance.downloads == [["AAPL", "MSFT", "NVDA", "NOPE"]]
+    assert failed == ["NOPE"]
+    by_symbol = {}
+    for point in points:
+        by_symbol.setdefault(point.symbol, []).append(point)
+    assert by_symbol["AAPL"][0].price_date == date(2026, 1, 6)
+    assert len(by_symbol["AAPL"]) == 5
+    assert date(2026, 1, 8) not in {point.price_date for point in by_symbol["MSFT"]}
+    assert by_symbol["NVDA"][-1].close_price == Decimal("131.75999450683594")
+
+
+@pytest.mark.parametrize("method", ["history", "eod"])
+def test_batched_and_per_symbol_paths_agree(fixture_yfinance, method) -> None:
+    symbols = ["AAPL", "NVDA", "NOPE"]
+
+    def fetch(batch: bool):
+        provider = YFinanceMarketDataProvider(batch=batch)
+        if method == "history":
+            return provider.fetch_history(symbols, date(2026, 1, 5), date(2026, 1, 13))
+        return provider.fetch_eod(symbols, date(2026, 1, 11))
+
+    assert fetch(batch=True) == fetch(batch=False)
+
+
+def test_batched_eod_uses_the_last_close_on_or_before_the_date(fixture_yfinance) -> None:
+    points, failed = YFinanceMarketDataProvider(batch=True).fetch_eod(
+        ["MSFT", "NOPE"], date(2026, 1, 8)
+    )
+
+    assert failed == ["NOPE"]
+    assert [(point.symbol, point.price_date, point.close_price) for point in points] == [
+        ("MSFT", date(2026, 1, 8), Decimal("424.55999755859375"))
+    ]
+
+
+def test_batched_download_errors_fail_every_symbol(monkeypatch) -> None:
+    class Offline:
+        def download(self, *args, **kwargs):
+            raise ConnectionError("offline")
+
+    monkeypatch.setattr(yfinance_provider, "yf", Offline())
+    provider = YFinanceMarketDataProvider(batch=True)
+    result = provider.fetch_history(["AAPL", "MSFT"], date(2026, 1, 5), date(2026, 1, 9))
+    assert result == ([], ["AAPL", "MSFT"])
+
+
+def test_async_methods_match_the_blocking_ones(fixture_yfinance) -> None:
+    provider = YFinanceMarketDataProvider(batch=True)
+    symbols = ["AAPL", "MSFT", "NOPE"]
+
+    history = asyncio.run(provider.afetch_history(symbols, date(2026, 1, 5), date(2026, 1, 13)))
+    assert history == provider.fetch_history(symbols, date(2026, 1, 5), date(2026, 1, 13))
+    eod = asyncio.run(provider.afetch_eod(symbols, date(2026, 1, 11)))
+    assert eod == provider.fetch_eod(symbols, date(2026, 1, 11))